@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+APEX Columnar Snapshot Export
+Writes each apex/ snapshot as typed, contiguous per-column files that readers
+can memory-map and project (load only the columns they need, without copying)
+
+Layout (one directory per table):
+    apex_columnar/<TABLE>/_manifest.json
+    apex_columnar/<TABLE>/<column>.<ext>
+
+Column encodings:
+    int64 / float64 / bool   fixed-width values (.i64 / .f64 / .u8) + optional validity (.valid)
+    dict                     int32 codes (.codes, -1 = null) + dictionary (.dict.json)
+    utf8                     int64 offsets (.offsets, n+1 entries) + UTF-8 data (.utf8) + .valid
+    json                     nested values, stored as utf8 holding JSON text
+    bigint                   integers beyond int64 (Oracle NUMBER ids), stored as utf8 decimal text
+
+Usage:
+    python apex_columnar.py export [--table TABLE] [--force] [--no-families]
+    python apex_columnar.py profile TABLE [--columns col1 col2 ...]
+"""
+
+import os
+import re
+import sys
+import mmap
+import time
+import array
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Iterable, Union
+
+import apex_json
+from apex_families import family_label, group_families
+from apex_index import file_sha256, find_latest_snapshots, load_snapshot_items, snapshot_fingerprints
+
+# Configuration
+JSON_DIR = Path("apex")
+COLUMNAR_DIR = Path("apex_columnar")
+MANIFEST_NAME = "_manifest.json"
+FORMAT_VERSION = 2  # 2: integers beyond int64 are stored exactly (bigint)
+
+# A string column is dictionary encoded when it has few distinct values
+# relative to its length (e.g. assisted_by, host, status columns)
+DICT_MAX_DISTINCT_RATIO = 0.5
+DICT_MAX_DISTINCT = 65535
+
+# Column type -> (file extension, array typecode)
+FIXED_WIDTH_TYPES = {
+    'int64': ('i64', 'q'),
+    'float64': ('f64', 'd'),
+    'bool': ('u8', 'B'),
+}
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+
+def safe_file_stem(column: str) -> str:
+    """Make a column name safe to use as a file name"""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', column)
+
+
+def infer_column_type(values: List) -> str:
+    """Infer a storage type from all (not just sampled) values of a column"""
+    seen = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            seen.add('bool')
+        elif isinstance(value, int):
+            seen.add('int')
+        elif isinstance(value, float):
+            seen.add('float')
+        elif isinstance(value, str):
+            seen.add('str')
+        else:
+            seen.add('json')
+        if len(seen) > 2:
+            break
+
+    if not seen:
+        return 'null'
+    if 'int' in seen and seen <= {'int', 'float'}:
+        # Oracle NUMBER ids can exceed int64; float64 would round them, so keep their digits
+        wide = any(not INT64_MIN <= v <= INT64_MAX for v in values if isinstance(v, int) and not isinstance(v, bool))
+        if seen == {'int'}:
+            return 'bigint' if wide else 'int64'
+        return 'json' if wide else 'float64'
+    if seen == {'float'}:
+        return 'float64'
+    if seen == {'bool'}:
+        return 'bool'
+    if seen == {'str'}:
+        return 'str'
+    return 'json'
+
+
+def _write_array(path: Path, typecode: str, values: Iterable) -> None:
+    """Write a typed array as raw native-endian bytes"""
+    arr = array.array(typecode, values)
+    with open(path, 'wb') as f:
+        arr.tofile(f)
+
+
+def _write_validity(table_dir: Path, stem: str, values: List) -> Optional[str]:
+    """Write a validity bitmap (one byte per row) if the column has nulls"""
+    if all(v is not None for v in values):
+        return None
+    name = f"{stem}.valid"
+    _write_array(table_dir / name, 'B', (0 if v is None else 1 for v in values))
+    return name
+
+
+def _write_utf8(table_dir: Path, stem: str, strings: List[Optional[Union[str, bytes]]]) -> Dict:
+    """Write variable-length strings (or already encoded bytes) as offsets + concatenated UTF-8 bytes"""
+    offsets = array.array('q', [0])
+    position = 0
+    with open(table_dir / f"{stem}.utf8", 'wb') as data_file:
+        for value in strings:
+            if value is not None:
+                encoded = value if isinstance(value, bytes) else value.encode('utf-8')
+                data_file.write(encoded)
+                position += len(encoded)
+            offsets.append(position)
+    with open(table_dir / f"{stem}.offsets", 'wb') as f:
+        offsets.tofile(f)
+    return {'offsets': f"{stem}.offsets", 'data': f"{stem}.utf8"}
+
+
+def write_column(table_dir: Path, column: str, values: List, column_type: Optional[str] = None) -> Dict:
+    """Encode one column (inferring its type unless given) and return its manifest entry"""
+    stem = safe_file_stem(column)
+    if column_type is None:
+        column_type = infer_column_type(values)
+    entry = {'type': column_type, 'null_count': sum(1 for v in values if v is None)}
+
+    if column_type in FIXED_WIDTH_TYPES:
+        ext, typecode = FIXED_WIDTH_TYPES[column_type]
+        fill = 0.0 if typecode == 'd' else 0
+        entry['encoding'] = column_type
+        entry['values'] = f"{stem}.{ext}"
+        _write_array(table_dir / entry['values'], typecode,
+                     (fill if v is None else v for v in values))
+        entry['validity'] = _write_validity(table_dir, stem, values)
+        return entry
+
+    if column_type == 'str':
+        distinct = {v for v in values if v is not None}
+        if values and len(distinct) <= DICT_MAX_DISTINCT and len(distinct) <= len(values) * DICT_MAX_DISTINCT_RATIO:
+            dictionary = sorted(distinct)
+            codes = {value: idx for idx, value in enumerate(dictionary)}
+            entry['encoding'] = 'dict'
+            entry['codes'] = f"{stem}.codes"
+            entry['dictionary'] = f"{stem}.dict.json"
+            _write_array(table_dir / entry['codes'], 'i', (-1 if v is None else codes[v] for v in values))
+            apex_json.dump_file(dictionary, table_dir / entry['dictionary'])
+            return entry
+        strings = values
+    elif column_type == 'json':
+        strings = [None if v is None else apex_json.dumps(v) for v in values]
+    elif column_type == 'bigint':
+        strings = [None if v is None else str(v) for v in values]
+    else:
+        # All-null column: nothing to store beyond the manifest entry
+        entry['encoding'] = 'null'
+        return entry
+
+    entry['encoding'] = 'utf8'
+    entry.update(_write_utf8(table_dir, stem, strings))
+    entry['validity'] = _write_validity(table_dir, stem, values)
+    return entry
+
+
+def is_exported(table_dir: Path, sha256: str) -> bool:
+    """True if table_dir already holds a current-format export of this snapshot"""
+    manifest_path = table_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return False
+    try:
+        existing = apex_json.load_file(manifest_path)
+    except (OSError, ValueError):
+        return False
+    return existing.get('sha256') == sha256 and existing.get('format_version') == FORMAT_VERSION
+
+
+def snapshot_columns(item_lists: List[List[Dict]]) -> List[str]:
+    """Column names in first-seen order"""
+    columns = []
+    seen = set()
+    for items in item_lists:
+        for item in items:
+            for key in item:
+                if key not in seen:
+                    seen.add(key)
+                    columns.append(key)
+    return columns
+
+
+def write_snapshot(table_name: str, json_path: Path, sha256: str, items: List[Dict], output_dir: Path,
+                   columns: List[str], column_types: Optional[Dict[str, str]] = None,
+                   family: Optional[str] = None) -> Dict:
+    """Write the column files and manifest of one snapshot"""
+    table_dir = output_dir / table_name
+
+    # Write into a fresh directory so stale column files never linger
+    table_dir.mkdir(parents=True, exist_ok=True)
+    for old_file in table_dir.iterdir():
+        if old_file.is_file():
+            old_file.unlink()
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'table': table_name,
+        'source_file': json_path.name,
+        'sha256': sha256,
+        'row_count': len(items),
+        'byteorder': sys.byteorder,
+        'columns': {},
+    }
+    if family:
+        manifest['family'] = family
+    for column in columns:
+        values = [item.get(column) for item in items]
+        column_type = column_types.get(column) if column_types else None
+        manifest['columns'][column] = write_column(table_dir, column, values, column_type)
+
+    # Manifest last: a directory without one is an incomplete export
+    apex_json.dump_file(manifest, table_dir / MANIFEST_NAME, indent=True)
+    return manifest
+
+
+def export_snapshot(table_name: str, json_path: Path, output_dir: Path = COLUMNAR_DIR, force: bool = False) -> Optional[Dict]:
+    """
+    Export one snapshot to columnar form.
+    Returns the manifest, or None if the existing export is already up to date.
+    """
+    sha256 = file_sha256(json_path)
+    if not force and is_exported(output_dir / table_name, sha256):
+        return None
+    items = load_snapshot_items(json_path)
+    return write_snapshot(table_name, json_path, sha256, items, output_dir, snapshot_columns([items]))
+
+
+def export_family(snapshots: Dict[str, Path], family: str, output_dir: Path = COLUMNAR_DIR,
+                  force: bool = False) -> Dict[str, Optional[Dict]]:
+    """
+    Export same-shaped snapshots as one job: the column layout and types are
+    inferred once over all members, so every member gets the same schema.
+    Returns the manifest per table (None for all if every export is up to date).
+    """
+    hashes = {table_name: file_sha256(json_path) for table_name, json_path in snapshots.items()}
+    if not force and all(is_exported(output_dir / table_name, sha256) for table_name, sha256 in hashes.items()):
+        return {table_name: None for table_name in snapshots}
+
+    items_by_table = {table_name: load_snapshot_items(json_path) for table_name, json_path in snapshots.items()}
+    columns = snapshot_columns(list(items_by_table.values()))
+    column_types = {
+        column: infer_column_type([item.get(column) for items in items_by_table.values() for item in items])
+        for column in columns
+    }
+    return {
+        table_name: write_snapshot(table_name, snapshots[table_name], hashes[table_name], items,
+                                   output_dir, columns, column_types, family)
+        for table_name, items in items_by_table.items()
+    }
+
+
+class Column:
+    """A memory-mapped column; values are decoded lazily on access"""
+
+    def __init__(self, name: str, entry: Dict, row_count: int, views: Dict[str, memoryview], dictionary: Optional[List[str]] = None):
+        self.name = name
+        self.type = entry['type']
+        self.encoding = entry['encoding']
+        self.null_count = entry.get('null_count', 0)
+        self.row_count = row_count
+        self.values = views.get('values')       # int64/float64/bool data
+        self.codes = views.get('codes')         # dict codes
+        self.offsets = views.get('offsets')     # utf8 offsets
+        self.data = views.get('data')           # utf8 bytes
+        self.validity = views.get('validity')
+        self.dictionary = dictionary
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def is_null(self, index: int) -> bool:
+        if self.encoding == 'null':
+            return True
+        if self.encoding == 'dict':
+            return self.codes[index] < 0
+        return self.validity is not None and not self.validity[index]
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self.row_count
+        if not 0 <= index < self.row_count:
+            raise IndexError(index)
+        if self.is_null(index):
+            return None
+        if self.encoding == 'dict':
+            return self.dictionary[self.codes[index]]
+        if self.encoding == 'utf8':
+            raw = bytes(self.data[self.offsets[index]:self.offsets[index + 1]])
+            if self.type == 'json':
+                return apex_json.loads(raw)
+            if self.type == 'bigint':
+                return int(raw)
+            return raw.decode('utf-8')
+        value = self.values[index]
+        return bool(value) if self.encoding == 'bool' else value
+
+    def __iter__(self):
+        for index in range(self.row_count):
+            yield self[index]
+
+
+class ColumnarTable:
+    """Reader for one exported table; only the requested columns are mapped"""
+
+    def __init__(self, table_dir: Path):
+        self.table_dir = Path(table_dir)
+        self.manifest = apex_json.load_file(self.table_dir / MANIFEST_NAME)
+        if self.manifest.get('byteorder') != sys.byteorder:
+            raise ValueError(f"{self.table_dir} was written on a {self.manifest.get('byteorder')}-endian machine")
+        self.row_count = self.manifest['row_count']
+        self._maps = []
+        self._views = []
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.manifest['columns'].keys())
+
+    def _map_file(self, file_name: Optional[str], typecode: str) -> Optional[memoryview]:
+        if not file_name:
+            return None
+        path = self.table_dir / file_name
+        if os.path.getsize(path) == 0:
+            return memoryview(b'').cast(typecode)
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped).cast(typecode)
+        self._maps.append(mapped)
+        self._views.append(view)
+        return view
+
+    def column(self, name: str) -> Column:
+        """Map a single column"""
+        entry = self.manifest['columns'][name]
+        encoding = entry['encoding']
+        views = {}
+        dictionary = None
+
+        if encoding in FIXED_WIDTH_TYPES:
+            views['values'] = self._map_file(entry['values'], FIXED_WIDTH_TYPES[encoding][1])
+            views['validity'] = self._map_file(entry.get('validity'), 'B')
+        elif encoding == 'dict':
+            views['codes'] = self._map_file(entry['codes'], 'i')
+            dictionary = apex_json.load_file(self.table_dir / entry['dictionary'])
+        elif encoding == 'utf8':
+            views['offsets'] = self._map_file(entry['offsets'], 'q')
+            views['data'] = self._map_file(entry['data'], 'B')
+            views['validity'] = self._map_file(entry.get('validity'), 'B')
+
+        return Column(name, entry, self.row_count, views, dictionary)
+
+    def columns(self, names: Optional[List[str]] = None) -> Dict[str, Column]:
+        """Map a projection of columns (all columns if names is None)"""
+        return {name: self.column(name) for name in (names or self.column_names)}
+
+    def close(self):
+        """Release mapped files (columns handed out must no longer be used)"""
+        for view in self._views:
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._views.clear()
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_table(table_name: str, columnar_dir: Path = COLUMNAR_DIR) -> ColumnarTable:
+    """Open an exported table by name"""
+    return ColumnarTable(columnar_dir / table_name)
+
+
+def read_columns(table_name: str, columns: List[str], columnar_dir: Path = COLUMNAR_DIR) -> Dict[str, Column]:
+    """Convenience wrapper: map only the requested columns of a table"""
+    return open_table(table_name, columnar_dir).columns(columns)
+
+
+# Names analyze_json_file reports for each storage type
+KEY_TYPE_NAMES = {
+    'int64': 'int',
+    'float64': 'float',
+    'bool': 'bool',
+    'str': 'str',
+    'bigint': 'int',
+    'null': 'NoneType',
+}
+
+
+def profile_column(column: Column) -> Dict:
+    """
+    Null count, distinct count and min/max for a column, computed in one pass
+    over the mapped data (no per-row lists)
+    """
+    profile = {
+        'type': column.type,
+        'encoding': column.encoding,
+        'key_type': KEY_TYPE_NAMES.get(column.type, 'mixed'),
+        'null_count': column.null_count,
+    }
+    validity = column.validity
+    if column.encoding in ('int64', 'float64'):
+        low = high = None
+        nulls = 0
+        for index, value in enumerate(column.values):
+            if validity is not None and not validity[index]:
+                nulls += 1
+            elif low is None:
+                low = high = value
+            elif value < low:
+                low = value
+            elif value > high:
+                high = value
+        profile['null_count'] = nulls
+        if low is not None:
+            profile['min'] = low
+            profile['max'] = high
+    elif column.encoding == 'dict':
+        profile['distinct'] = len(column.dictionary)
+        if column.dictionary:
+            profile['min'] = column.dictionary[0]
+            profile['max'] = column.dictionary[-1]
+    elif column.encoding == 'utf8' and column.row_count:
+        offsets = column.offsets
+        longest = 0
+        nulls = 0
+        for index in range(column.row_count):
+            if validity is not None and not validity[index]:
+                nulls += 1
+                continue
+            length = offsets[index + 1] - offsets[index]
+            if length > longest:
+                longest = length
+        profile['null_count'] = nulls
+        profile['max_bytes'] = longest
+    return profile
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Columnar export of apex/ snapshots")
+    parser.add_argument('--json-dir', type=Path, default=JSON_DIR, help=f"Snapshot directory (default: {JSON_DIR})")
+    parser.add_argument('--output-dir', type=Path, default=COLUMNAR_DIR, help=f"Columnar directory (default: {COLUMNAR_DIR})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Export snapshots to columnar form")
+    export_parser.add_argument('--table', action='append', help="Only export this table (repeatable)")
+    export_parser.add_argument('--force', action='store_true', help="Re-export even if unchanged")
+    export_parser.add_argument('--no-families', dest='families', action='store_false',
+                               help="Export every table on its own instead of batching same-shaped tables")
+
+    profile_parser = subparsers.add_parser('profile', help="Profile columns of an exported table")
+    profile_parser.add_argument('table')
+    profile_parser.add_argument('--columns', nargs='+', help="Only map these columns")
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        print("=" * 70)
+        print("APEX Columnar Snapshot Export")
+        print("=" * 70)
+        snapshots = find_latest_snapshots(args.json_dir)
+        if args.table:
+            snapshots = {t: p for t, p in snapshots.items() if t in args.table}
+        if args.families:
+            fingerprints = snapshot_fingerprints(args.json_dir)
+            jobs = list(group_families({t: fingerprints.get(t, t) for t in snapshots}).items())
+        else:
+            jobs = [(table_name, [table_name]) for table_name in sorted(snapshots)]
+
+        exported = unchanged = failed = 0
+        for family, members in jobs:
+            try:
+                if len(members) == 1:
+                    results = {members[0]: export_snapshot(members[0], snapshots[members[0]], args.output_dir,
+                                                           force=args.force)}
+                else:
+                    results = export_family({t: snapshots[t] for t in members}, family, args.output_dir,
+                                            force=args.force)
+            except Exception as e:
+                print(f"  [!] Error exporting {family_label(members)}: {e}")
+                failed += len(members)
+                continue
+            changed = {t: m for t, m in results.items() if m is not None}
+            unchanged += len(results) - len(changed)
+            if len(members) > 1 and changed:
+                print(f"  [*] Family {family_label(members)}: {len(members)} tables, one schema")
+            for table_name, manifest in sorted(changed.items()):
+                encodings = ', '.join(f"{c}:{e['encoding']}" for c, e in manifest['columns'].items())
+                print(f"  [+] {table_name}: {manifest['row_count']} rows [{encodings}]")
+                exported += 1
+        print("-" * 70)
+        print(f"[+] Exported: {exported}  Unchanged: {unchanged}  Failed: {failed}")
+        print(f"[*] Output directory: {args.output_dir}")
+        return
+
+    if args.command == 'profile':
+        started = time.perf_counter()
+        with open_table(args.table, args.output_dir) as table:
+            print(f"[*] {args.table}: {table.row_count} rows")
+            for name, column in table.columns(args.columns).items():
+                print(f"  - `{name}`: {apex_json.dumps(profile_column(column)).decode('utf-8')}")
+        print(f"[*] {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Schema Families
+Fingerprints tables by column signature so structurally identical tables
+(the HSEQ_CLEANING_CHECKLIST_<AREA>_<FREQUENCY> set, the EBA_QPOLL_* tables,
+the backend's id/name lookup tables) are planned once per shape instead of
+once per table.
+
+Backend tables are fingerprinted from their parsed column definitions (names,
+types, nullability, defaults, keys, in order); snapshots from their keys and
+value types as reported by analyze_json_file. A snapshot without rows has no
+shape and is never grouped with anything. APEX tables generated from one
+template are also known by name from the catalogue (CATALOGUE_FAMILIES), so
+they group even when they hold no rows and have no backend table.
+"""
+
+import re
+import json
+import hashlib
+from typing import Dict, List, Optional
+
+FINGERPRINT_LENGTH = 12
+
+# APEX table sets created from one template: catalogue name pattern -> family
+CATALOGUE_FAMILIES = {
+    r'^HSEQ_CLEANING_CHECKLIST_': 'HSEQ_CLEANING_CHECKLIST',
+    r'^EBA_QPOLL_': 'EBA_QPOLL',
+}
+
+
+def fingerprint(signature) -> str:
+    """Short stable hash of a JSON-serialisable signature"""
+    encoded = json.dumps(signature, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def table_fingerprint(table_columns: Dict[str, Dict]) -> str:
+    """Fingerprint of a backend table's columns (as parsed by extract_table_definitions)"""
+    return fingerprint([[column, info] for column, info in table_columns.items()])
+
+
+def snapshot_fingerprint(json_info: Dict) -> str:
+    """Fingerprint of a snapshot's shape (keys and value types from analyze_json_file)"""
+    return fingerprint([json_info.get('keys', []), json_info.get('key_types', {})])
+
+
+def catalogue_fingerprint(apex_table_name: str) -> Optional[str]:
+    """Fingerprint of the template family an APEX table belongs to by name, or None"""
+    for pattern, family in CATALOGUE_FAMILIES.items():
+        if re.match(pattern, apex_table_name):
+            return fingerprint(['catalogue', family])
+    return None
+
+
+def group_families(fingerprints: Dict[str, str]) -> Dict[str, List[str]]:
+    """Tables by fingerprint, members sorted"""
+    families = {}
+    for table_name, table_fp in sorted(fingerprints.items()):
+        families.setdefault(table_fp, []).append(table_name)
+    return families
+
+
+def family_label(members: List[str]) -> str:
+    """Readable name for a family: the common underscore-separated prefix, e.g. HSEQ_CLEANING_CHECKLIST_*"""
+    if len(members) == 1:
+        return members[0]
+    parts = [member.split('_') for member in members]
+    common = []
+    for words in zip(*parts):
+        if len(set(words)) != 1:
+            break
+        common.append(words[0])
+    if not common:
+        return f"{members[0]} (+{len(members) - 1})"
+    return '_'.join(common) + '_*'
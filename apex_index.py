@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+APEX Snapshot Index
+Builds an embedded SQLite store from the apex/ JSON snapshots and answers
+point/range lookups offline (no database server required)
+
+Usage:
+    python apex_index.py build [--force] [--from 2025-01 --to 2025-06]
+    python apex_index.py tables
+    python apex_index.py find file_id 6595
+    python apex_index.py query APPLICANT_TRANSACTION --where file_id=6595
+    python apex_index.py query APPLICANT_TRANSACTION --range created 2023-01-01 2023-12-31
+    python apex_index.py sql "SELECT COUNT(*) FROM APPLICANT_TRANSACTION"
+"""
+
+import re
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+
+from generate_migration_report import analyze_json_file
+import apex_json
+from apex_families import snapshot_fingerprint
+from apex_partitions import (read_partitioned_snapshot, parse_bound, load_manifest, undated_rows_excluded,
+                             MANIFEST_NAME as PARTITION_MANIFEST_NAME)
+
+# Configuration
+JSON_DIR = Path("apex")
+INDEX_DB = Path("apex_index.sqlite")
+META_TABLE = "_snapshots"
+INSERT_BATCH_SIZE = 5000
+DATE_ONLY_PATTERN = r'^\d{4}-\d{2}-\d{2}$'
+SNAPSHOT_NAME_PATTERN = r'^([A-Za-z_][A-Za-z0-9_]*)_(\d{8}_\d{6})(?:\.json|\.parts)$'
+
+# Columns that are always worth an index when present in a snapshot
+KEY_COLUMN_NAMES = {'id', 'file_id', 'file_number', 'transaction_id', 'created', 'timestamp', 'username'}
+
+# JSON value type (as reported by analyze_json_file) -> SQLite column affinity
+SQLITE_TYPE_MAPPINGS = {
+    'int': 'INTEGER',
+    'bool': 'INTEGER',
+    'float': 'REAL',
+    'str': 'TEXT',
+    'dict': 'TEXT',
+    'list': 'TEXT',
+}
+
+
+def quote_identifier(name: str) -> str:
+    """Quote an identifier for use in SQLite statements"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def is_key_column(column: str) -> bool:
+    """Decide whether a snapshot column should be indexed (ids, file numbers and dates)"""
+    col = column.lower()
+    if col in KEY_COLUMN_NAMES:
+        return True
+    if col.endswith('_id') or col.endswith('_date') or col.startswith('date_'):
+        return True
+    return False
+
+
+def find_latest_snapshots(json_dir: Path) -> Dict[str, Path]:
+    """Map each table name to its most recent snapshot (monolithic .json or partitioned .parts)"""
+    latest = {}
+    for json_file in sorted(json_dir.iterdir()):
+        match = re.match(SNAPSHOT_NAME_PATTERN, json_file.name)
+        if not match:
+            continue
+        table_name, timestamp = match.group(1), match.group(2)
+        current = latest.get(table_name)
+        if current is None or timestamp > current[0]:
+            latest[table_name] = (timestamp, json_file)
+    return {table: path for table, (_, path) in latest.items()}
+
+
+def snapshot_fingerprints(json_dir: Path) -> Dict[str, str]:
+    """
+    Shape fingerprint of each table's latest snapshot (see apex_families.py).
+    Snapshots without rows are left out: their empty shape is shared by
+    unrelated tables and says nothing about structure.
+    """
+    fingerprints = {}
+    for table_name, json_path in find_latest_snapshots(json_dir).items():
+        json_info = analyze_json_file(json_path)
+        if json_info is not None and json_info.get('keys'):
+            fingerprints[table_name] = snapshot_fingerprint(json_info)
+    return fingerprints
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a snapshot file in chunks (a partitioned snapshot is identified by its manifest)"""
+    if path.is_dir():
+        path = path / PARTITION_MANIFEST_NAME
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def open_index(db_path: Path) -> sqlite3.Connection:
+    """Open (and initialise) the index database"""
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {META_TABLE} ("
+        "table_name TEXT PRIMARY KEY, source_file TEXT, sha256 TEXT, "
+        "row_count INTEGER, columns TEXT, indexed_columns TEXT, loaded_at TEXT)"
+    )
+    return conn
+
+
+def load_snapshot_items(json_path: Path, start: Optional[date] = None, end: Optional[date] = None) -> List[Dict]:
+    """Load the row objects from an ORDS snapshot (items array or direct array; start/end prune partitions)"""
+    if json_path.is_dir():
+        data = read_partitioned_snapshot(json_path, start, end)
+    else:
+        data = apex_json.load_file(json_path)
+    if isinstance(data, dict) and isinstance(data.get('items'), list):
+        items = data['items']
+    elif isinstance(data, list):
+        items = data
+    elif isinstance(data, dict):
+        items = [data]
+    else:
+        items = []
+    return [item for item in items if isinstance(item, dict)]
+
+
+def to_sqlite_value(value):
+    """Convert a JSON value to something SQLite can store"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def load_table(conn: sqlite3.Connection, table_name: str, json_path: Path, sha256: str,
+               start: Optional[date] = None, end: Optional[date] = None) -> Tuple[int, List[str]]:
+    """(Re)create a table from one snapshot and index its key columns"""
+    json_info = analyze_json_file(json_path, start, end) or {}
+    items = load_snapshot_items(json_path, start, end)
+
+    # analyze_json_file only samples the first rows, so collect keys from every row
+    columns = list(json_info.get('keys', []))
+    seen = set(columns)
+    for item in items:
+        for key in item:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+
+    key_types = json_info.get('key_types', {})
+    quoted_table = quote_identifier(table_name)
+
+    conn.execute(f"DROP TABLE IF EXISTS {quoted_table}")
+    if columns:
+        column_defs = ", ".join(
+            f"{quote_identifier(col)} {SQLITE_TYPE_MAPPINGS.get(key_types.get(col), '')}".rstrip()
+            for col in columns
+        )
+    else:
+        column_defs = "_empty INTEGER"
+    conn.execute(f"CREATE TABLE {quoted_table} ({column_defs})")
+
+    if columns and items:
+        placeholders = ", ".join("?" for _ in columns)
+        insert_sql = (
+            f"INSERT INTO {quoted_table} ({', '.join(quote_identifier(c) for c in columns)}) "
+            f"VALUES ({placeholders})"
+        )
+        for offset in range(0, len(items), INSERT_BATCH_SIZE):
+            batch = items[offset:offset + INSERT_BATCH_SIZE]
+            conn.executemany(insert_sql, (
+                tuple(to_sqlite_value(item.get(col)) for col in columns) for item in batch
+            ))
+
+    # Build indexes after the bulk insert (much cheaper than maintaining them row by row)
+    indexed = [col for col in columns if is_key_column(col)]
+    for col in indexed:
+        index_name = quote_identifier(f"ix_{table_name}_{col}")
+        conn.execute(f"CREATE INDEX {index_name} ON {quoted_table} ({quote_identifier(col)})")
+
+    conn.execute(
+        f"INSERT OR REPLACE INTO {META_TABLE} "
+        "(table_name, source_file, sha256, row_count, columns, indexed_columns, loaded_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (table_name, json_path.name, sha256, len(items), json.dumps(columns),
+         json.dumps(indexed), datetime.now().isoformat(timespec='seconds'))
+    )
+    return len(items), indexed
+
+
+def build_index(json_dir: Path = JSON_DIR, db_path: Path = INDEX_DB, force: bool = False,
+                start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, int]:
+    """
+    Ingest the latest snapshot of every table into the index.
+    Tables whose snapshot hash is unchanged since the last build are skipped.
+    start/end load only the overlapping partitions of partitioned snapshots.
+    """
+    stats = {'loaded': 0, 'unchanged': 0, 'failed': 0, 'removed': 0}
+    snapshots = find_latest_snapshots(json_dir)
+    conn = open_index(db_path)
+
+    try:
+        known = {
+            row[0]: row[1]
+            for row in conn.execute(f"SELECT table_name, sha256 FROM {META_TABLE}")
+        }
+
+        for table_name, json_path in sorted(snapshots.items()):
+            sha256 = file_sha256(json_path)
+            if json_path.is_dir() and (start or end):
+                # A different range is a different load of the same snapshot
+                sha256 = f"{sha256}:{start or ''}..{end or ''}"
+            if not force and known.get(table_name) == sha256:
+                stats['unchanged'] += 1
+                continue
+
+            started = time.perf_counter()
+            try:
+                with conn:
+                    row_count, indexed = load_table(conn, table_name, json_path, sha256, start, end)
+                elapsed = (time.perf_counter() - started) * 1000
+                index_note = f", indexed: {', '.join(indexed)}" if indexed else ""
+                print(f"  [+] {table_name}: {row_count} rows from {json_path.name} ({elapsed:.0f} ms{index_note})")
+                if json_path.is_dir() and (start or end):
+                    excluded = undated_rows_excluded(load_manifest(json_path), start, end)
+                    if excluded:
+                        print(f"      [!] {excluded} undated rows excluded by --from/--to")
+                stats['loaded'] += 1
+            except Exception as e:
+                print(f"  [!] Error loading {json_path.name}: {e}")
+                stats['failed'] += 1
+
+        # Drop tables whose snapshots have disappeared from the directory
+        for table_name in sorted(set(known) - set(snapshots)):
+            with conn:
+                conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(table_name)}")
+                conn.execute(f"DELETE FROM {META_TABLE} WHERE table_name = ?", (table_name,))
+            print(f"  [-] {table_name}: snapshot removed, dropped from index")
+            stats['removed'] += 1
+    finally:
+        conn.close()
+
+    return stats
+
+
+def indexed_tables(conn: sqlite3.Connection) -> Dict[str, Dict]:
+    """Return metadata for every table in the index"""
+    tables = {}
+    for name, source, rows, columns, indexed in conn.execute(
+        f"SELECT table_name, source_file, row_count, columns, indexed_columns FROM {META_TABLE} ORDER BY table_name"
+    ):
+        tables[name] = {
+            'source_file': source,
+            'row_count': rows,
+            'columns': json.loads(columns),
+            'indexed_columns': json.loads(indexed),
+        }
+    return tables
+
+
+def parse_literal(value: str):
+    """Interpret a CLI value as an integer/float when possible, otherwise text"""
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def query_table(conn: sqlite3.Connection, table_name: str, where: Optional[List[str]] = None,
+                range_filter: Optional[List[str]] = None, limit: Optional[int] = None) -> List[Dict]:
+    """Run a point (--where col=value) and/or range (--range col low high) lookup"""
+    clauses = []
+    params = []
+    for condition in where or []:
+        column, _, value = condition.partition('=')
+        clauses.append(f"{quote_identifier(column.strip())} = ?")
+        params.append(parse_literal(value.strip()))
+    if range_filter:
+        column, low, high = range_filter
+        if re.match(DATE_ONLY_PATTERN, high):
+            # Text timestamps compare as strings: "2023-12-31T10:00:00" > "2023-12-31",
+            # so a bare end date means "before the next day" to include the whole day
+            next_day = (datetime.strptime(high, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+            clauses.append(f"{quote_identifier(column)} >= ? AND {quote_identifier(column)} < ?")
+            params.extend([parse_literal(low), next_day])
+        else:
+            clauses.append(f"{quote_identifier(column)} BETWEEN ? AND ?")
+            params.extend([parse_literal(low), parse_literal(high)])
+
+    sql = f"SELECT * FROM {quote_identifier(table_name)}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+
+    cursor = conn.execute(sql, params)
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def find_value(conn: sqlite3.Connection, column: str, value: str, limit: Optional[int] = None) -> Dict[str, List[Dict]]:
+    """Look a value up in every indexed table that has the given column"""
+    results = {}
+    for table_name, info in indexed_tables(conn).items():
+        if column in info['columns']:
+            rows = query_table(conn, table_name, where=[f"{column}={value}"], limit=limit)
+            if rows:
+                results[table_name] = rows
+    return results
+
+
+def print_rows(rows: List[Dict]):
+    """Print rows as JSON lines"""
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False, default=str))
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Embedded indexed query store for apex/ snapshots")
+    parser.add_argument('--db', type=Path, default=INDEX_DB, help=f"Index database (default: {INDEX_DB})")
+    parser.add_argument('--json-dir', type=Path, default=JSON_DIR, help=f"Snapshot directory (default: {JSON_DIR})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Build or incrementally refresh the index")
+    build_parser.add_argument('--force', action='store_true', help="Reload every table even if unchanged")
+    build_parser.add_argument('--from', dest='start', help="Partitioned snapshots: only rows from this date (YYYY-MM or YYYY-MM-DD)")
+    build_parser.add_argument('--to', dest='end', help="Partitioned snapshots: only rows up to this date")
+
+    subparsers.add_parser('tables', help="List indexed tables")
+
+    find_parser = subparsers.add_parser('find', help="Find a value in every table with that column")
+    find_parser.add_argument('column')
+    find_parser.add_argument('value')
+    find_parser.add_argument('--limit', type=int)
+
+    query_parser = subparsers.add_parser('query', help="Point/range lookup in one table")
+    query_parser.add_argument('table')
+    query_parser.add_argument('--where', action='append', metavar='COLUMN=VALUE')
+    query_parser.add_argument('--range', nargs=3, metavar=('COLUMN', 'LOW', 'HIGH'))
+    query_parser.add_argument('--limit', type=int)
+
+    sql_parser = subparsers.add_parser('sql', help="Run a raw SQL statement against the index")
+    sql_parser.add_argument('statement')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print("=" * 70)
+        print("APEX Snapshot Index Builder")
+        print("=" * 70)
+        print(f"[*] Snapshot directory: {args.json_dir}")
+        print(f"[*] Index database: {args.db}")
+        if not args.json_dir.exists():
+            print(f"[!] JSON directory not found: {args.json_dir}")
+            sys.exit(1)
+        started = time.perf_counter()
+        try:
+            start, end = parse_bound(args.start), parse_bound(args.end, upper=True)
+        except ValueError as e:
+            parser.error(str(e))
+        stats = build_index(args.json_dir, args.db, force=args.force, start=start, end=end)
+        print("-" * 70)
+        print(f"[+] Loaded: {stats['loaded']}  Unchanged: {stats['unchanged']}  "
+              f"Removed: {stats['removed']}  Failed: {stats['failed']}")
+        print(f"[+] Completed in {time.perf_counter() - started:.2f}s")
+        return
+
+    if not args.db.exists():
+        print(f"[!] Index not found: {args.db} (run 'python apex_index.py build' first)")
+        sys.exit(1)
+
+    conn = sqlite3.connect(str(args.db))
+    try:
+        started = time.perf_counter()
+        if args.command == 'tables':
+            for name, info in indexed_tables(conn).items():
+                indexed = ', '.join(info['indexed_columns']) or '-'
+                print(f"{name:<50} {info['row_count']:>8} rows  [{indexed}]")
+        elif args.command == 'find':
+            results = find_value(conn, args.column, args.value, limit=args.limit)
+            for table_name, rows in results.items():
+                print(f"## {table_name} ({len(rows)} rows)")
+                print_rows(rows)
+            if not results:
+                print(f"[!] No rows with {args.column} = {args.value}")
+        elif args.command == 'query':
+            print_rows(query_table(conn, args.table, args.where, args.range, args.limit))
+        elif args.command == 'sql':
+            cursor = conn.execute(args.statement)
+            if cursor.description:
+                names = [d[0] for d in cursor.description]
+                print_rows(dict(zip(names, row)) for row in cursor.fetchall())
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"[*] {elapsed:.1f} ms", file=sys.stderr)
+    except sqlite3.Error as e:
+        print(f"[!] Query failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
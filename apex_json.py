@@ -0,0 +1,130 @@
+"""
+Snapshot JSON Codec
+Shared by every tool that reads or writes apex/ snapshots
+
+Uses the fastest JSON library installed (orjson, then ujson) and falls back
+to the stdlib json module. The API is bytes in / bytes out, so snapshots go
+straight from the socket or file to objects without an intermediate str.
+
+Decoded values match json.loads and errors are the stdlib's: anything the
+fast library rejects (invalid JSON, non-str keys, unsupported types) is
+retried with json, so callers keep catching json.JSONDecodeError / TypeError
+as before. orjson reads integers beyond 64 bits as floats without an error,
+so input with a run of 19 or more digits is decoded by json instead.
+
+Encoded output is the same JSON but not the same bytes across backends:
+orjson writes compact output without spaces ({"a":1.0,"b":1e16} where
+json.dumps writes {"a": 1.0, "b": 1e+16}) and formats some floats
+differently in indent mode too. Compare snapshots by decoded value, not by
+bytes, when they may have been written by different backends.
+
+Set APEX_JSON_BACKEND=json to force the stdlib (e.g. to compare output).
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+AVAILABLE_BACKENDS = ['json'] + (['ujson'] if ujson else []) + (['orjson'] if orjson else [])
+
+
+def _select_backend() -> str:
+    requested = os.environ.get('APEX_JSON_BACKEND')
+    if requested in AVAILABLE_BACKENDS:
+        return requested
+    return AVAILABLE_BACKENDS[-1]
+
+
+BACKEND = _select_backend()
+
+# Digits map to "0" and everything else to " ", so a long number is one bytes.find away
+_DIGITS_AS_ZERO = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+_LONG_DIGIT_RUN = b'0' * 19
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def _has_long_digit_run(data: Union[bytes, str]) -> bool:
+    """Whether data holds 19+ digits in a row (an integer that may not fit in 64 bits)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return _LONG_DIGIT_RUN in data.translate(_DIGITS_AS_ZERO)
+
+
+def _orjson_loads(data: Union[bytes, str]) -> Any:
+    if _has_long_digit_run(data):
+        return json.loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+
+def _orjson_dumps(obj: Any, indent: bool = False) -> bytes:
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    except TypeError:
+        return _json_dumps(obj, indent)
+
+
+def _ujson_loads(data: Union[bytes, str]) -> Any:
+    try:
+        return ujson.loads(data)
+    except (ValueError, OverflowError):
+        return json.loads(data)
+
+
+def _ujson_dumps(obj: Any, indent: bool = False) -> bytes:
+    try:
+        return ujson.dumps(obj, ensure_ascii=False, indent=2 if indent else 0,
+                           escape_forward_slashes=False).encode('utf-8')
+    except (TypeError, OverflowError):
+        return _json_dumps(obj, indent)
+
+
+CODECS = {
+    'json': (_json_loads, _json_dumps),
+    'orjson': (_orjson_loads, _orjson_dumps),
+    'ujson': (_ujson_loads, _ujson_dumps),
+}
+
+_loads, _dumps = CODECS[BACKEND]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON from bytes (or str)"""
+    return _loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Encode to UTF-8 JSON bytes; indent=True for 2-space indentation"""
+    return _dumps(obj, indent)
+
+
+def load_file(path: Path) -> Any:
+    """Read and decode a JSON file"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def dump_file(obj: Any, path: Path, indent: bool = False) -> None:
+    """Encode and write a JSON file"""
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, indent))
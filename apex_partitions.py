@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+APEX Time-Partitioned Snapshots
+Stores log-style tables (USER_LOGS, WALKING, VISITOR_REGISTRATION, EBA_QPOLL_*_LOG)
+as one JSON file per month plus a manifest, so range reads skip old history
+
+Layout:
+    apex/<TABLE>_<timestamp>.parts/_manifest.json
+    apex/<TABLE>_<timestamp>.parts/<YYYY-MM>.json   (ORDS-shaped: {"items": [...]})
+    apex/<TABLE>_<timestamp>.parts/_undated.json    (rows without a usable date)
+
+Usage:
+    python apex_partitions.py split [--table TABLE]          # partition monolithic snapshots (source kept as .json.split)
+    python apex_partitions.py info TABLE
+    python apex_partitions.py export TABLE --from 2025-09 --to 2025-09 [--include-undated] [-o out.json]
+
+Range reads (--from/--to) leave out the _undated partition unless asked to keep
+it; every tool that reads a range reports how many rows that excluded.
+"""
+
+import re
+import argparse
+from pathlib import Path
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import apex_json
+
+# Configuration
+JSON_DIR = Path("apex")
+PARTITION_SUFFIX = ".parts"
+MANIFEST_NAME = "_manifest.json"
+UNDATED_PARTITION = "_undated"
+SPLIT_SOURCE_SUFFIX = ".split"  # A monolithic snapshot becomes <name>.json.split once partitioned
+SNAPSHOT_NAME_PATTERN = r'^([A-Za-z_][A-Za-z0-9_]*)_(\d{8}_\d{6})\.json$'
+
+# Log-style tables and the column they are partitioned by.
+# None means "detect the date column from the data".
+PARTITIONED_TABLES = {
+    'USER_LOGS': 'login_date',
+    'WALKING': 'walking_date',
+    'VISITOR_REGISTRATION': None,
+}
+PARTITIONED_TABLE_PATTERNS = [
+    (r'^EBA_QPOLL_.*_LOG$', None),
+]
+
+# Column-name hints used when the date column has to be detected
+DATE_COLUMN_HINTS = ['date', 'created', 'timestamp', 'time', 'logged']
+
+# Formats seen in ORDS output ("2025-01-09T00:00:00Z", "01-Sep-2024", ...)
+DATE_FORMATS = ['%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d', '%d-%b-%Y', '%d-%b-%y', '%d/%m/%Y']
+
+
+def partition_column_for(table_name: str) -> Tuple[bool, Optional[str]]:
+    """Return (is_partitioned, configured date column) for a table"""
+    if table_name in PARTITIONED_TABLES:
+        return True, PARTITIONED_TABLES[table_name]
+    for pattern, column in PARTITIONED_TABLE_PATTERNS:
+        if re.match(pattern, table_name):
+            return True, column
+    return False, None
+
+
+def parse_date(value) -> Optional[date]:
+    """Parse an ORDS date value, returning None if it is not a recognisable date"""
+    if not isinstance(value, str) or not value:
+        return None
+    text = value.strip()
+    # Fast path for ISO strings, with or without time/zone parts
+    if len(text) >= 10 and text[4] == '-' and text[7] == '-':
+        try:
+            return date(int(text[0:4]), int(text[5:7]), int(text[8:10]))
+        except ValueError:
+            pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def detect_date_column(items: List[Dict]) -> Optional[str]:
+    """Pick the date-like column with the most parseable values in a sample of rows"""
+    sample = [item for item in items[:200] if isinstance(item, dict)]
+    if not sample:
+        return None
+    candidates = []
+    for key in sample[0].keys():
+        if any(hint in key.lower() for hint in DATE_COLUMN_HINTS):
+            parsed = sum(1 for item in sample if parse_date(item.get(key)) is not None)
+            if parsed:
+                candidates.append((parsed, key))
+    if not candidates:
+        return None
+    return max(candidates)[1]
+
+
+def parse_bound(value: Optional[str], upper: bool = False) -> Optional[date]:
+    """Parse a --from/--to bound; YYYY-MM means the first (or last) day of that month"""
+    if not value:
+        return None
+    if re.match(r'^\d{4}-\d{2}$', value):
+        year, month = int(value[:4]), int(value[5:7])
+        if not upper:
+            return date(year, month, 1)
+        return month_end(year, month)
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"Unrecognised date: {value}")
+    return parsed
+
+
+def month_end(year: int, month: int) -> date:
+    """Last day of a month"""
+    if month == 12:
+        return date(year, 12, 31)
+    return date(year, month + 1, 1) - timedelta(days=1)
+
+
+def write_partitioned_snapshot(table_name: str, data: Dict, output_dir: Path, timestamp: str,
+                               date_column: Optional[str] = None) -> Optional[Path]:
+    """
+    Write an ORDS response as monthly partitions.
+    Returns the partition directory, or None if the data has no usable date column
+    (callers should then fall back to a monolithic snapshot).
+    """
+    items = data.get('items') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return None
+
+    date_column = date_column or detect_date_column(items)
+    if not date_column and items:
+        return None
+
+    partitions: Dict[str, List[Dict]] = {}
+    bounds: Dict[str, List[date]] = {}
+    for item in items:
+        parsed = parse_date(item.get(date_column)) if date_column and isinstance(item, dict) else None
+        key = f"{parsed.year:04d}-{parsed.month:02d}" if parsed else UNDATED_PARTITION
+        partitions.setdefault(key, []).append(item)
+        if parsed:
+            low_high = bounds.setdefault(key, [parsed, parsed])
+            if parsed < low_high[0]:
+                low_high[0] = parsed
+            if parsed > low_high[1]:
+                low_high[1] = parsed
+
+    part_dir = output_dir / f"{table_name}_{timestamp}{PARTITION_SUFFIX}"
+    part_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {
+        'table': table_name,
+        'timestamp': timestamp,
+        'date_column': date_column,
+        'row_count': len(items),
+        'metadata': {k: v for k, v in data.items() if k != 'items'},
+        'partitions': {},
+    }
+    for key in sorted(partitions):
+        file_name = f"{key}.json"
+        apex_json.dump_file({'items': partitions[key]}, part_dir / file_name, indent=True)
+        entry = {'file': file_name, 'row_count': len(partitions[key])}
+        if key in bounds:
+            entry['min'] = bounds[key][0].isoformat()
+            entry['max'] = bounds[key][1].isoformat()
+        manifest['partitions'][key] = entry
+
+    # Manifest last: a directory without one is an incomplete write
+    apex_json.dump_file(manifest, part_dir / MANIFEST_NAME, indent=True)
+    return part_dir
+
+
+def load_manifest(part_dir: Path) -> Dict:
+    """Read a partition directory's manifest"""
+    return apex_json.load_file(Path(part_dir) / MANIFEST_NAME)
+
+
+def select_partitions(manifest: Dict, start: Optional[date] = None, end: Optional[date] = None,
+                      include_undated: bool = False) -> List[str]:
+    """
+    Return the partition keys overlapping [start, end], using the manifest min/max.
+    Undated rows cannot be placed in a range: they are read without one, or with include_undated.
+    """
+    selected = []
+    for key, entry in manifest['partitions'].items():
+        if key == UNDATED_PARTITION:
+            if include_undated or (start is None and end is None):
+                selected.append(key)
+            continue
+        if start and date.fromisoformat(entry['max']) < start:
+            continue
+        if end and date.fromisoformat(entry['min']) > end:
+            continue
+        selected.append(key)
+    return sorted(selected)
+
+
+def undated_rows_excluded(manifest: Dict, start: Optional[date] = None, end: Optional[date] = None,
+                          include_undated: bool = False) -> int:
+    """Number of rows a read of [start, end] leaves out because they have no usable date"""
+    if UNDATED_PARTITION in select_partitions(manifest, start, end, include_undated):
+        return 0
+    return manifest['partitions'].get(UNDATED_PARTITION, {}).get('row_count', 0)
+
+
+def read_partitioned_snapshot(part_dir: Path, start: Optional[date] = None, end: Optional[date] = None,
+                              include_undated: bool = False) -> Dict:
+    """
+    Read a partitioned snapshot back into ORDS shape, loading only the partitions
+    that overlap [start, end]. Rows in boundary partitions are filtered exactly;
+    undated rows are only part of a range read with include_undated.
+    """
+    part_dir = Path(part_dir)
+    manifest = load_manifest(part_dir)
+    date_column = manifest.get('date_column')
+    items = []
+
+    for key in select_partitions(manifest, start, end, include_undated):
+        entry = manifest['partitions'][key]
+        rows = apex_json.load_file(part_dir / entry['file']).get('items', [])
+        fully_inside = key == UNDATED_PARTITION or (
+            (start is None or date.fromisoformat(entry['min']) >= start) and
+            (end is None or date.fromisoformat(entry['max']) <= end)
+        )
+        if fully_inside:
+            items.extend(rows)
+        else:
+            for row in rows:
+                parsed = parse_date(row.get(date_column))
+                if parsed and (start is None or parsed >= start) and (end is None or parsed <= end):
+                    items.append(row)
+
+    result = dict(manifest.get('metadata', {}))
+    result['items'] = items
+    return result
+
+
+def find_partitioned_snapshots(json_dir: Path) -> Dict[str, Path]:
+    """Map each table to its most recent partitioned snapshot directory"""
+    latest = {}
+    for part_dir in sorted(json_dir.glob(f"*{PARTITION_SUFFIX}")):
+        match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)_(\d{8}_\d{6})' + re.escape(PARTITION_SUFFIX) + '$', part_dir.name)
+        if match and part_dir.is_dir() and (part_dir / MANIFEST_NAME).exists():
+            table_name, timestamp = match.group(1), match.group(2)
+            if table_name not in latest or timestamp > latest[table_name][0]:
+                latest[table_name] = (timestamp, part_dir)
+    return {table: path for table, (_, path) in latest.items()}
+
+
+def split_existing_snapshots(json_dir: Path, tables: Optional[List[str]] = None) -> int:
+    """Partition monolithic snapshots of log-style tables that are already on disk"""
+    count = 0
+    for json_file in sorted(json_dir.glob("*.json")):
+        match = re.match(SNAPSHOT_NAME_PATTERN, json_file.name)
+        if not match:
+            continue
+        table_name, timestamp = match.group(1), match.group(2)
+        partitioned, date_column = partition_column_for(table_name)
+        if tables and table_name not in tables:
+            continue
+        if not tables and not partitioned:
+            continue
+
+        data = apex_json.load_file(json_file)
+        part_dir = write_partitioned_snapshot(table_name, data, json_dir, timestamp, date_column)
+        if part_dir is None:
+            print(f"  [!] {table_name}: no date column found, left as {json_file.name}")
+            continue
+        # Move the source aside once the partitions read back complete, so the .parts directory
+        # (same timestamp) is the snapshot find_latest_snapshots and the report pick up
+        items = data.get('items', []) if isinstance(data, dict) else []
+        if len(read_partitioned_snapshot(part_dir)['items']) != len(items):
+            print(f"  [!] {table_name}: partitions do not hold every row, kept {json_file.name}")
+            continue
+        json_file.rename(json_file.with_name(json_file.name + SPLIT_SOURCE_SUFFIX))
+        manifest = load_manifest(part_dir)
+        print(f"  [+] {table_name}: {manifest['row_count']} rows -> {len(manifest['partitions'])} partitions "
+              f"by `{manifest['date_column']}` ({part_dir.name})")
+        count += 1
+    return count
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Time-partitioned storage for log-style apex/ tables")
+    parser.add_argument('--json-dir', type=Path, default=JSON_DIR, help=f"Snapshot directory (default: {JSON_DIR})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    split_parser = subparsers.add_parser('split', help="Partition existing monolithic snapshots")
+    split_parser.add_argument('--table', action='append', help="Table to partition (default: all log-style tables)")
+
+    info_parser = subparsers.add_parser('info', help="Show the partition manifest for a table")
+    info_parser.add_argument('table')
+
+    export_parser = subparsers.add_parser('export', help="Write rows in a date range as one ORDS-shaped JSON file")
+    export_parser.add_argument('table')
+    export_parser.add_argument('--from', dest='start', help="Start date (YYYY-MM or YYYY-MM-DD)")
+    export_parser.add_argument('--to', dest='end', help="End date (YYYY-MM or YYYY-MM-DD)")
+    export_parser.add_argument('--include-undated', action='store_true',
+                               help="Also export rows without a usable date")
+    export_parser.add_argument('-o', '--output', type=Path, help="Output file (default: <TABLE>_<from>_<to>.json)")
+
+    args = parser.parse_args()
+
+    if args.command == 'split':
+        print(f"[*] Partitioning snapshots in {args.json_dir}...")
+        count = split_existing_snapshots(args.json_dir, args.table)
+        print(f"[+] Partitioned {count} snapshots")
+        return
+
+    snapshots = find_partitioned_snapshots(args.json_dir)
+    part_dir = snapshots.get(args.table)
+    if part_dir is None:
+        print(f"[!] No partitioned snapshot found for {args.table}")
+        return
+
+    if args.command == 'info':
+        manifest = load_manifest(part_dir)
+        print(f"[*] {part_dir.name}: {manifest['row_count']} rows by `{manifest['date_column']}`")
+        for key, entry in manifest['partitions'].items():
+            span = f"{entry.get('min', '-')} .. {entry.get('max', '-')}"
+            print(f"  - {key}: {entry['row_count']:>7} rows  {span}")
+        return
+
+    if args.command == 'export':
+        start = parse_bound(args.start)
+        end = parse_bound(args.end, upper=True)
+        manifest = load_manifest(part_dir)
+        selected = select_partitions(manifest, start, end, args.include_undated)
+        data = read_partitioned_snapshot(part_dir, start, end, args.include_undated)
+        output = args.output or Path(f"{args.table}_{args.start or 'start'}_{args.end or 'end'}.json")
+        apex_json.dump_file(data, output, indent=True)
+        print(f"[+] Read {len(selected)}/{len(manifest['partitions'])} partitions, "
+              f"{len(data['items'])} rows -> {output}")
+        excluded = undated_rows_excluded(manifest, start, end, args.include_undated)
+        if excluded:
+            print(f"[!] {excluded} rows without a usable `{manifest['date_column']}` excluded "
+                  f"(--include-undated keeps them)")
+
+
+if __name__ == "__main__":
+    main()
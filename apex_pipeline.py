@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Streaming Fetch -> Transform -> Load Pipeline
+Moves a table from ORDS into the database in one pass: pages flow from the
+fetcher through mapping/coercion into a database or COPY-file sink over
+bounded queues, instead of fetch -> dump to disk -> re-read for the report ->
+re-read again for the SQL converters.
+
+Each stage runs in its own thread. Queues hold at most --queue-depth pages or
+batches, so a slow sink blocks the fetcher (backpressure) and memory stays
+flat whatever the table size. Pages are also teed to a normal
+<TABLE>_<timestamp>.json snapshot for audit; it is written under a temporary
+name and renamed only when the table is complete.
+
+Sinks:
+    --sqlite PATH     local SQLite stand-in (schema created from the SQL file)
+    --dsn DSN         PostgreSQL with the schema applied (needs psycopg2)
+    --copy-dir DIR    <Table>.copy.sql files in COPY ... FROM stdin format for psql
+
+Usage:
+    python apex_pipeline.py --table SUBURB --table APPLICANT_COMMENTS:Comments --sqlite migration_test.sqlite
+    python apex_pipeline.py --table APPLICANT_TRANSACTION --copy-dir copy_out --hedge
+"""
+
+import time
+import queue
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import apex_json
+import generate_migration_report as report_tool
+import fetch_apex_data as fetcher
+from load_scheduler import (SQLiteTarget, PostgresTarget, build_dependency_graph, build_rows, dependency_levels,
+                            insert_batch, insert_statement, parse_secondary_indexes, plan_table_load)
+
+# Configuration
+JSON_DIR = Path("apex")
+QUEUE_DEPTH = 4        # Pages (fetch -> transform) and batches (transform -> sink) in flight
+BATCH_SIZE = 500
+ANALYZE_SAMPLE = 10    # Rows the mapping is planned from (same sample as analyze_json_file)
+
+_DONE = object()       # End-of-stream marker passed down the queues
+
+
+class StageStats:
+    """Work done by one stage and time spent waiting on its neighbours"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.rows = 0
+        self.busy_s = 0.0
+        self.starved_s = 0.0   # Waiting for input
+        self.blocked_s = 0.0   # Waiting for space downstream (backpressure)
+        self.max_queue = 0
+
+    def summary(self) -> str:
+        return (f"{self.name:<10} {self.items:>6} msgs {self.rows:>9} rows  busy {self.busy_s:6.2f}s  "
+                f"starved {self.starved_s:6.2f}s  blocked {self.blocked_s:6.2f}s")
+
+
+class Pipeline:
+    """Bounded queues between stage threads, with shared failure signalling"""
+
+    def __init__(self, queue_depth: int = QUEUE_DEPTH):
+        self.queue_depth = queue_depth
+        self.failed = threading.Event()
+        self.errors: List[str] = []
+
+    def new_queue(self) -> queue.Queue:
+        return queue.Queue(maxsize=self.queue_depth)
+
+    def put(self, q: queue.Queue, item, stats: StageStats):
+        started = time.perf_counter()
+        while not self.failed.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        stats.blocked_s += time.perf_counter() - started
+        stats.max_queue = max(stats.max_queue, q.qsize())
+
+    def get(self, q: queue.Queue, stats: StageStats):
+        started = time.perf_counter()
+        while not self.failed.is_set():
+            try:
+                item = q.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        else:
+            item = _DONE
+        stats.starved_s += time.perf_counter() - started
+        return item
+
+    def run_stage(self, name: str, func, *args) -> threading.Thread:
+        def runner():
+            try:
+                func(*args)
+            except Exception as e:
+                self.errors.append(f"{name}: {e}")
+                self.failed.set()
+        thread = threading.Thread(target=runner, name=name, daemon=True)
+        thread.start()
+        return thread
+
+
+class SnapshotTee:
+    """Streams pages into an ORDS-shaped snapshot; renamed into place on close()"""
+
+    def __init__(self, table_name: str, output_dir: Path):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = output_dir / f"{table_name}_{timestamp}.json"
+        # ".json.tmp" stays out of the <TABLE>_<timestamp>.json pattern until complete
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.f = open(self.tmp_path, 'wb')
+        self.f.write(b'{\n  "items": [')
+        self.count = 0
+        self.links = {}
+
+    def write_page(self, page: Dict):
+        if not self.links:
+            self.links = {k: v for k, v in page.items() if k not in ('items', 'next')}
+        for item in page['items']:
+            self.f.write(b',\n    ' if self.count else b'\n    ')
+            self.f.write(apex_json.dumps(item))
+            self.count += 1
+
+    def close(self) -> Path:
+        self.f.write(b'\n  ]')
+        if self.links:
+            self.f.write(b',\n' + apex_json.dumps(self.links, indent=True)[2:])
+        else:
+            self.f.write(b'\n}')
+        self.f.write(b'\n')
+        self.f.close()
+        self.tmp_path.replace(self.path)
+        return self.path
+
+    def abort(self):
+        self.f.close()
+        self.tmp_path.unlink()
+
+
+def copy_escape(value) -> str:
+    """A value in PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    text = str(value)
+    return (text.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class CopyFileSink:
+    """
+    Writes rows as a psql-runnable COPY ... FROM stdin script. The script is
+    written under a temporary name and renamed only when the table is complete.
+    """
+
+    booleans_as_int = False
+
+    def __init__(self, output_dir: Path, table_name: str):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.path = output_dir / f"{table_name}.copy.sql"
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.table_name = table_name
+        self.f = None
+
+    def start(self, columns: List[str], plan: Dict):
+        self.f = open(self.tmp_path, 'w', encoding='utf-8')
+        self.f.write(f"COPY {self.table_name} ({', '.join(columns)}) FROM stdin;\n")
+
+    def write(self, batch: List[tuple], result: Dict):
+        self.f.writelines('\t'.join(copy_escape(v) for v in row) + '\n' for row in batch)
+        result['loaded'] += len(batch)
+
+    def finish(self):
+        if self.f:
+            self.f.write('\\.\n')
+            self.f.close()
+            self.tmp_path.replace(self.path)
+
+    def abort(self):
+        """Drop the truncated script; a previous complete one is left as it was"""
+        if self.f:
+            self.f.close()
+            self.tmp_path.unlink()
+
+
+class DatabaseSink:
+    """
+    Batched inserts through a load_scheduler target (SQLite or PostgreSQL). The
+    whole table is one transaction, so a failed table leaves no partial rows;
+    each batch runs under a savepoint and falls back to row-by-row rejection.
+    """
+
+    def __init__(self, target, table_name: str, table_info: Dict):
+        self.target = target
+        self.booleans_as_int = target.booleans_as_int
+        self.table_name = table_name
+        self.table_info = table_info
+        self.conn = None
+        self.sql = None
+
+    def start(self, columns: List[str], plan: Dict):
+        self.conn = self.target.connect()
+        self.sql = insert_statement(self.table_name, columns, plan['primary_key'], plan['strategy'],
+                                    self.target.placeholder, lambda name: self.target.quote(self.conn, name))
+        self.target.begin(self.conn)
+
+    def write(self, batch: List[tuple], result: Dict):
+        insert_batch(self.target, self.conn.cursor(), self.sql, batch, result)
+
+    def finish(self):
+        if self.conn:
+            try:
+                self.target.commit(self.conn)
+                self.target.reset_sequence(self.conn, self.table_name, self.table_info)
+            finally:
+                self.conn.close()
+
+    def abort(self):
+        """Roll back every row of the table loaded so far"""
+        if self.conn:
+            try:
+                self.target.rollback(self.conn)
+            finally:
+                self.conn.close()
+
+
+def resolve_backend_table(apex_table: str, tables: Dict[str, Dict]) -> Optional[str]:
+    """Backend table the report would fill from this APEX table"""
+    for table_name in tables:
+        if report_tool.find_json_file(table_name, {apex_table: Path(apex_table)}):
+            return table_name
+    return None
+
+
+def run_table_pipeline(apex_table: str, table_name: str, table_info: Dict, sink, tee_dir: Optional[Path],
+                       queue_depth: int = QUEUE_DEPTH, batch_size: int = BATCH_SIZE,
+                       fetch_options: Optional[Dict] = None) -> Dict:
+    """Stream one table: fetch stage -> transform stage -> sink stage"""
+    pipeline = Pipeline(queue_depth)
+    pages_q = pipeline.new_queue()
+    batches_q = pipeline.new_queue()
+    stats = {name: StageStats(name) for name in ('fetch', 'transform', 'load')}
+    result = {'rows': 0, 'loaded': 0, 'rejected': 0, 'errors': [], 'category': None}
+    tee = SnapshotTee(apex_table, tee_dir) if tee_dir else None
+
+    # A stage ends its output with _DONE only on success; on an exception the
+    # runner sets pipeline.failed, which ends the later stages instead
+    def fetch_stage():
+        s = stats['fetch']
+        started = time.perf_counter()
+        for page in fetcher.iter_table_pages(apex_table, **(fetch_options or {})):
+            if pipeline.failed.is_set():
+                break
+            if not isinstance(page, dict) or not isinstance(page.get('items'), list):
+                raise ValueError("response is not an ORDS collection")
+            if tee:
+                tee.write_page(page)
+            s.items += 1
+            s.rows += len(page['items'])
+            s.busy_s += time.perf_counter() - started
+            pipeline.put(pages_q, page['items'], s)
+            started = time.perf_counter()
+        pipeline.put(pages_q, _DONE, s)
+
+    def transform_stage():
+        s = stats['transform']
+        plan = None
+        columns = []
+        while True:
+            items = pipeline.get(pages_q, s)
+            if items is _DONE or pipeline.failed.is_set():
+                break
+            started = time.perf_counter()
+            if plan is None:
+                # Plan the mapping from the first page, the way the report samples a snapshot
+                sample = [item for item in items[:ANALYZE_SAMPLE] if isinstance(item, dict)]
+                json_info = {'keys': sorted({key for item in sample for key in item}),
+                             'total_count': len(items)}
+                plan = plan_table_load(table_name, table_info, json_info) or {}
+                result['category'] = 'load' if plan else 'skip'
+                result['unloaded_keys'] = plan.get('unloaded_keys', {})
+                columns = sorted(plan.get('columns', {}))
+                if plan:
+                    pipeline.put(batches_q, ('start', columns, plan), s)
+            s.items += 1
+            if not plan:
+                # Not migratable: keep draining so the snapshot is still teed
+                s.busy_s += time.perf_counter() - started
+                continue
+            rows = build_rows(items, plan, columns, sink.booleans_as_int)
+            s.rows += len(rows)
+            s.busy_s += time.perf_counter() - started
+            for offset in range(0, len(rows), batch_size):
+                pipeline.put(batches_q, rows[offset:offset + batch_size], s)
+        pipeline.put(batches_q, _DONE, s)
+
+    def load_stage():
+        s = stats['load']
+        complete = False
+        try:
+            while True:
+                batch = pipeline.get(batches_q, s)
+                if batch is _DONE:
+                    break
+                started = time.perf_counter()
+                if isinstance(batch, tuple) and batch[0] == 'start':
+                    sink.start(batch[1], batch[2])
+                else:
+                    sink.write(batch, result)
+                    s.items += 1
+                    s.rows += len(batch)
+                s.busy_s += time.perf_counter() - started
+            complete = not pipeline.failed.is_set()
+        finally:
+            # Only a table that streamed through every stage is kept
+            if complete:
+                sink.finish()
+            else:
+                sink.abort()
+
+    started = time.perf_counter()
+    threads = [pipeline.run_stage(name, func) for name, func in
+               (('fetch', fetch_stage), ('transform', transform_stage), ('load', load_stage))]
+    for thread in threads:
+        thread.join()
+
+    result['rows'] = stats['fetch'].rows
+    result['seconds'] = time.perf_counter() - started
+    result['stages'] = stats
+    if pipeline.errors:
+        result['failed'] = "; ".join(pipeline.errors)
+    if tee:
+        if 'failed' in result:
+            tee.abort()
+        else:
+            result['snapshot'] = tee.close()
+    return result
+
+
+def parse_table_argument(value: str, tables: Dict[str, Dict]) -> Optional[tuple]:
+    """APEX_TABLE[:Backend_Table] -> (apex table, backend table)"""
+    apex_table, _, table_name = value.partition(':')
+    table_name = table_name or resolve_backend_table(apex_table, tables)
+    if not table_name or table_name not in tables:
+        return None
+    return apex_table, table_name
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Stream APEX tables from ORDS straight into the database")
+    parser.add_argument('--table', action='append', required=True,
+                        help="APEX table to stream, optionally APEX_TABLE:Backend_Table (repeatable)")
+    sink_group = parser.add_mutually_exclusive_group(required=True)
+    sink_group.add_argument('--sqlite', type=Path, help="Load into a local SQLite stand-in database")
+    sink_group.add_argument('--dsn', help="Load into PostgreSQL (schema already applied)")
+    sink_group.add_argument('--copy-dir', type=Path, help="Write COPY FROM stdin scripts to this directory")
+    parser.add_argument('--tee-dir', type=Path, default=JSON_DIR, help=f"Snapshot audit copies (default: {JSON_DIR})")
+    parser.add_argument('--no-tee', action='store_true', help="Do not write audit snapshots")
+    parser.add_argument('--queue-depth', type=int, default=QUEUE_DEPTH,
+                        help=f"Pages/batches buffered between stages (default: {QUEUE_DEPTH})")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f"Rows per insert batch (default: {BATCH_SIZE})")
+    parser.add_argument('--schema', type=Path, help="Schema file (default: the report tool's schema)")
+    parser.add_argument('--table-deadline', type=float, default=fetcher.TABLE_DEADLINE)
+    parser.add_argument('--page-deadline', type=float, default=fetcher.PAGE_DEADLINE)
+    parser.add_argument('--hedge', action='store_true', help="Hedge slow page requests (see fetch_apex_data.py)")
+    args = parser.parse_args()
+
+    schema_file = args.schema or Path(report_tool.resolve_schema_file())
+
+    print("=" * 70)
+    print("Streaming Fetch -> Transform -> Load Pipeline")
+    print("=" * 70)
+
+    tables = report_tool.extract_table_definitions(str(schema_file))
+    if not tables:
+        return
+    parents = build_dependency_graph(tables)
+
+    jobs = []
+    for value in args.table:
+        job = parse_table_argument(value, tables)
+        if job is None:
+            print(f"[!] No backend table found for {value}; use APEX_TABLE:Backend_Table")
+            continue
+        jobs.append(job)
+    # Parents before children, so foreign keys hold while streaming one table at a time
+    levels, cyclic = dependency_levels(parents)
+    order = {table: i for i, table in enumerate([t for level in levels for t in level] + cyclic)}
+    jobs.sort(key=lambda job: order[job[1]])
+
+    target = None
+    if args.sqlite:
+        target = SQLiteTarget(args.sqlite)
+        target.create_schema(tables, parents, parse_secondary_indexes(schema_file, tables))
+    elif args.dsn:
+        target = PostgresTarget(args.dsn)
+
+    fetch_options = {'table_deadline': args.table_deadline, 'page_deadline': args.page_deadline, 'hedge': args.hedge}
+    tee_dir = None if args.no_tee else args.tee_dir
+
+    failed = set()
+    try:
+        for apex_table, table_name in jobs:
+            print(f"\n[*] {apex_table} -> {table_name}")
+            failed_parents = parents[table_name] & failed
+            if failed_parents:
+                print(f"  [-] Skipped, {', '.join(sorted(failed_parents))} failed")
+                failed.add(table_name)
+                continue
+            sink = DatabaseSink(target, table_name, tables[table_name]) if target else CopyFileSink(args.copy_dir, table_name)
+            result = run_table_pipeline(apex_table, table_name, tables[table_name], sink, tee_dir,
+                                        args.queue_depth, args.batch_size, fetch_options)
+            for stage in result['stages'].values():
+                print(f"    {stage.summary()}")
+            if 'failed' in result:
+                print(f"  [!] Failed: {result['failed']}")
+                failed.add(table_name)
+                continue
+            if result['category'] == 'skip':
+                print(f"  [-] Not migratable by the report's mapping; {result['rows']} rows teed only")
+            else:
+                rejected = f", {result['rejected']} rejected" if result['rejected'] else ""
+                print(f"  [+] {result['loaded']}/{result['rows']} rows{rejected} in {result['seconds']:.2f}s")
+                for error in result['errors']:
+                    print(f"      {error}")
+                for json_key, column in sorted(result.get('unloaded_keys', {}).items()):
+                    print(f"  [!] `{json_key}` not loaded, another key already fills `{column}`")
+            if result.get('snapshot'):
+                print(f"  [+] Snapshot: {result['snapshot']}")
+    finally:
+        fetcher.shutdown_request_pool()
+
+
+if __name__ == "__main__":
+    main()
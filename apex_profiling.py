@@ -0,0 +1,254 @@
+"""
+Phase Timing and Profiling Hooks
+Shared by fetch_apex_data.py and generate_migration_report.py (--profile)
+
+Code marks phases with `with profile_span("download"):`. Spans nest, and
+repeated spans with the same name under the same parent are aggregated
+(count / total / max), so per-table loops stay readable. When no profiler
+is active, spans cost a single function call.
+
+Optional extras:
+    cpu     cProfile for the whole run, saved as .pstats plus collapsed stacks
+            (flamegraph.pl / speedscope input) estimated from the call graph
+    memory  tracemalloc peak per span
+"""
+
+import json
+import time
+import cProfile
+import pstats
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Collapsed-stack estimation limits
+COLLAPSED_MAX_DEPTH = 64
+COLLAPSED_MIN_SECONDS = 1e-5
+
+
+class SpanNode:
+    """Aggregated timings for one span path"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.peak_memory_bytes = 0
+        self.children: Dict[str, 'SpanNode'] = {}
+
+    def child(self, name: str) -> 'SpanNode':
+        if name not in self.children:
+            self.children[name] = SpanNode(name)
+        return self.children[name]
+
+    def to_dict(self) -> Dict:
+        result = {
+            'name': self.name,
+            'count': self.count,
+            'total_s': round(self.total_s, 6),
+            'max_s': round(self.max_s, 6),
+        }
+        if self.peak_memory_bytes:
+            result['peak_memory_bytes'] = self.peak_memory_bytes
+        if self.children:
+            result['children'] = [c.to_dict() for c in self.children.values()]
+        return result
+
+
+class Profiler:
+    """Records nested phase spans, optionally with cProfile and tracemalloc"""
+
+    def __init__(self, name: str, cpu: bool = False, memory: bool = False):
+        self.name = name
+        self.cpu = cpu
+        self.memory = memory
+        self.root = SpanNode(name)
+        self._stack: List[SpanNode] = [self.root]
+        self._peaks: List[int] = [0]
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._started = 0.0
+        self.started_at = None
+
+    def start(self):
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._started = time.perf_counter()
+        if self.memory:
+            tracemalloc.start()
+        if self.cpu:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile:
+            self._cprofile.disable()
+        if self.memory and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            self._peaks[0] = max(self._peaks[0], peak)
+            self.root.peak_memory_bytes = self._peaks[0]
+            tracemalloc.stop()
+        self.root.count = 1
+        self.root.total_s = self.root.max_s = time.perf_counter() - self._started
+
+    @contextmanager
+    def span(self, name: str):
+        node = self._stack[-1].child(name)
+        if self.memory:
+            # Fold the peak reached so far into the parent before measuring this span alone
+            _, peak = tracemalloc.get_traced_memory()
+            self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+        self._stack.append(node)
+        self._peaks.append(0)
+        started = time.perf_counter()
+        try:
+            yield node
+        finally:
+            elapsed = time.perf_counter() - started
+            node.count += 1
+            node.total_s += elapsed
+            node.max_s = max(node.max_s, elapsed)
+            self._stack.pop()
+            span_peak = self._peaks.pop()
+            if self.memory:
+                _, peak = tracemalloc.get_traced_memory()
+                span_peak = max(span_peak, peak)
+                node.peak_memory_bytes = max(node.peak_memory_bytes, span_peak)
+                self._peaks[-1] = max(self._peaks[-1], span_peak)
+                tracemalloc.reset_peak()
+
+    def collapsed_stacks(self) -> List[str]:
+        """
+        Estimate collapsed stacks ("a;b;c <microseconds>") from the cProfile
+        call graph. cProfile only records caller->callee edges, so time in a
+        function reached through several callers is split by edge weight.
+        """
+        if not self._cprofile:
+            return []
+        stats = pstats.Stats(self._cprofile).stats
+
+        def label(func) -> str:
+            filename, line, name = func
+            return f"{name} ({Path(filename).name}:{line})" if line else name
+
+        callees: Dict = {}
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, []).append((func, edge[3]))
+
+        totals: Dict[str, float] = {}
+
+        def walk(func, path: List[str], seconds: float, depth: int):
+            _, _, tottime, cumtime, _ = stats[func]
+            if cumtime <= 0:
+                return
+            fraction = seconds / cumtime
+            own = tottime * fraction
+            if own >= COLLAPSED_MIN_SECONDS:
+                key = ";".join(path)
+                totals[key] = totals.get(key, 0.0) + own
+            if depth >= COLLAPSED_MAX_DEPTH:
+                return
+            for callee, edge_cumtime in callees.get(func, []):
+                share = edge_cumtime * fraction
+                if share < COLLAPSED_MIN_SECONDS or label(callee) in path:
+                    continue
+                walk(callee, path + [label(callee)], share, depth + 1)
+
+        roots = [func for func, entry in stats.items() if not entry[4]]
+        for root in roots:
+            walk(root, [label(root)], stats[root][3], 0)
+
+        return [f"{stack} {int(seconds * 1e6)}" for stack, seconds in sorted(totals.items()) if seconds * 1e6 >= 1]
+
+    def save(self, output_path: Path) -> List[Path]:
+        """Write the span tree as JSON (plus .pstats / .collapsed.txt when cpu profiling)"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        written = [output_path]
+        result = {
+            'tool': self.name,
+            'started_at': self.started_at,
+            'cpu_profile': self.cpu,
+            'memory_profile': self.memory,
+            'spans': self.root.to_dict(),
+        }
+
+        if self._cprofile:
+            stem = output_path.with_suffix('')
+            pstats_path = stem.with_name(stem.name + '.pstats')
+            collapsed_path = stem.with_name(stem.name + '.collapsed.txt')
+            self._cprofile.dump_stats(str(pstats_path))
+            with open(collapsed_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(self.collapsed_stacks()) + "\n")
+            result['pstats_file'] = pstats_path.name
+            result['collapsed_stacks_file'] = collapsed_path.name
+            written += [pstats_path, collapsed_path]
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        return written
+
+    def summary_lines(self) -> List[str]:
+        """Indented text summary of the span tree"""
+        lines = []
+
+        def walk(node: SpanNode, depth: int):
+            memory = f"  peak {node.peak_memory_bytes / 1024 / 1024:.1f} MiB" if node.peak_memory_bytes else ""
+            count = f" x{node.count}" if node.count > 1 else ""
+            lines.append(f"{'  ' * depth}- {node.name}{count}: {node.total_s:.3f}s{memory}")
+            for child in node.children.values():
+                walk(child, depth + 1)
+
+        walk(self.root, 0)
+        return lines
+
+
+_active_profiler: Optional[Profiler] = None
+
+
+def start_profiler(name: str, cpu: bool = False, memory: bool = False) -> Profiler:
+    """Create and activate the process-wide profiler"""
+    global _active_profiler
+    _active_profiler = Profiler(name, cpu=cpu, memory=memory)
+    _active_profiler.start()
+    return _active_profiler
+
+
+def stop_profiler() -> Optional[Profiler]:
+    """Deactivate the process-wide profiler and return it"""
+    global _active_profiler
+    profiler = _active_profiler
+    _active_profiler = None
+    if profiler:
+        profiler.stop()
+    return profiler
+
+
+@contextmanager
+def _null_span():
+    yield None
+
+
+def profile_span(name: str):
+    """Context manager timing a phase under the active profiler (no-op if none)"""
+    if _active_profiler is None:
+        return _null_span()
+    return _active_profiler.span(name)
+
+
+def add_profile_arguments(parser):
+    """Add the shared --profile options to an argparse parser"""
+    parser.add_argument('--profile', action='store_true',
+                        help="Record phase timings to a JSON file next to the output")
+    parser.add_argument('--profile-cpu', action='store_true',
+                        help="Also capture cProfile data (.pstats + collapsed stacks); implies --profile")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Also record tracemalloc peaks per phase; implies --profile")
+
+
+def profile_requested(args) -> bool:
+    """True if any of the --profile options was given"""
+    return args.profile or args.profile_cpu or args.profile_memory
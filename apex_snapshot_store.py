@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+APEX Snapshot Store
+Keeps the history of apex/ pulls deduplicated: every snapshot file is split
+into content-defined chunks, each unique chunk is stored once (zlib
+compressed, named by its SHA-256) and every ingest writes a pull manifest
+listing the chunks of its files. Any historical snapshot is rebuilt from
+its chunks on demand.
+
+A table that did not change between pulls costs one manifest entry; a table
+with a few changed rows costs the chunks around those rows. Chunk boundaries
+come from a rolling hash over line hashes (snapshots are written indented,
+one value per line), so inserting or deleting rows only disturbs the chunks
+that contain them. Lines longer than CHUNK_MAX_SIZE are cut at fixed offsets.
+
+Layout:
+    apex_store/chunks/<2 hex>/<sha256>    zlib-compressed chunk
+    apex_store/pulls/<pull_id>.json       files of one ingest and their chunk lists
+
+Usage:
+    python apex_snapshot_store.py ingest [--prune]
+    python apex_snapshot_store.py pulls
+    python apex_snapshot_store.py stats
+    python apex_snapshot_store.py restore APPLICANT_20260103_204114.json [-o restored]
+    python apex_snapshot_store.py restore --as-of 20260103_235959 [--table APPLICANT] [-o restored]
+    python apex_snapshot_store.py restore --pull 20260104_060000 [-o restored]
+"""
+
+import os
+import re
+import sys
+import zlib
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import apex_json
+from apex_index import SNAPSHOT_NAME_PATTERN, find_latest_snapshots
+
+# Configuration
+JSON_DIR = Path("apex")
+STORE_DIR = Path("apex_store")
+FORMAT_VERSION = 1
+CHUNK_MIN_SIZE = 16 * 1024    # Never cut a chunk smaller than this
+CHUNK_MAX_SIZE = 256 * 1024   # Always cut by this size
+CHUNK_MASK = 0xFFC00000       # About one line in 1024 ends a chunk once past the minimum
+COMPRESS_LEVEL = 6
+
+
+def iter_chunks(data: bytes) -> Iterator[bytes]:
+    """Split a file into content-defined chunks at line boundaries"""
+    view = memoryview(data)
+    length = len(data)
+    start = pos = 0
+    rolling = 0
+    while pos < length:
+        end = data.find(b'\n', pos) + 1 or length
+        if end - start > CHUNK_MAX_SIZE:
+            # Cut before the line that overflows, or inside a line that is too long by itself
+            cut = pos if pos > start else start + CHUNK_MAX_SIZE
+            yield data[start:cut]
+            start = pos = cut
+            continue
+        rolling = ((rolling << 1) + zlib.crc32(view[pos:end])) & 0xFFFFFFFF
+        pos = end
+        if end - start >= CHUNK_MIN_SIZE and not rolling & CHUNK_MASK:
+            yield data[start:end]
+            start = end
+    if start < length:
+        yield data[start:]
+
+
+def snapshot_members(json_dir: Path, snapshot: Path) -> List[str]:
+    """Relative paths of the files making up one snapshot (each part of a partitioned one)"""
+    if snapshot.is_dir():
+        return [path.relative_to(json_dir).as_posix() for path in sorted(snapshot.rglob('*')) if path.is_file()]
+    return [snapshot.name]
+
+
+def snapshot_files(json_dir: Path) -> List[str]:
+    """Relative paths of every snapshot file in json_dir"""
+    paths = []
+    for entry in sorted(json_dir.iterdir()):
+        if re.match(SNAPSHOT_NAME_PATTERN, entry.name):
+            paths.extend(snapshot_members(json_dir, entry))
+    return paths
+
+
+def snapshot_key(relative_path: str) -> Optional[tuple]:
+    """(table, timestamp, top-level snapshot name) for a stored path"""
+    top = relative_path.split('/', 1)[0]
+    match = re.match(SNAPSHOT_NAME_PATTERN, top)
+    if not match:
+        return None
+    return match.group(1), match.group(2), top
+
+
+class SnapshotStore:
+    """Chunk directory plus one manifest per ingested pull"""
+
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = root
+        self.chunks_dir = root / "chunks"
+        self.pulls_dir = root / "pulls"
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self.pulls_dir.mkdir(parents=True, exist_ok=True)
+
+    def chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def put_chunk(self, chunk: bytes) -> tuple:
+        """Store a chunk unless it is already known; returns (digest, compressed bytes written)"""
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self.chunk_path(digest)
+        if path.exists():
+            return digest, 0
+        compressed = zlib.compress(chunk, COMPRESS_LEVEL)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(digest + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        return digest, len(compressed)
+
+    def pull_ids(self) -> List[str]:
+        return sorted(path.stem for path in self.pulls_dir.glob("*.json"))
+
+    def load_pull(self, pull_id: str) -> Dict:
+        return apex_json.load_file(self.pulls_dir / f"{pull_id}.json")
+
+    def stored_files(self) -> Dict[str, Dict]:
+        """Every stored file entry by relative path (a later pull wins if a path was ingested twice)"""
+        entries = {}
+        for pull_id in self.pull_ids():
+            for entry in self.load_pull(pull_id)['files']:
+                entries[entry['path']] = dict(entry, pull_id=pull_id)
+        return entries
+
+    def new_pull_id(self) -> str:
+        pull_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        suffix = 1
+        while (self.pulls_dir / f"{pull_id}.json").exists():
+            suffix += 1
+            pull_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        return pull_id
+
+    def ingest(self, json_dir: Path) -> Dict:
+        """Store every snapshot file not ingested yet as a new pull"""
+        stats = {'pull_id': None, 'files': 0, 'unchanged_files': 0, 'bytes': 0,
+                 'chunks': 0, 'new_chunks': 0, 'stored_bytes': 0}
+        stored = self.stored_files()
+        by_sha = {entry['sha256']: entry['chunks'] for entry in stored.values()}
+        files = []
+
+        for relative_path in snapshot_files(json_dir):
+            if relative_path in stored:
+                continue
+            data = (json_dir / relative_path).read_bytes()
+            sha256 = hashlib.sha256(data).hexdigest()
+            chunks = by_sha.get(sha256)
+            if chunks is not None:
+                # Byte-for-byte identical to a stored file: reuse its chunk list
+                stats['unchanged_files'] += 1
+            else:
+                chunks = []
+                for chunk in iter_chunks(data):
+                    digest, written = self.put_chunk(chunk)
+                    chunks.append(digest)
+                    if written:
+                        stats['new_chunks'] += 1
+                        stats['stored_bytes'] += written
+                by_sha[sha256] = chunks
+            files.append({'path': relative_path, 'size': len(data), 'sha256': sha256, 'chunks': chunks})
+            stats['files'] += 1
+            stats['bytes'] += len(data)
+            stats['chunks'] += len(chunks)
+
+        if not files:
+            return stats
+
+        pull_id = self.new_pull_id()
+        manifest = {
+            'format_version': FORMAT_VERSION,
+            'pull_id': pull_id,
+            'created': datetime.now().isoformat(),
+            'source': str(json_dir),
+            'files': files,
+        }
+        tmp_path = self.pulls_dir / f"{pull_id}.json.tmp"
+        apex_json.dump_file(manifest, tmp_path, indent=True)
+        os.replace(tmp_path, self.pulls_dir / f"{pull_id}.json")
+        stats['pull_id'] = pull_id
+        return stats
+
+    def read_file(self, entry: Dict) -> bytes:
+        """Rebuild a stored file from its chunks and check it against the recorded hash"""
+        data = b''.join(zlib.decompress(self.chunk_path(digest).read_bytes()) for digest in entry['chunks'])
+        if hashlib.sha256(data).hexdigest() != entry['sha256']:
+            raise ValueError(f"{entry['path']}: rebuilt content does not match its SHA-256")
+        return data
+
+    def restore(self, entries: List[Dict], output_dir: Path) -> int:
+        """Write stored files under output_dir; returns bytes written"""
+        written = 0
+        for entry in entries:
+            target = output_dir / entry['path']
+            target.parent.mkdir(parents=True, exist_ok=True)
+            data = self.read_file(entry)
+            with open(target, 'wb') as f:
+                f.write(data)
+            written += len(data)
+        return written
+
+    def select_as_of(self, timestamp: str, tables: Optional[List[str]] = None) -> List[Dict]:
+        """Files of the newest snapshot of each table taken at or before timestamp"""
+        stored = self.stored_files()
+        latest = {}
+        for entry in stored.values():
+            key = snapshot_key(entry['path'])
+            if key is None or key[1] > timestamp or (tables and key[0] not in tables):
+                continue
+            table_name, snapshot_time, top = key
+            if table_name not in latest or snapshot_time > latest[table_name][0]:
+                latest[table_name] = (snapshot_time, top)
+        wanted = {top for _, top in latest.values()}
+        return [entry for entry in stored.values() if snapshot_key(entry['path'])[2] in wanted]
+
+    def stats(self) -> Dict:
+        """Logical size of all pulls against what the chunk directory holds"""
+        logical = 0
+        files = 0
+        for pull_id in self.pull_ids():
+            for entry in self.load_pull(pull_id)['files']:
+                logical += entry['size']
+                files += 1
+        chunk_files = [path for path in self.chunks_dir.rglob('*') if path.is_file() and path.suffix != '.tmp']
+        return {
+            'pulls': len(self.pull_ids()),
+            'files': files,
+            'logical_bytes': logical,
+            'chunks': len(chunk_files),
+            'stored_bytes': sum(path.stat().st_size for path in chunk_files),
+        }
+
+
+def prune_snapshots(store: SnapshotStore, json_dir: Path) -> int:
+    """Delete stored snapshots from json_dir, keeping the newest one per table; returns snapshots removed"""
+    stored = store.stored_files()
+    keep = {path.name for path in find_latest_snapshots(json_dir).values()}
+    removed = 0
+    for entry in sorted(json_dir.iterdir()):
+        if entry.name in keep or not re.match(SNAPSHOT_NAME_PATTERN, entry.name):
+            continue
+        members = snapshot_members(json_dir, entry)
+        if not members or any(member not in stored for member in members):
+            print(f"  [!] {entry.name}: not fully stored, kept")
+            continue
+        # Only delete what rebuilds byte-for-byte
+        for member in members:
+            store.read_file(stored[member])
+        if entry.is_dir():
+            shutil.rmtree(entry)
+        else:
+            entry.unlink()
+        removed += 1
+    return removed
+
+
+def format_size(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Deduplicated, compressed history of APEX snapshot pulls")
+    parser.add_argument('--json-dir', type=Path, default=JSON_DIR, help=f"Snapshot directory (default: {JSON_DIR})")
+    parser.add_argument('--store-dir', type=Path, default=STORE_DIR, help=f"Snapshot store (default: {STORE_DIR})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help="Store every snapshot not ingested yet as a new pull")
+    ingest_parser.add_argument('--prune', action='store_true',
+                               help="Then delete stored snapshots from the snapshot directory, keeping the newest per table")
+
+    subparsers.add_parser('pulls', help="List ingested pulls")
+    subparsers.add_parser('stats', help="Compare logical history size with stored size")
+
+    restore_parser = subparsers.add_parser('restore', help="Rebuild snapshots from the store")
+    restore_parser.add_argument('names', nargs='*', help="Snapshot names (e.g. APPLICANT_20260103_204114.json)")
+    restore_parser.add_argument('--as-of', help="Newest snapshot of each table at or before YYYYMMDD_HHMMSS")
+    restore_parser.add_argument('--table', action='append', help="With --as-of, only this table (repeatable)")
+    restore_parser.add_argument('--pull', help="Every file of one pull")
+    restore_parser.add_argument('-o', '--output-dir', type=Path, default=Path("restored"),
+                                help="Where to write the files (default: restored)")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store_dir)
+
+    if args.command == 'ingest':
+        if not args.json_dir.exists():
+            print(f"[!] Snapshot directory not found: {args.json_dir}")
+            sys.exit(1)
+        print(f"[*] Ingesting {args.json_dir} into {args.store_dir}...")
+        stats = store.ingest(args.json_dir)
+        if stats['pull_id'] is None:
+            print("[*] Nothing new to ingest")
+        else:
+            print(f"[+] Pull {stats['pull_id']}: {stats['files']} files ({format_size(stats['bytes'])}), "
+                  f"{stats['unchanged_files']} unchanged since an earlier pull")
+            print(f"[+] {stats['new_chunks']}/{stats['chunks']} chunks new, "
+                  f"{format_size(stats['stored_bytes'])} added to the store")
+        if args.prune:
+            removed = prune_snapshots(store, args.json_dir)
+            print(f"[+] Pruned {removed} older snapshots from {args.json_dir}")
+    elif args.command == 'pulls':
+        for pull_id in store.pull_ids():
+            manifest = store.load_pull(pull_id)
+            size = sum(entry['size'] for entry in manifest['files'])
+            print(f"  {pull_id}  {len(manifest['files']):>5} files  {format_size(size):>10}  from {manifest['source']}")
+    elif args.command == 'stats':
+        stats = store.stats()
+        print(f"[*] {stats['pulls']} pulls, {stats['files']} files, {format_size(stats['logical_bytes'])} of history")
+        print(f"[*] {stats['chunks']} unique chunks, {format_size(stats['stored_bytes'])} on disk")
+        if stats['stored_bytes']:
+            print(f"[+] {stats['logical_bytes'] / stats['stored_bytes']:.1f}x smaller than keeping every pull")
+    elif args.command == 'restore':
+        if args.pull:
+            entries = store.load_pull(args.pull)['files']
+        elif args.as_of:
+            entries = store.select_as_of(args.as_of, args.table)
+        elif args.names:
+            stored = store.stored_files()
+            entries = [entry for entry in stored.values()
+                       if entry['path'] in args.names or entry['path'].split('/', 1)[0] in args.names]
+            missing = set(args.names) - {entry['path'].split('/', 1)[0] for entry in entries}
+            for name in sorted(missing):
+                print(f"[!] Not in the store: {name}")
+        else:
+            parser.error("restore needs snapshot names, --as-of or --pull")
+        if not entries:
+            print("[!] Nothing to restore")
+            sys.exit(1)
+        written = store.restore(entries, args.output_dir)
+        print(f"[+] Restored {len(entries)} files ({format_size(written)}) to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+APEX Migration Tools Benchmark
+Times each stage of the report pipeline (schema parse, snapshot analysis,
+column matching, mapping, full report) on real and synthetic datasets and
+records peak memory, writing machine-readable results
+
+Usage:
+    python benchmark_apex_tools.py                       # real apex/ data only
+    python benchmark_apex_tools.py --scales 10 100       # also 10x and 100x synthetic data
+    python benchmark_apex_tools.py --compare benchmark_results/benchmark_<ts>.json
+    python benchmark_apex_tools.py --codecs                # also JSON codecs on the largest snapshots
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import apex_json
+import generate_migration_report as report_tool
+from generate_synthetic_apex import generate_dataset, SYNTHETIC_DIR
+
+# Configuration
+JSON_DIR = Path("apex")
+RESULTS_DIR = Path("benchmark_results")
+DEFAULT_REPEAT = 3
+REGRESSION_THRESHOLD = 0.20  # Flag stages that got more than 20% slower
+CODEC_FILES = 5  # Largest snapshots used for the JSON codec comparison
+
+
+def measure(func: Callable, repeat: int = DEFAULT_REPEAT) -> Dict:
+    """
+    Run func `repeat` times; report best/mean wall time and the peak traced
+    memory of a separate, traced run (tracing slows the timed runs otherwise).
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'best_s': min(timings),
+        'mean_s': sum(timings) / len(timings),
+        'runs': len(timings),
+        'peak_memory_bytes': peak,
+        'result': result,
+    }
+
+
+def snapshot_files(json_dir: Path) -> List[Path]:
+    """All snapshot files in a dataset directory"""
+    return sorted(json_dir.glob("*.json"))
+
+
+def run_stages(schema_file: Path, json_dir: Path, repeat: int) -> Dict[str, Dict]:
+    """Benchmark every stage of the report pipeline on one dataset"""
+    stages = {}
+    files = snapshot_files(json_dir)
+
+    def parse_schema():
+        return report_tool.extract_table_definitions(str(schema_file))
+
+    stages['extract_table_definitions'] = measure(parse_schema, repeat)
+    tables = stages['extract_table_definitions']['result']
+
+    def analyze_all():
+        return {path.name: report_tool.analyze_json_file(path) for path in files}
+
+    stages['analyze_json_file'] = measure(analyze_all, repeat)
+    analyses = stages['analyze_json_file']['result']
+
+    # Cross product of every snapshot key against every table: the matching hot loop
+    all_keys = sorted({key for info in analyses.values() if info for key in info['keys']})
+
+    def match_all():
+        matched = 0
+        for table_name, table_info in tables.items():
+            for key in all_keys:
+                if report_tool.find_best_column_match(key, table_info['columns'], table_name):
+                    matched += 1
+        return matched
+
+    stages['find_best_column_match'] = measure(match_all, repeat)
+    stages['find_best_column_match']['calls'] = len(all_keys) * len(tables)
+
+    def map_all():
+        return sum(
+            len(report_tool.map_json_to_table(info['keys'], table_info['columns'], table_name)['mapping'])
+            for info in analyses.values() if info
+            for table_name, table_info in tables.items()
+        )
+
+    stages['map_json_to_table'] = measure(map_all, repeat)
+
+    def full_report():
+        return len(report_tool.generate_report(tables, files))
+
+    stages['generate_report'] = measure(full_report, repeat)
+
+    for stage in stages.values():
+        stage.pop('result', None)
+    return stages
+
+
+def run_codec_benchmark(json_dir: Path, repeat: int, count: int = CODEC_FILES) -> Dict[str, Dict]:
+    """Decode and encode the largest snapshots with every installed JSON backend"""
+    largest = sorted(snapshot_files(json_dir), key=lambda path: path.stat().st_size, reverse=True)[:count]
+    payloads = [path.read_bytes() for path in largest]
+    objects = [apex_json.loads(payload) for payload in payloads]
+    results = {'files': [path.name for path in largest], 'bytes': sum(len(p) for p in payloads), 'backends': {}}
+
+    for backend in apex_json.AVAILABLE_BACKENDS:
+        loads, dumps = apex_json.CODECS[backend]
+        decode = measure(lambda: [loads(payload) for payload in payloads], repeat)
+        encode = measure(lambda: [dumps(obj, True) for obj in objects], repeat)
+        decode.pop('result')
+        encode.pop('result')
+        results['backends'][backend] = {'decode': decode, 'encode': encode}
+    return results
+
+
+def dataset_info(json_dir: Path) -> Dict:
+    """Size of a dataset on disk"""
+    files = snapshot_files(json_dir)
+    return {
+        'path': str(json_dir),
+        'files': len(files),
+        'bytes': sum(path.stat().st_size for path in files),
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Return human-readable regressions of current vs a previous results file"""
+    regressions = []
+    for dataset, info in current['datasets'].items():
+        base_stages = baseline.get('datasets', {}).get(dataset, {}).get('stages', {})
+        for stage, stats in info['stages'].items():
+            base = base_stages.get(stage)
+            if not base or not base.get('best_s'):
+                continue
+            change = stats['best_s'] / base['best_s'] - 1
+            if change > threshold:
+                regressions.append(
+                    f"{dataset}/{stage}: {base['best_s']*1000:.1f} ms -> {stats['best_s']*1000:.1f} ms ({change:+.0%})"
+                )
+    return regressions
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Benchmark the APEX migration tools")
+    parser.add_argument('--scales', type=int, nargs='*', default=[], help="Synthetic scales to include (e.g. 10 100 1000)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help=f"Timed runs per stage (default: {DEFAULT_REPEAT})")
+    parser.add_argument('--schema', type=Path, help="Schema file (default: the report tool's schema)")
+    parser.add_argument('--output', type=Path, help=f"Results file (default: {RESULTS_DIR}/benchmark_<timestamp>.json)")
+    parser.add_argument('--compare', type=Path, help="Previous results file to check for regressions")
+    parser.add_argument('--codecs', action='store_true', help="Also compare JSON backends on the largest snapshots")
+    args = parser.parse_args()
+
+    schema_file = args.schema or Path(report_tool.resolve_schema_file())
+
+    print("=" * 70)
+    print("APEX Migration Tools Benchmark")
+    print("=" * 70)
+    print(f"[*] Schema file: {schema_file}")
+
+    datasets = {'real': JSON_DIR}
+    for scale in args.scales:
+        scale_dir = SYNTHETIC_DIR / f"scale_{scale}x"
+        if not scale_dir.exists() or not snapshot_files(scale_dir):
+            print(f"[*] Generating {scale}x synthetic dataset...")
+            generate_dataset(scale, JSON_DIR, scale_dir)
+        datasets[f"scale_{scale}x"] = scale_dir
+
+    results = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'schema_file': str(schema_file),
+        'datasets': {},
+    }
+
+    for name, json_dir in datasets.items():
+        print(f"\n[*] Dataset: {name} ({json_dir})")
+        info = dataset_info(json_dir)
+        # The report tool prints progress; keep the benchmark output readable
+        stdout = sys.stdout
+        with open(os.devnull, 'w') as devnull:
+            sys.stdout = devnull
+            try:
+                stages = run_stages(schema_file, json_dir, args.repeat)
+            finally:
+                sys.stdout = stdout
+        info['stages'] = stages
+        results['datasets'][name] = info
+        for stage, stats in stages.items():
+            print(f"  - {stage:<28} best {stats['best_s']*1000:>10.1f} ms  "
+                  f"peak {stats['peak_memory_bytes'] / 1024 / 1024:>8.1f} MiB")
+
+    if args.codecs:
+        codecs = run_codec_benchmark(JSON_DIR, args.repeat)
+        results['codecs'] = codecs
+        print(f"\n[*] JSON codecs on {len(codecs['files'])} largest snapshots "
+              f"({codecs['bytes'] / 1024 / 1024:.1f} MiB, active backend: {apex_json.BACKEND})")
+        for backend, stats in codecs['backends'].items():
+            print(f"  - {backend:<8} decode {stats['decode']['best_s']*1000:>8.1f} ms  "
+                  f"encode {stats['encode']['best_s']*1000:>8.1f} ms")
+
+    output = args.output or RESULTS_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n[+] Results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline)
+        if regressions:
+            print(f"[!] {len(regressions)} regressions vs {args.compare}:")
+            for line in regressions:
+                print(f"    {line}")
+            sys.exit(1)
+        print(f"[+] No regressions vs {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Column Relationship Discovery (MinHash / LSH)
+Finds likely foreign keys and column correspondences across apex/ snapshots
+from their values rather than their names (e.g. APPLICANT_TRANSACTION.assistance_required
+-> ASSISTANCE_REQUIRED.assist_id, or file_id vs file_number)
+
+One streaming pass keeps two fixed-size sketches per column, updated value by
+value: a one-permutation MinHash signature (one hash per value, NUM_PERMUTATIONS
+bins) and a bottom-k (KMV) sample of the smallest value hashes. Signatures are
+banded into LSH buckets to find same-valued columns (Jaccard); foreign keys,
+where a small child column sits inside a large parent and Jaccard is low, come
+from an inverted index over the KMV samples instead, which estimates
+containment directly. Foreign-key candidates are then verified exactly in a
+second pass that reads only the columns involved.
+
+Usage:
+    python discover_column_relationships.py [--min-containment 0.7] [--output column_relationships.json]
+"""
+
+import json
+import math
+import time
+import heapq
+import hashlib
+import argparse
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from apex_index import find_latest_snapshots, load_snapshot_items
+from generate_migration_report import normalize_name, RELATIONSHIPS_FILE
+
+# Configuration
+JSON_DIR = Path("apex")
+NUM_PERMUTATIONS = 64     # One-permutation MinHash bins
+LSH_BANDS = 32            # NUM_PERMUTATIONS must equal LSH_BANDS * rows per band
+KMV_SIZE = 1024           # Smallest value hashes kept per column (exact below this many distinct values)
+MIN_DISTINCT_VALUES = 5   # Flags/enums with fewer distinct values match everything
+MIN_CONTAINMENT = 0.7     # Child values found in the parent for an FK candidate
+MIN_KEY_UNIQUENESS = 0.8  # Parent distinct/non-null ratio (some APEX lookups hold duplicate ids)
+MIN_CORRESPONDENCE = 0.7  # Jaccard for "same values, different name" pairs
+MAX_CHANCE_CONTAINMENT = 0.01  # Integer pairs this likely to overlap by chance need a name hint
+CHANCE_WINDOW = 10             # Ids either side of a child value used to gauge the parent's local density
+MIN_UNNAMED_INT_DISTINCT = 20  # Integer columns with fewer distinct values need a name hint to be a foreign key
+MAX_CANDIDATES_PER_COLUMN = 3  # Small integer lookup ids overlap a lot; keep the best few
+
+MAX_HASH = (1 << 61) - 1
+EMPTY_BIN = MAX_HASH + 1
+
+
+def normalize_value(value) -> Optional[str]:
+    """Canonical text for a value, so 14, 14.0 and "14" hash alike"""
+    if value is None or isinstance(value, (dict, list, bool)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip().lower()
+    return text or None
+
+
+def base_hash(text: str) -> int:
+    """Stable 61-bit hash of a normalized value"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little') & MAX_HASH
+
+
+class ColumnSketch:
+    """Fixed-size sketches of one column, updated as values stream past"""
+
+    def __init__(self, table: str, column: str):
+        self.table = table
+        self.column = column
+        self.non_null = 0
+        self.bins = [EMPTY_BIN] * NUM_PERMUTATIONS
+        self.signature: List = []
+        self.kmv: List[int] = []      # max-heap (negated) of the KMV_SIZE smallest hashes
+        self.kmv_set = set()          # the same hashes, for membership tests
+        self.all_int = True           # every value is a non-negative integer
+        self.int_max = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.table}.{self.column}"
+
+    @property
+    def kmv_threshold(self) -> int:
+        """Largest hash in the KMV sample (MAX_HASH while the sample holds every distinct value)"""
+        return -self.kmv[0] if len(self.kmv) >= KMV_SIZE else MAX_HASH
+
+    @property
+    def distinct(self) -> int:
+        """Distinct values: exact below KMV_SIZE, estimated from the k-th smallest hash above it"""
+        if len(self.kmv) < KMV_SIZE:
+            return len(self.kmv)
+        return int((KMV_SIZE - 1) * MAX_HASH / self.kmv_threshold)
+
+    @property
+    def is_unique(self) -> bool:
+        if len(self.kmv) < KMV_SIZE:
+            return self.non_null > 0 and self.distinct == self.non_null
+        # The estimate is within a few percent at this sample size
+        return self.distinct >= self.non_null * 0.95
+
+    @property
+    def is_key_like(self) -> bool:
+        return self.non_null > 0 and self.distinct >= self.non_null * MIN_KEY_UNIQUENESS
+
+    def add(self, value):
+        text = normalize_value(value)
+        if text is None:
+            return
+        self.non_null += 1
+        if self.all_int:
+            if text.isdigit():
+                self.int_max = max(self.int_max, int(text))
+            else:
+                self.all_int = False
+        h = base_hash(text)
+        slot = h % NUM_PERMUTATIONS
+        if h < self.bins[slot]:
+            self.bins[slot] = h
+        if h in self.kmv_set:
+            return
+        if len(self.kmv) < KMV_SIZE:
+            heapq.heappush(self.kmv, -h)
+            self.kmv_set.add(h)
+        elif h < -self.kmv[0]:
+            self.kmv_set.discard(-heapq.heappushpop(self.kmv, -h))
+            self.kmv_set.add(h)
+
+    def finish(self):
+        """Fill empty bins from the next non-empty one (rotation densification)"""
+        filled = [i for i, value in enumerate(self.bins) if value != EMPTY_BIN]
+        self.signature = []
+        if not filled:
+            return
+        for i in range(NUM_PERMUTATIONS):
+            j = i
+            while self.bins[j] == EMPTY_BIN:
+                j = (j + 1) % NUM_PERMUTATIONS
+            self.signature.append((self.bins[j], (j - i) % NUM_PERMUTATIONS))
+
+
+def sketch_snapshot(table_name: str, items: List[Dict]) -> List[ColumnSketch]:
+    """Stream a snapshot's rows once, sketching every column"""
+    sketches: Dict[str, ColumnSketch] = {}
+    for item in items:
+        for column, value in item.items():
+            sketch = sketches.get(column)
+            if sketch is None:
+                sketch = sketches[column] = ColumnSketch(table_name, column)
+            sketch.add(value)
+    result = []
+    for sketch in sketches.values():
+        if sketch.distinct >= MIN_DISTINCT_VALUES:
+            sketch.finish()
+            result.append(sketch)
+    return result
+
+
+def estimate_jaccard(a: ColumnSketch, b: ColumnSketch) -> float:
+    """Fraction of matching signature slots"""
+    same = sum(1 for x, y in zip(a.signature, b.signature) if x == y)
+    return same / len(a.signature)
+
+
+def estimate_containment(child: ColumnSketch, parent: ColumnSketch) -> float:
+    """
+    |child ∩ parent| / |child| from the KMV samples: every parent value hashing
+    below the parent's threshold is in its sample, so the child's sampled values
+    below both thresholds are checked against it (exact while both are small)
+    """
+    threshold = min(child.kmv_threshold, parent.kmv_threshold)
+    sampled = [h for h in child.kmv_set if h <= threshold]
+    if not sampled:
+        return 0.0
+    return sum(1 for h in sampled if h in parent.kmv_set) / len(sampled)
+
+
+def name_affinity(child_column: str, parent_table: str, parent_column: str) -> float:
+    """0..1 hint that a child column refers to a parent by name (marital_status -> MARITAL_STATUS)"""
+    child = normalize_name(child_column)
+    for suffix in ('id', 'number', 'no'):
+        if child.endswith(suffix) and len(child) > len(suffix):
+            child = child[:-len(suffix)]
+            break
+    table = normalize_name(parent_table)
+    column = normalize_name(parent_column)
+    if child == table or child == column:
+        return 1.0
+    if child and (child in table or table in child):
+        return 0.75
+    if child and (child in column or column in child):
+        return 0.5
+    return 0.0
+
+
+def is_own_key(sketch: ColumnSketch) -> bool:
+    """Whether a column looks like its own table's id (id, attach_id in APPLICANT_ATTACHMENT, ...)"""
+    return normalize_name(sketch.column) == 'id' or name_affinity(sketch.column, sketch.table, '') >= 0.75
+
+
+def lsh_candidate_pairs(sketches: List[ColumnSketch], bands: int = LSH_BANDS) -> set:
+    """Pairs of sketch indexes that share at least one band bucket (similar value sets)"""
+    rows = len(sketches[0].signature) // bands if sketches else 0
+    candidates = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        for index, sketch in enumerate(sketches):
+            buckets[tuple(sketch.signature[band * rows:(band + 1) * rows])].append(index)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    candidates.add((members[i], members[j]))
+    return candidates
+
+
+def containment_candidate_pairs(sketches: List[ColumnSketch]) -> set:
+    """(child, parent) index pairs where a key-like parent's KMV sample shares a value with the child's"""
+    parents_by_hash = defaultdict(list)
+    for index, sketch in enumerate(sketches):
+        if sketch.is_key_like:
+            for h in sketch.kmv_set:
+                parents_by_hash[h].append(index)
+    candidates = set()
+    for index, sketch in enumerate(sketches):
+        for h in sketch.kmv_set:
+            for parent in parents_by_hash.get(h, ()):
+                if sketches[parent].table != sketch.table:
+                    candidates.add((index, parent))
+    return candidates
+
+
+def chance_containment(child_values: set, parent_values: set) -> float:
+    """
+    Probability that an integer child column overlaps an integer parent this much
+    by coincidence. APEX ids come in dense runs (1..5, 21..24, 41..45 from cached
+    sequences), so each child value is expected to land in the parent as often as
+    the parent covers the ids around it. 0.0 when either side holds non-integers.
+    """
+    if not child_values or not all(v.isdigit() for v in child_values) or not all(v.isdigit() for v in parent_values):
+        return 0.0
+    parent_ints = {int(v) for v in parent_values}
+    densities = []
+    for v in (int(v) for v in child_values):
+        window = range(max(v - CHANCE_WINDOW, 0), v + CHANCE_WINDOW + 1)
+        densities.append(sum(1 for i in window if i in parent_ints) / len(window))
+    density = sum(densities) / len(densities)
+    n = len(child_values)
+    hits = len(child_values & parent_values)
+    if density >= 1.0:
+        return 1.0
+    if density <= 0.0:
+        return 0.0
+    # Binomial upper tail P(X >= hits), X ~ Bin(n, density), summed in log space
+    tail = 0.0
+    for k in range(hits, n + 1):
+        tail += math.exp(math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+                         + k * math.log(density) + (n - k) * math.log(1 - density))
+    return min(1.0, tail)
+
+
+def exact_value_sets(json_dir: Path, columns: Dict[str, set]) -> Dict[str, set]:
+    """Second pass: exact normalized value sets, only for the given {table: {column, ...}}"""
+    snapshots = find_latest_snapshots(json_dir)
+    values = {}
+    for table_name, table_columns in sorted(columns.items()):
+        sets = {column: set() for column in table_columns}
+        for item in load_snapshot_items(snapshots[table_name]):
+            for column, column_values in sets.items():
+                text = normalize_value(item.get(column))
+                if text is not None:
+                    column_values.add(text)
+        for column, column_values in sets.items():
+            values[f"{table_name}.{column}"] = column_values
+    return values
+
+
+def discover_relationships(sketches: List[ColumnSketch], min_containment: float = MIN_CONTAINMENT,
+                           min_correspondence: float = MIN_CORRESPONDENCE,
+                           json_dir: Optional[Path] = None) -> List[Dict]:
+    """
+    Score candidates as foreign keys (child ⊆ unique parent) or correspondences.
+    With json_dir, foreign-key containment is verified exactly before ranking and
+    integer pairs that would overlap as much by chance need a name hint.
+    """
+    relationships = []
+    foreign_keys = []
+    for i, j in sorted(containment_candidate_pairs(sketches)):
+        child, parent = sketches[i], sketches[j]
+        # The parent side must be (nearly) unique, i.e. a key,
+        # and a table's own primary key is not treated as referencing anything
+        if child.distinct > parent.distinct * 2:
+            continue
+        if child.is_unique and is_own_key(child):
+            continue
+        affinity = name_affinity(child.column, parent.table, parent.column)
+        # A handful of small integers (flags, counts, lookup ids) fits inside almost any id column
+        if affinity == 0 and child.all_int and child.distinct < MIN_UNNAMED_INT_DISTINCT:
+            continue
+        containment = estimate_containment(child, parent)
+        if containment >= min_containment:
+            foreign_keys.append((child, parent, containment, affinity))
+
+    exact = {}
+    if json_dir is not None and foreign_keys:
+        needed = defaultdict(set)
+        for child, parent, _, _ in foreign_keys:
+            needed[child.table].add(child.column)
+            needed[parent.table].add(parent.column)
+        exact = exact_value_sets(json_dir, needed)
+
+    verified = []
+    for child, parent, containment, affinity in foreign_keys:
+        child_distinct, parent_distinct = child.distinct, parent.distinct
+        # Duplicate parent keys are only counted from exact values; the estimate can exceed non_null
+        parent_duplicates = None
+        if exact:
+            child_values, parent_values = exact[child.key], exact[parent.key]
+            containment = len(child_values & parent_values) / len(child_values) if child_values else 0.0
+            child_distinct, parent_distinct = len(child_values), len(parent_values)
+            parent_duplicates = parent.non_null - parent_distinct
+            if containment < min_containment:
+                continue
+            if affinity == 0 and chance_containment(child_values, parent_values) > MAX_CHANCE_CONTAINMENT:
+                continue
+        verified.append((child, parent, containment, affinity, child_distinct, parent_distinct, parent_duplicates))
+
+    # An integer column with a name-matched parent (dwell_type -> DWELL_TYPE) does
+    # not also reference the other lookups whose ids happen to cover it
+    named = {child.key for child, _, _, affinity, _, _, _ in verified if affinity > 0}
+    for child, parent, containment, affinity, child_distinct, parent_distinct, parent_duplicates in verified:
+        if affinity == 0 and child.all_int and child.key in named:
+            continue
+        relationships.append({
+            'kind': 'foreign_key',
+            'child_table': child.table,
+            'child_column': child.column,
+            'parent_table': parent.table,
+            'parent_column': parent.column,
+            'confidence': round(containment * (0.7 + 0.3 * affinity), 3),
+            'containment': round(containment, 3),
+            'jaccard': round(estimate_jaccard(child, parent), 3),
+            'child_distinct': child_distinct,
+            'parent_distinct': parent_distinct,
+            'parent_duplicates': parent_duplicates,
+            'verified': bool(exact),
+        })
+
+    for i, j in sorted(lsh_candidate_pairs(sketches)):
+        a, b = sketches[i], sketches[j]
+        if a.table == b.table:
+            continue
+        jaccard = estimate_jaccard(a, b)
+        if jaccard >= min_correspondence and not (a.is_unique and b.is_unique and a.column == b.column):
+            relationships.append({
+                'kind': 'correspondence',
+                'child_table': a.table,
+                'child_column': a.column,
+                'parent_table': b.table,
+                'parent_column': b.column,
+                'confidence': round(jaccard, 3),
+                'containment': round(estimate_containment(a, b), 3),
+                'jaccard': round(jaccard, 3),
+                'child_distinct': a.distinct,
+                'parent_distinct': b.distinct,
+            })
+
+    # Keep the most confident few candidates per child column and kind
+    relationships.sort(key=lambda r: (r['child_table'], r['child_column'], r['kind'], -r['confidence'], -r['jaccard']))
+    kept = []
+    counts = defaultdict(int)
+    for relationship in relationships:
+        key = (relationship['child_table'], relationship['child_column'], relationship['kind'])
+        counts[key] += 1
+        if counts[key] <= MAX_CANDIDATES_PER_COLUMN:
+            kept.append(relationship)
+    return kept
+
+
+def build_sketches(json_dir: Path = JSON_DIR) -> List[ColumnSketch]:
+    """Sketch every column of the latest snapshot of each table"""
+    sketches = []
+    for table_name, json_path in sorted(find_latest_snapshots(json_dir).items()):
+        try:
+            items = load_snapshot_items(json_path)
+        except Exception as e:
+            print(f"  [!] Error reading {json_path.name}: {e}")
+            continue
+        sketches.extend(sketch_snapshot(table_name, items))
+    return sketches
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Discover foreign keys and column correspondences across snapshots")
+    parser.add_argument('--json-dir', type=Path, default=JSON_DIR, help=f"Snapshot directory (default: {JSON_DIR})")
+    parser.add_argument('--output', type=Path, default=RELATIONSHIPS_FILE, help=f"Output file (default: {RELATIONSHIPS_FILE})")
+    parser.add_argument('--min-containment', type=float, default=MIN_CONTAINMENT)
+    parser.add_argument('--min-correspondence', type=float, default=MIN_CORRESPONDENCE)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Column Relationship Discovery (MinHash / LSH)")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    sketches = build_sketches(args.json_dir)
+    sketched = time.perf_counter()
+    print(f"[+] Sketched {len(sketches)} columns in {sketched - started:.2f}s")
+
+    candidates = lsh_candidate_pairs(sketches)
+    containment_candidates = containment_candidate_pairs(sketches)
+    total_pairs = len(sketches) * (len(sketches) - 1) // 2
+    print(f"[+] Candidates: {len(candidates)} LSH (similar values), {len(containment_candidates)} KMV "
+          f"(contained values) of {total_pairs} possible pairs")
+
+    relationships = discover_relationships(sketches, args.min_containment, args.min_correspondence, args.json_dir)
+    foreign_keys = [r for r in relationships if r['kind'] == 'foreign_key']
+    print(f"[+] Found {len(foreign_keys)} foreign-key candidates and "
+          f"{len(relationships) - len(foreign_keys)} correspondences in {time.perf_counter() - sketched:.2f}s")
+
+    for r in foreign_keys:
+        print(f"  - {r['child_table']}.{r['child_column']} -> {r['parent_table']}.{r['parent_column']} "
+              f"(confidence {r['confidence']:.2f}, containment {r['containment']:.2f})")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'num_permutations': NUM_PERMUTATIONS,
+            'lsh_bands': LSH_BANDS,
+            'kmv_size': KMV_SIZE,
+            'relationships': relationships,
+        }, f, indent=2)
+    print(f"[+] Relationships saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
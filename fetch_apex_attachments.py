@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Oracle APEX Attachment Fetcher
+Downloads the attachment binaries behind APPLICANT_ATTACHMENT and
+APPLICANT_HOME_VISIT (the files migrateApplicantAttachments.js and
+migrateHomeVisitAttachments.js fetch one at a time) with bounded concurrency.
+
+Files are streamed to disk in chunks and stored content-addressed by SHA-256
+(objects/<2 hex>/<sha256>), so the same document uploaded for several
+applicants is kept once. Every finished download is appended to
+manifest.jsonl; a rerun skips what the manifest already has and resumes
+interrupted downloads with HTTP Range requests where the server allows it.
+A resume sends If-Range with the ETag (or Last-Modified) the download started
+with, so a file that changed in between is fetched again from the start.
+
+Usage:
+    python fetch_apex_attachments.py [--workers 8] [--source applicant] [--limit 100]
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+import requests
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from apex_index import find_latest_snapshots, load_snapshot_items
+
+# Configuration
+JSON_DIR = Path("apex")
+ATTACHMENTS_DIR = Path("apex_attachments")
+ATTACHMENT_API_BASE = "https://gd67d9561edf887-lunaxstudio.adb.af-johannesburg-1.oraclecloudapps.com/ords/sanzaf/sanzafAttachment"
+ATTACHMENT_SOURCES = {
+    # source name -> snapshot table, id key, endpoint (same as the Node migration scripts)
+    'applicant': {'table': 'APPLICANT_ATTACHMENT', 'id_key': 'attach_id', 'endpoint': 'applicantpdf'},
+    'home_visit': {'table': 'APPLICANT_HOME_VISIT', 'id_key': 'visit_id', 'endpoint': 'applicant_home_visit_pdf'},
+}
+MANIFEST_NAME = "manifest.jsonl"
+DEFAULT_WORKERS = 8
+CHUNK_SIZE = 256 * 1024
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 3
+
+
+class AttachmentStore:
+    """Content-addressed blob directory plus an append-only manifest of finished downloads"""
+
+    def __init__(self, root: Path = ATTACHMENTS_DIR):
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.partial_dir = root / "partial"
+        self.manifest_path = root / MANIFEST_NAME
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.entries = self.load_manifest()
+
+    def load_manifest(self) -> Dict[str, Dict]:
+        """Finished downloads by "<source>/<id>" (a torn last line from a crash is ignored)"""
+        entries = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    entries[entry['key']] = entry
+        return entries
+
+    def object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / sha256
+
+    def partial_path(self, key: str) -> Path:
+        return self.partial_dir / (key.replace('/', '_') + '.part')
+
+    def validator_path(self, key: str) -> Path:
+        """Sidecar with the ETag/Last-Modified of the response a partial file came from"""
+        return self.partial_dir / (key.replace('/', '_') + '.validator.json')
+
+    def load_validator(self, key: str) -> Optional[str]:
+        """If-Range value for resuming key's partial file, or None if it cannot be resumed safely"""
+        try:
+            with open(self.validator_path(key), 'r', encoding='utf-8') as f:
+                validator = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        # If-Range only accepts a strong ETag
+        etag = validator.get('etag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return validator.get('last_modified')
+
+    def save_validator(self, key: str, headers) -> None:
+        with open(self.validator_path(key), 'w', encoding='utf-8') as f:
+            json.dump({'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}, f)
+
+    def discard_partial(self, key: str) -> None:
+        """Drop a partial download and its validator"""
+        for path in (self.partial_path(key), self.validator_path(key)):
+            if path.exists():
+                path.unlink()
+
+    def is_done(self, key: str) -> bool:
+        entry = self.entries.get(key)
+        return entry is not None and self.object_path(entry['sha256']).exists()
+
+    def commit(self, key: str, partial: Path, sha256: str, entry: Dict) -> bool:
+        """Move a finished download into place; returns False if the content was already stored"""
+        target = self.object_path(sha256)
+        with self.lock:
+            if target.exists():
+                partial.unlink()
+                is_new = False
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(partial, target)
+                is_new = True
+            entry = dict(entry, key=key, sha256=sha256)
+            self.entries[key] = entry
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        validator = self.validator_path(key)
+        if validator.exists():
+            validator.unlink()
+        return is_new
+
+
+def attachment_jobs(json_dir: Path, sources: List[str]) -> List[Dict]:
+    """One job per snapshot row that has an attachment"""
+    snapshots = find_latest_snapshots(json_dir)
+    jobs = []
+    for source in sources:
+        config = ATTACHMENT_SOURCES[source]
+        json_path = snapshots.get(config['table'])
+        if json_path is None:
+            print(f"[!] No {config['table']} snapshot in {json_dir}, skipping {source}")
+            continue
+        for item in load_snapshot_items(json_path):
+            item_id = item.get(config['id_key'])
+            # Home visits without a filename have no document (the Node script skips them too)
+            if item_id is None or not item.get('filename'):
+                continue
+            jobs.append({
+                'key': f"{source}/{item_id}",
+                'url': f"{ATTACHMENT_API_BASE}/{config['endpoint']}/{item_id}",
+                'filename': item.get('filename'),
+                'mimetype': item.get('mimetype'),
+            })
+    return jobs
+
+
+_sessions = threading.local()
+
+
+def _session() -> requests.Session:
+    """One keep-alive session per worker thread"""
+    if not hasattr(_sessions, 'session'):
+        _sessions.session = requests.Session()
+    return _sessions.session
+
+
+def content_range_start(response: requests.Response) -> Optional[int]:
+    """First byte of a 206 response ("Content-Range: bytes 1024-2047/4096"), or None if unparseable"""
+    value = response.headers.get('Content-Range', '')
+    if not value.startswith('bytes '):
+        return None
+    try:
+        return int(value[len('bytes '):].split('-', 1)[0])
+    except ValueError:
+        return None
+
+
+def download_attachment(store: AttachmentStore, job: Dict) -> Dict:
+    """Stream one attachment to its partial file (resuming if possible), hash it and store it"""
+    partial = store.partial_path(job['key'])
+    last_error = None
+
+    for attempt in range(MAX_RETRIES):
+        offset = partial.stat().st_size if partial.exists() else 0
+        headers = {}
+        if offset:
+            validator = store.load_validator(job['key'])
+            if validator is None:
+                # No way to tell whether the bytes on disk still belong to this file
+                store.discard_partial(job['key'])
+                offset = 0
+            else:
+                # A server whose copy changed answers If-Range with the whole file (200)
+                headers = {'Range': f"bytes={offset}-", 'If-Range': validator}
+        try:
+            with _session().get(job['url'], headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                if response.status_code == 416:
+                    # Range beyond the end: the partial file is stale, start over
+                    store.discard_partial(job['key'])
+                    continue
+                if response.status_code not in (200, 206):
+                    last_error = f"HTTP {response.status_code}"
+                    if response.status_code < 500:
+                        break
+                    time.sleep((attempt + 1) * 2)
+                    continue
+
+                sha = hashlib.sha256()
+                mode = 'wb'
+                if response.status_code == 206 and content_range_start(response) != offset:
+                    # Not the continuation of what is on disk: start over
+                    store.discard_partial(job['key'])
+                    last_error = f"unexpected Content-Range {response.headers.get('Content-Range')!r}"
+                    continue
+                if response.status_code == 206 and offset:
+                    # Server honoured the Range: hash what is already on disk, then append
+                    with open(partial, 'rb') as f:
+                        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                            sha.update(chunk)
+                    mode = 'ab'
+                else:
+                    offset = 0
+                    store.save_validator(job['key'], response.headers)
+
+                with open(partial, mode) as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        sha.update(chunk)
+                        f.write(chunk)
+
+                size = partial.stat().st_size
+                digest = sha.hexdigest()
+                is_new = store.commit(job['key'], partial, digest, {
+                    'url': job['url'],
+                    'filename': job['filename'],
+                    'mimetype': job['mimetype'],
+                    'content_type': response.headers.get('Content-Type'),
+                    'size': size,
+                })
+                return {'key': job['key'], 'size': size, 'new': is_new, 'resumed_bytes': offset}
+        except requests.exceptions.RequestException as e:
+            # Keep the partial file: the next attempt (or run) continues from it
+            last_error = str(e)
+            time.sleep((attempt + 1) * 2)
+
+    return {'key': job['key'], 'error': last_error or "failed"}
+
+
+def fetch_attachments(jobs: List[Dict], store: AttachmentStore, workers: int = DEFAULT_WORKERS) -> Dict:
+    """Download every job not already in the store; returns run statistics"""
+    stats = {'total': len(jobs), 'skipped': 0, 'stored': 0, 'duplicates': 0,
+             'failed': 0, 'bytes': 0, 'duplicate_bytes': 0, 'resumed_bytes': 0, 'errors': []}
+    pending = [job for job in jobs if not store.is_done(job['key'])]
+    stats['skipped'] = len(jobs) - len(pending)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(download_attachment, store, job): job for job in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                result = future.result()
+            except Exception as e:
+                # e.g. os.replace failing in commit; the partial file stays for the next run
+                result = {'key': futures[future]['key'], 'error': f"{type(e).__name__}: {e}"}
+            if 'error' in result:
+                stats['failed'] += 1
+                stats['errors'].append(result)
+                print(f"  [!] {result['key']}: {result['error']}")
+                continue
+            stats['bytes'] += result['size']
+            stats['resumed_bytes'] += result['resumed_bytes']
+            if result['new']:
+                stats['stored'] += 1
+            else:
+                stats['duplicates'] += 1
+                stats['duplicate_bytes'] += result['size']
+            if done % 100 == 0 or done == len(futures):
+                print(f"  [*] {done}/{len(futures)} downloaded")
+    return stats
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Download APEX attachment binaries into a content-addressed store")
+    parser.add_argument('--source', action='append', choices=sorted(ATTACHMENT_SOURCES),
+                        help="Attachment source to fetch (repeatable; default: all)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent downloads (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--limit', type=int, help="Only the first N attachments")
+    parser.add_argument('--json-dir', type=Path, default=JSON_DIR, help=f"Snapshot directory (default: {JSON_DIR})")
+    parser.add_argument('--output-dir', type=Path, default=ATTACHMENTS_DIR,
+                        help=f"Attachment store (default: {ATTACHMENTS_DIR})")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Oracle APEX Attachment Fetcher")
+    print("=" * 70)
+
+    jobs = attachment_jobs(args.json_dir, args.source or sorted(ATTACHMENT_SOURCES))
+    if args.limit:
+        jobs = jobs[:args.limit]
+    store = AttachmentStore(args.output_dir)
+    print(f"[+] {len(jobs)} attachments, {len(store.entries)} already in {args.output_dir}")
+
+    started = time.perf_counter()
+    stats = fetch_attachments(jobs, store, args.workers)
+    elapsed = time.perf_counter() - started
+
+    print("\n" + "=" * 70)
+    print("SUMMARY")
+    print("=" * 70)
+    print(f"[+] Stored: {stats['stored']} new files ({stats['bytes'] - stats['duplicate_bytes']} bytes)")
+    print(f"[+] Duplicates: {stats['duplicates']} ({stats['duplicate_bytes']} bytes not stored again)")
+    print(f"[*] Skipped (already downloaded): {stats['skipped']}")
+    if stats['resumed_bytes']:
+        print(f"[*] Resumed: {stats['resumed_bytes']} bytes reused from interrupted downloads")
+    print(f"[-] Failed: {stats['failed']}")
+    if elapsed > 0 and stats['bytes']:
+        print(f"[*] {stats['bytes'] / elapsed / 1024 / 1024:.1f} MiB/s over {elapsed:.1f}s")
+    print(f"[*] Manifest: {store.manifest_path}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,24 @@ Fetches data from Oracle APEX API for all tables defined in schema.sql
 import os
 import re
 import json
+import argparse
+import threading
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
 import time
 
+import apex_json
+import generate_migration_report as report_tool
+from apex_families import catalogue_fingerprint, family_label, table_fingerprint
+from apex_partitions import partition_column_for, write_partitioned_snapshot
+from apex_snapshot_store import SnapshotStore, STORE_DIR
+from apex_profiling import add_profile_arguments, profile_requested, profile_span, start_profiler, stop_profiler
+
 # Configuration
 SCHEMA_FILE = "backend/src/schema/schema.sql"
 MAPPING_FILE = "table_mapping.json"
@@ -21,6 +33,23 @@ API_BASE_URL = "https://gd67d9561edf887-lunaxstudio.adb.af-johannesburg-1.oracle
 OUTPUT_DIR = Path(r"D:\WORK\LUQMAN\WelfareApp_react\UmmahAid\apex")
 REQUEST_TIMEOUT = 30
 REQUEST_DELAY = 0.5  # Delay between requests to avoid overwhelming the API
+PARTITION_LOG_TABLES = False  # Store log-style tables as monthly partitions (see apex_partitions.py)
+FOLLOW_NEXT_PAGES = True  # Follow ORDS "next" links so large tables arrive complete
+BATCH_FAMILIES = True  # Fetch same-shaped tables (by catalogue name or backend schema) as one concurrent job
+FAMILY_WORKERS = 4      # Tables of one family fetched at the same time (each still waits REQUEST_DELAY after its table)
+STORE_SNAPSHOTS = False  # Ingest the run into the deduplicated snapshot store (see apex_snapshot_store.py)
+
+# Deadlines and hedging (tail latency on slow ORDS endpoints)
+TABLE_DEADLINE = 300.0  # Seconds for a whole table, all pages and retries included
+PAGE_DEADLINE = 90.0    # Seconds for one page, retries included
+HEDGE_MIN_SAMPLES = 5   # Successful GETs observed before hedging starts
+HEDGE_MIN_DELAY = 1.0   # Never hedge sooner than this, whatever the p95
+HEDGE_MAX_RATIO = 0.1   # At most one duplicate request per 10 requests
+LATENCY_WINDOW = 100    # Recent GET latencies the p95 is taken over
+REQUEST_WORKERS = 2     # GETs in flight per caller: the original plus its hedge
+STRAGGLER_WORKERS = 4   # Extra threads for requests abandoned at a deadline, still running in the background
+# Every family worker can have an original and a hedge in flight, plus the stragglers
+REQUEST_POOL_SIZE = REQUEST_WORKERS * FAMILY_WORKERS + STRAGGLER_WORKERS
 
 
 
@@ -99,23 +128,29 @@ def load_apex_tables_from_mapping(mapping_file: str) -> List[str]:
 
 
 
-def try_api_endpoint(apex_table_name: str) -> bool:
+def try_api_endpoint(apex_table_name: str, deadline_at: Optional[float] = None) -> bool:
     """
     Try to access API endpoint for a specific APEX table name.
     Returns True if endpoint exists and is accessible.
     Note: Returns True even for 5xx errors, as the endpoint exists but may have server issues.
+    deadline_at (a time.monotonic() value) bounds the probe, so it counts against the table deadline.
     """
     url = f"{API_BASE_URL}/{apex_table_name}"
+    if deadline_at is None:
+        deadline_at = time.monotonic() + REQUEST_TIMEOUT * 2
     
     try:
         # Try a HEAD request first (lighter) to check if endpoint exists
-        response = requests.head(url, timeout=REQUEST_TIMEOUT)
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            return False
+        response = requests.head(url, timeout=min(REQUEST_TIMEOUT, remaining))
         # Accept 200, 405 (Method Not Allowed), and 5xx (server errors but endpoint exists)
         if response.status_code in [200, 405] or (500 <= response.status_code < 600):
             return True
         
         # Try GET as fallback
-        response = requests.get(url, timeout=REQUEST_TIMEOUT)
+        response = deadline_get(url, deadline_at)
         # Accept 200 or 5xx (endpoint exists, even if server error)
         if response.status_code == 200 or (500 <= response.status_code < 600):
             return True
@@ -126,39 +161,178 @@ def try_api_endpoint(apex_table_name: str) -> bool:
     return False
 
 
-def fetch_table_data(apex_table_name: str, max_retries: int = 3) -> Optional[Dict]:
+class LatencyTracker:
     """
-    Fetch data from API for a given table using exact APEX table name.
-    Sends POST first (ignoring errors), then GET to fetch data.
-    Includes retry logic for server errors.
+    GET latencies and hedging counters. The hedge delay comes from recent
+    per-request latencies; page latencies (as the caller saw them, hedges
+    included) are kept for the run summary.
     """
-    # Use exact APEX table name for the endpoint
-    url = f"{API_BASE_URL}/{apex_table_name}"
-    
-    for attempt in range(max_retries):
-        try:
-            # Step 1: Send POST request (ignore errors)
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.page_samples: List[float] = []
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.lock = threading.Lock()
+
+    def record(self, request_seconds: float, page_seconds: float):
+        with self.lock:
+            self.samples.append(request_seconds)
+            self.page_samples.append(page_seconds)
+
+    def count_request(self, hedge: bool = False):
+        with self.lock:
+            self.requests += 1
+            if hedge:
+                self.hedged += 1
+
+    def count_hedge_win(self):
+        with self.lock:
+            self.hedge_wins += 1
+
+    def percentile(self, p: float, samples: Optional[List[float]] = None) -> Optional[float]:
+        with self.lock:
+            ordered = sorted(self.samples if samples is None else samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def hedge_delay(self) -> Optional[float]:
+        """Observed p95, or None while there are too few samples or the hedge budget is spent"""
+        with self.lock:
+            if len(self.samples) < HEDGE_MIN_SAMPLES or self.hedged >= self.requests * HEDGE_MAX_RATIO:
+                return None
+        return max(HEDGE_MIN_DELAY, self.percentile(95))
+
+
+_latency = LatencyTracker()
+_request_pool: Optional[ThreadPoolExecutor] = None
+_request_pool_lock = threading.Lock()
+
+
+def request_pool() -> ThreadPoolExecutor:
+    """The GET thread pool, created on first use and dropped by shutdown_request_pool()"""
+    global _request_pool
+    with _request_pool_lock:
+        if _request_pool is None:
+            _request_pool = ThreadPoolExecutor(max_workers=REQUEST_POOL_SIZE,
+                                               thread_name_prefix="apex-get")
+        return _request_pool
+
+
+def shutdown_request_pool():
+    """
+    Cancel queued GETs and stop waiting for abandoned ones. Stragglers already
+    running finish within their own timeout (REQUEST_TIMEOUT at most).
+    """
+    global _request_pool
+    with _request_pool_lock:
+        pool, _request_pool = _request_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed_get(url: str, timeout: float):
+    started = time.monotonic()
+    response = requests.get(url, timeout=timeout)
+    return response, time.monotonic() - started
+
+
+def deadline_get(url: str, deadline_at: float, hedge: bool = False) -> requests.Response:
+    """
+    GET that gives up at deadline_at (a time.monotonic() value) instead of
+    waiting out REQUEST_TIMEOUT. With hedge, a duplicate request is fired if
+    the first has not answered by the observed p95 latency, and whichever
+    answers first wins. Abandoned requests finish in the background.
+    """
+    started = time.monotonic()
+    remaining = deadline_at - started
+    if remaining <= 0:
+        raise requests.exceptions.Timeout("deadline exceeded")
+    _latency.count_request()
+    pool = request_pool()
+    original = pool.submit(_timed_get, url, min(REQUEST_TIMEOUT, remaining))
+    pending = {original}
+    hedge_delay = _latency.hedge_delay() if hedge else None
+    error = None
+
+    while pending:
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            break
+        can_hedge = hedge_delay is not None and len(pending) == 1 and original in pending
+        done, pending = wait(pending, timeout=min(hedge_delay, remaining) if can_hedge else remaining,
+                             return_when=FIRST_COMPLETED)
+
+        for future in done:
             try:
-                post_response = requests.post(
-                    url,
-                    json={},
-                    headers={'Content-Type': 'application/json'},
-                    timeout=REQUEST_TIMEOUT
-                )
-                # Ignore POST response - we just need to trigger it
+                response, request_seconds = future.result()
             except requests.exceptions.RequestException as e:
-                # Ignore POST errors as per requirements
-                pass
-            
-            # Small delay between POST and GET
-            time.sleep(REQUEST_DELAY)
+                # The other request (if any) may still succeed
+                error = error or e
+                continue
+            if response.status_code == 200:
+                _latency.record(request_seconds, time.monotonic() - started)
+            if future is not original:
+                _latency.count_hedge_win()
+            return response
+
+        if not done and can_hedge:
+            # Slower than the observed p95: race a duplicate against it
+            _latency.count_request(hedge=True)
+            timeout = min(REQUEST_TIMEOUT, max(0.001, deadline_at - time.monotonic()))
+            pending.add(pool.submit(_timed_get, url, timeout))
+            hedge_delay = None
+
+    if error is not None and not pending:
+        raise error
+    raise requests.exceptions.Timeout("deadline exceeded")
+
+
+def latency_summary_lines() -> List[str]:
+    """GET latency percentiles and hedging counters for the run summary"""
+    samples = _latency.page_samples
+    if not samples:
+        return []
+    p50, p95, p99 = (_latency.percentile(p, samples) for p in (50, 95, 99))
+    lines = [f"[*] GET latency: p50 {p50:.2f}s, p95 {p95:.2f}s, p99 {p99:.2f}s over {len(samples)} pages"]
+    if _latency.hedged:
+        lines.append(f"[*] Hedged requests: {_latency.hedged} of {_latency.requests} ({_latency.hedge_wins} won)")
+    return lines
+
+
+def fetch_page(url: str, apex_table_name: str, deadline_at: float, max_retries: int = 3,
+               trigger: bool = True, hedge: bool = False) -> Optional[Dict]:
+    """
+    Fetch one ORDS page with retries, giving up at deadline_at.
+    With trigger, sends POST first (ignoring errors), then GET to fetch data.
+    """
+    for attempt in range(max_retries):
+        try:
+            if trigger:
+                # Step 1: Send POST request (ignore errors)
+                try:
+                    requests.post(
+                        url,
+                        json={},
+                        headers={'Content-Type': 'application/json'},
+                        timeout=max(0.001, min(REQUEST_TIMEOUT, deadline_at - time.monotonic()))
+                    )
+                    # Ignore POST response - we just need to trigger it
+                except requests.exceptions.RequestException:
+                    # Ignore POST errors as per requirements
+                    pass
+                
+                # Small delay between POST and GET
+                time.sleep(REQUEST_DELAY)
             
             # Step 2: Send GET request to fetch data
-            get_response = requests.get(url, timeout=REQUEST_TIMEOUT)
+            get_response = deadline_get(url, deadline_at, hedge)
             
             if get_response.status_code == 200:
                 try:
-                    data = get_response.json()
+                    data = apex_json.loads(get_response.content)
                     return data
                 except json.JSONDecodeError:
                     # If response is not JSON, return as text
@@ -188,6 +362,9 @@ def fetch_table_data(apex_table_name: str, max_retries: int = 3) -> Optional[Dic
                 # Retry on server errors (5xx) except on last attempt
                 if get_response.status_code >= 500 and attempt < max_retries - 1:
                     retry_delay = (attempt + 1) * 2  # Exponential backoff: 2s, 4s, 6s
+                    if time.monotonic() + retry_delay >= deadline_at:
+                        print(f"  [!] Deadline reached for {apex_table_name}, not retrying")
+                        return None
                     print(f"  [*] Retrying in {retry_delay}s (attempt {attempt + 2}/{max_retries})...")
                     time.sleep(retry_delay)
                     continue
@@ -195,36 +372,107 @@ def fetch_table_data(apex_table_name: str, max_retries: int = 3) -> Optional[Dic
                 return None
         
         except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                retry_delay = (attempt + 1) * 2
+            retry_delay = (attempt + 1) * 2
+            if attempt < max_retries - 1 and time.monotonic() + retry_delay < deadline_at:
                 print(f"  [!] Request timeout for {apex_table_name}, retrying in {retry_delay}s...")
                 time.sleep(retry_delay)
                 continue
             else:
-                print(f"  [!] Request timeout for {apex_table_name} after {max_retries} attempts")
+                print(f"  [!] Request timeout for {apex_table_name} after {attempt + 1} attempts")
                 return None
         except requests.exceptions.RequestException as e:
-            if attempt < max_retries - 1:
-                retry_delay = (attempt + 1) * 2
+            retry_delay = (attempt + 1) * 2
+            if attempt < max_retries - 1 and time.monotonic() + retry_delay < deadline_at:
                 print(f"  [!] Request error: {str(e)}, retrying in {retry_delay}s...")
                 time.sleep(retry_delay)
                 continue
             else:
-                print(f"  [!] Request error after {max_retries} attempts: {str(e)}")
+                print(f"  [!] Request error after {attempt + 1} attempts: {str(e)}")
                 return None
     
     return None
 
 
+class TableFetchError(Exception):
+    """A page of a table could not be fetched within its retries and deadlines"""
+
+
+def iter_table_pages(apex_table_name: str, max_retries: int = 3, table_deadline: float = TABLE_DEADLINE,
+                     page_deadline: float = PAGE_DEADLINE, hedge: bool = False):
+    """
+    Yield the ORDS pages of a table in order, following "next" links.
+    Each page must finish within page_deadline and the whole table within
+    table_deadline (seconds, including retries); otherwise TableFetchError.
+    A first page that is not an ORDS collection is yielded as-is.
+    """
+    # Use exact APEX table name for the endpoint
+    url = f"{API_BASE_URL}/{apex_table_name}"
+    table_deadline_at = time.monotonic() + table_deadline
+    seen_urls = set()
+    pages = 0
+    
+    while url and url not in seen_urls:
+        seen_urls.add(url)
+        if time.monotonic() >= table_deadline_at:
+            raise TableFetchError(f"Table deadline ({table_deadline:.0f}s) reached after {pages} pages")
+        page = fetch_page(url, apex_table_name, min(table_deadline_at, time.monotonic() + page_deadline),
+                          max_retries, trigger=(pages == 0), hedge=hedge)
+        if page is None:
+            raise TableFetchError(f"Page {pages + 1} could not be fetched")
+        pages += 1
+        yield page
+        
+        if not isinstance(page, dict) or not isinstance(page.get('items'), list) or not page['items']:
+            break
+        url = (page.get('next') or {}).get('$ref') if FOLLOW_NEXT_PAGES else None
+
+
+def fetch_table_data(apex_table_name: str, max_retries: int = 3, table_deadline: float = TABLE_DEADLINE,
+                     page_deadline: float = PAGE_DEADLINE, hedge: bool = False) -> Optional[Dict]:
+    """
+    Fetch data from API for a given table using exact APEX table name,
+    merging every ORDS page into one snapshot (see iter_table_pages).
+    """
+    data = None
+    pages = 0
+    try:
+        for page in iter_table_pages(apex_table_name, max_retries, table_deadline, page_deadline, hedge):
+            pages += 1
+            if data is None:
+                data = page
+            else:
+                data['items'].extend(page['items'])
+    except TableFetchError as e:
+        print(f"  [!] {e}")
+        return None
+    
+    if pages > 1:
+        print(f"  [+] Fetched {pages} pages ({len(data['items'])} rows)")
+        data.pop('next', None)
+    return data
+
+
 def save_json_response(table_name: str, data: Dict, output_dir: Path):
     """Save JSON response to file with timestamp"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{table_name}_{timestamp}.json"
     filepath = output_dir / filename
     
+    # Log-style tables can be written as monthly partitions instead of one file
+    is_partitioned, date_column = partition_column_for(table_name)
+    if PARTITION_LOG_TABLES and is_partitioned:
+        try:
+            part_dir = write_partitioned_snapshot(table_name, data, output_dir, timestamp, date_column)
+            if part_dir is not None:
+                print(f"    [+] Saved partitioned: {part_dir.name}")
+                return True
+            print(f"    [*] No date column found, saving unpartitioned")
+        except Exception as e:
+            print(f"    [!] Error saving partitions: {e}")
+            return False
+    
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        apex_json.dump_file(data, filepath, indent=True)
         print(f"    [+] Saved: {filename}")
         return True
     except Exception as e:
@@ -232,8 +480,91 @@ def save_json_response(table_name: str, data: Dict, output_dir: Path):
         return False
 
 
-def main():
-    """Main execution function"""
+def catalogue_fingerprints(apex_tables: List[str], schema_file: Optional[str] = None) -> Dict[str, str]:
+    """Fingerprint per APEX table from metadata only: its catalogue family by name, else the columns of the
+    backend table it maps to (see apex_families.py); tables with neither are left out"""
+    fingerprints = {}
+    by_name = {apex_table_name: Path(apex_table_name) for apex_table_name in apex_tables}
+    tables = report_tool.extract_table_definitions(schema_file or report_tool.resolve_schema_file())
+    for table_name, table_info in tables.items():
+        match = report_tool.find_json_file(table_name, by_name)
+        if match is not None:
+            fingerprints.setdefault(match.name, table_fingerprint(table_info['columns']))
+    for apex_table_name in apex_tables:
+        family_fp = catalogue_fingerprint(apex_table_name)
+        if family_fp is not None:
+            fingerprints[apex_table_name] = family_fp
+    return fingerprints
+
+
+def plan_fetch_jobs(apex_tables: List[str], schema_file: Optional[str] = None) -> List[List[str]]:
+    """Group tables in the same catalogue family or mapped to identical backend tables; catalogue order is kept"""
+    fingerprints = catalogue_fingerprints(apex_tables, schema_file)
+    jobs = []
+    families = {}
+    for apex_table_name in apex_tables:
+        table_fp = fingerprints.get(apex_table_name)
+        if table_fp is None:
+            jobs.append([apex_table_name])
+        elif table_fp in families:
+            families[table_fp].append(apex_table_name)
+        else:
+            families[table_fp] = [apex_table_name]
+            jobs.append(families[table_fp])
+    return jobs
+
+
+def fetch_and_save(apex_table_name: str, table_deadline: float = TABLE_DEADLINE, page_deadline: float = PAGE_DEADLINE,
+                   hedge: bool = False, profiled: bool = True) -> str:
+    """
+    Probe, fetch and save one table; returns 'saved', 'failed' or 'skipped'.
+    The probe and the download share table_deadline.
+    """
+    # Profiler spans are not thread-safe: family members are timed as one span by the caller
+    span = profile_span if profiled else (lambda name: nullcontext())
+    table_deadline_at = time.monotonic() + table_deadline
+    
+    # Check if endpoint exists
+    with span("endpoint_probe"):
+        endpoint_ok = try_api_endpoint(apex_table_name, table_deadline_at)
+    if not endpoint_ok:
+        if time.monotonic() >= table_deadline_at:
+            print(f"  [!] {apex_table_name}: table deadline ({table_deadline:.0f}s) reached while probing")
+            return 'failed'
+        print(f"  [!] {apex_table_name}: endpoint not accessible, skipping")
+        return 'skipped'
+    
+    # Fetch data using exact APEX table name, within what is left of the table deadline
+    with span("download"):
+        data = fetch_table_data(apex_table_name, table_deadline=table_deadline_at - time.monotonic(),
+                                page_deadline=page_deadline, hedge=hedge)
+    if data is None:
+        print(f"  [!] {apex_table_name}: no data retrieved")
+        return 'failed'
+    
+    # Save response using APEX table name as filename
+    with span("save"):
+        saved = save_json_response(apex_table_name, data, OUTPUT_DIR)
+    if not saved:
+        return 'failed'
+    print(f"  [+] {apex_table_name}: successfully fetched and saved")
+    return 'saved'
+
+
+def fetch_member(apex_table_name: str, table_deadline: float, page_deadline: float, hedge: bool) -> str:
+    """
+    fetch_and_save for one table of a family. Each worker keeps the usual
+    REQUEST_DELAY after its table, so at most FAMILY_WORKERS tables hit the API
+    at once, each paced like a serial run.
+    """
+    outcome = fetch_and_save(apex_table_name, table_deadline, page_deadline, hedge, profiled=False)
+    time.sleep(REQUEST_DELAY)
+    return outcome
+
+
+def run_fetch(table_deadline: float = TABLE_DEADLINE, page_deadline: float = PAGE_DEADLINE, hedge: bool = False,
+              store: bool = STORE_SNAPSHOTS, batch_families: bool = BATCH_FAMILIES):
+    """Fetch and save data for every APEX table"""
     print("=" * 70)
     print("Oracle APEX ORDS API Data Fetcher")
     print("=" * 70)
@@ -249,7 +580,8 @@ def main():
     
     # Fetch all APEX tables from API
     print(f"\n[*] Fetching all APEX tables from API...")
-    apex_tables = fetch_all_apex_tables(APEX_TABLES_API)
+    with profile_span("catalogue_fetch"):
+        apex_tables = fetch_all_apex_tables(APEX_TABLES_API)
     
     if not apex_tables:
         # Try loading from mapping file as fallback
@@ -265,36 +597,32 @@ def main():
     print(f"[*] Files will be saved with APEX table names")
     print("-" * 70)
     
-    # Process each APEX table
-    successful = 0
-    failed = 0
-    skipped = 0
+    jobs = plan_fetch_jobs(apex_tables) if batch_families else [[table] for table in apex_tables]
+    if len(jobs) < len(apex_tables):
+        print(f"[*] {len(apex_tables)} tables in {len(jobs)} jobs (same-shaped tables are fetched together)")
     
-    for idx, apex_table_name in enumerate(apex_tables, 1):
-        print(f"\n[{idx}/{len(apex_tables)}] Processing APEX table: {apex_table_name}")
-        
-        # Check if endpoint exists
-        if not try_api_endpoint(apex_table_name):
-            print(f"  [!] Endpoint not accessible, skipping")
-            skipped += 1
-            continue
-        
-        # Fetch data using exact APEX table name
-        data = fetch_table_data(apex_table_name)
-        
-        if data is not None:
-            # Save response using APEX table name as filename
-            if save_json_response(apex_table_name, data, OUTPUT_DIR):
-                print(f"  [+] Successfully fetched and saved")
-                successful += 1
+    # Process each job: one table, or a family of same-shaped tables fetched concurrently
+    outcomes = {'saved': 0, 'failed': 0, 'skipped': 0}
+    
+    try:
+        for idx, members in enumerate(jobs, 1):
+            if len(members) == 1:
+                print(f"\n[{idx}/{len(jobs)}] Processing APEX table: {members[0]}")
+                outcomes[fetch_and_save(members[0], table_deadline, page_deadline, hedge)] += 1
             else:
-                failed += 1
-        else:
-            print(f"  [!] No data retrieved")
-            failed += 1
-        
-        # Small delay between tables
-        time.sleep(REQUEST_DELAY)
+                print(f"\n[{idx}/{len(jobs)}] Processing APEX family: {family_label(members)} ({len(members)} tables)")
+                with profile_span("family_batch"):
+                    with ThreadPoolExecutor(max_workers=FAMILY_WORKERS) as executor:
+                        results = executor.map(lambda table: fetch_member(table, table_deadline, page_deadline,
+                                                                          hedge), members)
+                        for outcome in results:
+                            outcomes[outcome] += 1
+            
+            # Small delay between jobs
+            time.sleep(REQUEST_DELAY)
+    finally:
+        shutdown_request_pool()
+    successful, failed, skipped = outcomes['saved'], outcomes['failed'], outcomes['skipped']
     
     # Summary
     print("\n" + "=" * 70)
@@ -303,10 +631,51 @@ def main():
     print(f"[+] Successful: {successful}")
     print(f"[-] Failed: {failed}")
     print(f"[!] Skipped: {skipped}")
+    for line in latency_summary_lines():
+        print(line)
+    if store and successful:
+        stats = SnapshotStore(OUTPUT_DIR.parent / STORE_DIR.name).ingest(OUTPUT_DIR)
+        if stats['pull_id']:
+            print(f"[+] Stored as pull {stats['pull_id']}: {stats['unchanged_files']}/{stats['files']} files unchanged, "
+                  f"{stats['stored_bytes'] / 1024 / 1024:.1f} MiB added")
     print(f"[*] Output directory: {OUTPUT_DIR}")
     print("=" * 70)
 
 
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Fetch Oracle APEX ORDS table data into JSON snapshots")
+    parser.add_argument('--table-deadline', type=float, default=TABLE_DEADLINE,
+                        help=f"Seconds allowed per table, all pages and retries (default: {TABLE_DEADLINE:.0f})")
+    parser.add_argument('--page-deadline', type=float, default=PAGE_DEADLINE,
+                        help=f"Seconds allowed per page, retries included (default: {PAGE_DEADLINE:.0f})")
+    parser.add_argument('--hedge', action='store_true',
+                        help="Send a duplicate GET when a page is slower than the observed p95 latency")
+    parser.add_argument('--no-families', dest='families', action='store_false', default=BATCH_FAMILIES,
+                        help="Fetch every table on its own instead of batching same-shaped tables")
+    parser.add_argument('--store', action='store_true', default=STORE_SNAPSHOTS,
+                        help="Ingest the new snapshots into the deduplicated snapshot store (apex_snapshot_store.py)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    if profile_requested(args):
+        start_profiler("fetch_apex_data", cpu=args.profile_cpu, memory=args.profile_memory)
+    try:
+        run_fetch(args.table_deadline, args.page_deadline, args.hedge, args.store, args.families)
+    finally:
+        profiler = stop_profiler()
+        if profiler:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # ".profile.json" keeps the file out of the <TABLE>_<timestamp>.json snapshot pattern
+            profile_path = OUTPUT_DIR / f"fetch_apex_data_{timestamp}.profile.json"
+            written = profiler.save(profile_path)
+            print("\nPROFILE")
+            for line in profiler.summary_lines():
+                print(line)
+            for path in written:
+                print(f"[+] Profile saved to: {path}")
+
+
 if __name__ == "__main__":
     main()
 
@@ -7,15 +7,29 @@ Analyzes backend schema and JSON files to generate comprehensive migration mappi
 import os
 import re
 import json
+import time
+import argparse
 from pathlib import Path
 from typing import Dict, List, Set, Optional, Tuple
 from collections import defaultdict
-from datetime import datetime
+from datetime import date, datetime
+
+import apex_json
+from apex_families import table_fingerprint, group_families, family_label
+from apex_partitions import (read_partitioned_snapshot, parse_bound, load_manifest, undated_rows_excluded,
+                             PARTITION_SUFFIX, MANIFEST_NAME as PARTITION_MANIFEST_NAME)
+from apex_profiling import add_profile_arguments, profile_requested, profile_span, start_profiler, stop_profiler
 
 # Configuration
 SCHEMA_FILE = "backend/src/schema/schema.sql"
+FALLBACK_SCHEMA_FILE = "backend/src/schema/schema-backup.sql"  # Used when SCHEMA_FILE does not exist
 JSON_DIR = Path("apex")
 OUTPUT_REPORT = "MIGRATION_REPORT.md"
+RELATIONSHIPS_FILE = Path("column_relationships.json")  # Written by discover_column_relationships.py
+INTEGRITY_MIN_CONTAINMENT = 0.98  # Below this, an inferred foreign key has orphan values
+INTEGRITY_MIN_CONFIDENCE = 0.7    # Only warn about inferred foreign keys at least this likely
+WATCH_DIRS = [Path("backend/src/schema"), JSON_DIR]  # Only what the report parses
+WATCH_INTERVAL = 0.25  # Seconds between change scans in --watch mode
 
 # PostgreSQL type mappings
 PG_TYPE_MAPPINGS = {
@@ -48,6 +62,27 @@ COLUMN_NAME_MAPPINGS = {
     'updated_at': ['updated_at', 'Updated_At', 'UPDATED_AT', 'updated_on', 'Updated_On'],
 }
 
+# Mapping for applicant-related tables (backend table -> possible JSON file names)
+# These tables should look for JSON files with APPLICANT_ prefix
+APPLICANT_TABLE_MAPPING = {
+    'Attachments': ['APPLICANT_ATTACHMENT', 'APPLICANT_ATTACHMENTS'],
+    'Food_Assistance': ['APPLICANT_FOOD_ASSISTANCE'],
+    'Home_Visit': ['APPLICANT_HOME_VISIT', 'APPLICANT_HOME_VISITS'],
+    'Relationships': ['APPLICANT_RELATIONSHIP', 'APPLICANT_RELATIONSHIPS'],
+    'Tasks': ['APPLICANT_TASK', 'APPLICANT_TASKS'],
+    'Comments': ['APPLICANT_COMMENT', 'APPLICANT_COMMENTS'],
+    'Programs': ['APPLICANT_PROGRAM', 'APPLICANT_PROGRAMS'],
+    'Financial_Assistance': ['APPLICANT_FINANCIAL_ASSISTANCE', 'APPLICANT_TRANSACTION'],
+    'Applicant_Details': ['APPLICANT_REGISTRATION', 'APPLICANT_DETAILS'],
+    'Applicant_Income': ['APPLICANT_INCOME'],
+    'Applicant_Expense': ['APPLICANT_EXPENSE'],
+}
+
+
+def resolve_schema_file() -> str:
+    """SCHEMA_FILE, or the schema backup when it does not exist (same as the other tools)"""
+    return SCHEMA_FILE if Path(SCHEMA_FILE).exists() else FALLBACK_SCHEMA_FILE
+
 
 def normalize_name(name: str) -> str:
     """Normalize name for comparison (lowercase, remove special chars)"""
@@ -150,11 +185,14 @@ def extract_table_definitions(schema_file: str) -> Dict[str, Dict]:
         return {}
 
 
-def analyze_json_file(json_path: Path) -> Optional[Dict]:
-    """Analyze JSON file structure and extract keys/types"""
+def analyze_json_file(json_path: Path, start: Optional[date] = None, end: Optional[date] = None) -> Optional[Dict]:
+    """Analyze JSON file structure and extract keys/types (start/end prune partitioned snapshots)"""
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if json_path.is_dir():
+            # Time-partitioned snapshot (see apex_partitions.py): only partitions overlapping the range are read
+            data = read_partitioned_snapshot(json_path, start, end)
+        else:
+            data = apex_json.load_file(json_path)
         
         # Check if it's the ORDS format with "items" array
         if 'items' in data and isinstance(data['items'], list):
@@ -319,6 +357,24 @@ def map_json_to_table(json_keys: List[str], table_columns: Dict[str, Dict], tabl
     }
 
 
+def family_mapping_key(json_keys: List[str], table_columns: Dict[str, Dict], table_name: str = "") -> Tuple:
+    """Everything map_json_to_table depends on: the table's shape, the snapshot keys and which keys repeat the table name"""
+    table_normalized = normalize_name(table_name)
+    name_keys = tuple(key for key in json_keys if normalize_name(key) == table_normalized)
+    return (table_fingerprint(table_columns), tuple(json_keys), name_keys)
+
+
+def map_json_to_family(json_keys: List[str], table_columns: Dict[str, Dict], table_name: str,
+                       family_mappings: Dict[Tuple, Dict]) -> Dict:
+    """map_json_to_table, computed once per family of same-shaped tables with the same snapshot keys"""
+    key = family_mapping_key(json_keys, table_columns, table_name)
+    mapping_result = family_mappings.get(key)
+    if mapping_result is None:
+        mapping_result = map_json_to_table(json_keys, table_columns, table_name)
+        family_mappings[key] = mapping_result
+    return mapping_result
+
+
 def determine_migration_strategy(mapping_result: Dict, table_columns: Dict, json_info: Dict) -> Dict:
     """Determine migration strategy for a table"""
     mapped_count = len(mapping_result['mapping'])
@@ -362,8 +418,226 @@ def determine_migration_strategy(mapping_result: Dict, table_columns: Dict, json
     }
 
 
-def generate_report(tables: Dict, json_files: List[Path]) -> str:
-    """Generate comprehensive migration report"""
+def render_table_section(table_name: str, json_file: Path, json_info: Dict, table_columns: Dict,
+                         mapping_result: Dict, strategy_info: Dict, applicant_table_mapping: Dict,
+                         relationships: Optional[List[Dict]] = None) -> List[str]:
+    """Render the report section for one table that has a snapshot"""
+    report = []
+    
+    # Best value-based foreign-key candidate per JSON key (from discover_column_relationships.py)
+    foreign_keys = {}
+    for rel in relationships or []:
+        if rel['kind'] == 'foreign_key' and rel['child_column'] not in foreign_keys:
+            foreign_keys[rel['child_column']] = rel
+    
+    report.append(f"\n## Table: `{table_name}`\n")
+    report.append(f"**Status:** {strategy_info['category'].upper()} | **Strategy:** {strategy_info['strategy']}\n")
+    
+    # JSON Info
+    report.append("### JSON Structure\n")
+    report.append(f"- **Source File:** `{json_file.name}`")
+    report.append(f"- **Structure:** {json_info['structure']}")
+    report.append(f"- **Total Records:** {json_info['total_count']}")
+    report.append(f"- **JSON Keys:** {len(json_info['keys'])}\n")
+    
+    if json_info['keys']:
+        report.append("**Keys Found:**\n")
+        for key in json_info['keys']:
+            key_type = json_info.get('key_types', {}).get(key, 'unknown')
+            report.append(f"- `{key}` ({key_type})")
+        report.append("")
+    
+    # Backend Schema
+    report.append("### Backend Schema\n")
+    report.append(f"- **Total Columns:** {len(table_columns)}")
+    report.append(f"- **Required Columns:** {len([c for c, i in table_columns.items() if not i['nullable'] and not i['has_default']])}\n")
+    
+    # Column Mapping
+    report.append("### Column Mapping\n")
+    report.append("| JSON Key | Backend Column | Confidence | Type Match | Notes |\n")
+    report.append("|----------|----------------|------------|------------|-------|\n")
+    
+    for json_key, map_info in sorted(mapping_result['mapping'].items()):
+        col_info = map_info['column_info']
+        confidence = map_info['confidence']
+        json_type = json_info.get('key_types', {}).get(json_key, 'unknown')
+        pg_type = col_info['type']
+        
+        # Type compatibility check
+        type_match = "✓" if are_types_compatible(json_type, pg_type) else "⚠"
+        
+        notes = []
+        if not col_info['nullable']:
+            notes.append("Required")
+        if col_info['primary_key']:
+            notes.append("PK")
+        if confidence < 0.9:
+            notes.append(f"Low confidence ({confidence:.2f})")
+        if json_key in foreign_keys:
+            fk = foreign_keys[json_key]
+            notes.append(f"FK → {fk['parent_table']}.{fk['parent_column']} ({fk['confidence']:.2f})")
+        
+        notes_str = ", ".join(notes) if notes else "-"
+        report.append(f"| `{json_key}` | `{map_info['column']}` | {confidence:.2f} | {type_match} | {notes_str} |\n")
+    
+    # Unmapped JSON keys
+    if mapping_result['unmapped_json_keys']:
+        report.append("\n**⚠ Unmapped JSON Keys:**\n")
+        for key in mapping_result['unmapped_json_keys']:
+            report.append(f"- `{key}`")
+        report.append("")
+    
+    # Unmapped columns
+    if mapping_result['unmapped_columns']:
+        report.append("\n**⚠ Unmapped Backend Columns:**\n")
+        for col in mapping_result['unmapped_columns']:
+            col_info = table_columns[col]
+            required = " (Required)" if not col_info['nullable'] and not col_info['has_default'] else ""
+            report.append(f"- `{col}` ({col_info['type']}){required}")
+        report.append("")
+    
+    # Value-based relationships
+    if relationships:
+        report.append("### Inferred Relationships\n")
+        report.append("| JSON Key | Kind | References | Confidence | Containment |\n")
+        report.append("|----------|------|------------|------------|-------------|\n")
+        for rel in relationships:
+            kind = "FK" if rel['kind'] == 'foreign_key' else "Same values"
+            report.append(f"| `{rel['child_column']}` | {kind} | `{rel['parent_table']}.{rel['parent_column']}` | "
+                          f"{rel['confidence']:.2f} | {rel['containment']:.0%} |\n")
+        report.append("")
+    
+    # Migration Strategy
+    report.append("### Migration Strategy\n")
+    report.append(f"- **Category:** {strategy_info['category'].upper()}")
+    report.append(f"- **Insert Strategy:** {strategy_info['strategy']}")
+    report.append(f"- **Mapping Coverage:** {strategy_info['mapped_ratio']:.1%}")
+    report.append(f"- **Required Columns Mapped:** {'✓' if strategy_info['required_columns_mapped'] else '✗'}\n")
+    
+    # Transformation requirements
+    transformations = []
+    for json_key, map_info in mapping_result['mapping'].items():
+        json_type = json_info.get('key_types', {}).get(json_key, 'unknown')
+        pg_type = map_info['column_info']['type']
+        
+        if not are_types_compatible(json_type, pg_type):
+            transformations.append(f"- `{json_key}` → `{map_info['column']}`: Convert {json_type} to {pg_type}")
+        
+        if json_key != map_info['column']:
+            transformations.append(f"- `{json_key}` → `{map_info['column']}`: Rename field")
+    
+    if transformations:
+        report.append("**Required Transformations:**\n")
+        for trans in transformations:
+            report.append(trans)
+        report.append("")
+    else:
+        report.append("**No transformations required.**\n")
+    
+    # Warnings
+    warnings = []
+    
+    # Check if this is an applicant-related table that might need APPLICANT_ prefix
+    is_applicant_related = table_name in applicant_table_mapping
+    if is_applicant_related and strategy_info['category'] == 'skip':
+        warnings.append(f"💡 **NOTE:** This is an applicant-related table. Try fetching with APPLICANT_ prefix: {', '.join(applicant_table_mapping[table_name])}")
+    elif strategy_info['category'] == 'skip':
+        warnings.append("⚠️ **CRITICAL:** This table should be skipped - insufficient mapping coverage")
+    elif strategy_info['category'] == 'partial':
+        warnings.append("⚠️ **WARNING:** Partial mapping - some columns may need manual handling")
+    if not strategy_info['required_columns_mapped']:
+        warnings.append("⚠️ **WARNING:** Not all required columns are mapped - data may be incomplete")
+    if mapping_result['unmapped_json_keys']:
+        warnings.append(f"⚠️ **INFO:** {len(mapping_result['unmapped_json_keys'])} JSON keys not mapped (may be ignored)")
+    if mapping_result['unmapped_columns']:
+        required_unmapped = [c for c in mapping_result['unmapped_columns'] 
+                           if not table_columns[c]['nullable'] and not table_columns[c]['has_default']]
+        if required_unmapped:
+            warnings.append(f"⚠️ **WARNING:** {len(required_unmapped)} required columns not mapped - may cause insert failures")
+    for json_key, fk in sorted(foreign_keys.items()):
+        if fk['confidence'] < INTEGRITY_MIN_CONFIDENCE:
+            continue
+        parent = f"`{fk['parent_table']}.{fk['parent_column']}`"
+        if fk['containment'] < INTEGRITY_MIN_CONTAINMENT:
+            warnings.append(f"⚠️ **INTEGRITY:** ~{1 - fk['containment']:.0%} of distinct `{json_key}` values have no match in {parent} - orphan rows will fail a foreign key")
+        if fk.get('parent_duplicates'):
+            warnings.append(f"⚠️ **INTEGRITY:** {parent} holds {fk['parent_duplicates']} duplicate key values - `{json_key}` lookups are ambiguous")
+    
+    if warnings:
+        report.append("### Warnings & Notes\n")
+        for warning in warnings:
+            report.append(warning)
+        report.append("")
+    
+    report.append("---\n")
+    
+    return report
+
+
+def index_json_files(json_files: List[Path]) -> Dict[str, Path]:
+    """Map snapshot table names to files (later files win, so the newest pull is used)"""
+    json_by_table = {}
+    for json_file in json_files:
+        # Extract table name from filename (remove timestamp)
+        table_match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)_\d{8}_\d{6}(?:\.json|\.parts)$', json_file.name)
+        if table_match:
+            json_by_table[table_match.group(1)] = json_file
+    return json_by_table
+
+
+def find_json_file(table_name: str, json_by_table: Dict[str, Path]) -> Optional[Path]:
+    """Find the snapshot for a backend table (exact, normalized, then APPLICANT_ variations)"""
+    json_file = json_by_table.get(table_name)
+    
+    table_normalized = normalize_name(table_name)
+    if not json_file:
+        # Try to find by normalized name
+        for json_name, json_path in json_by_table.items():
+            if normalize_name(json_name) == table_normalized:
+                json_file = json_path
+                break
+    
+    # Try APPLICANT_ prefix mapping for applicant-related tables
+    if not json_file and table_name in APPLICANT_TABLE_MAPPING:
+        for applicant_name in APPLICANT_TABLE_MAPPING[table_name]:
+            json_file = json_by_table.get(applicant_name)
+            if json_file:
+                break
+    
+    # Also try reverse: if JSON has APPLICANT_ prefix, try matching without it
+    if not json_file:
+        for json_name, json_path in json_by_table.items():
+            # Check if JSON name starts with APPLICANT_ and table name matches the suffix
+            if json_name.startswith('APPLICANT_'):
+                suffix = json_name.replace('APPLICANT_', '')
+                # Try various transformations
+                suffix_normalized = normalize_name(suffix)
+                # Direct match
+                if suffix_normalized == table_normalized:
+                    json_file = json_path
+                    break
+                # Try matching with common variations
+                # e.g., APPLICANT_ATTACHMENT -> Attachments
+                if suffix_normalized.endswith('s') and normalize_name(table_name + 's') == suffix_normalized:
+                    json_file = json_path
+                    break
+                if table_normalized.endswith('s') and normalize_name(table_name[:-1]) == suffix_normalized:
+                    json_file = json_path
+                    break
+                # Try with underscores removed
+                suffix_underscore = suffix.replace('_', '').lower()
+                table_underscore = table_name.replace('_', '').lower()
+                if suffix_underscore == table_underscore:
+                    json_file = json_path
+                    break
+    
+    return json_file
+
+
+def generate_report(tables: Dict, json_files: List[Path], cache: Optional['ReportCache'] = None,
+                    relationships: Optional[Dict[str, List[Dict]]] = None,
+                    date_range: Optional[Tuple[Optional[date], Optional[date]]] = None) -> str:
+    """Generate comprehensive migration report (reusing unchanged sections when a cache is given)"""
     report = []
     report.append("# Data Migration Report")
     report.append(f"\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -376,214 +650,66 @@ def generate_report(tables: Dict, json_files: List[Path]) -> str:
     report.append("## Executive Summary\n")
     report.append(f"- **Total Backend Tables:** {total_tables}")
     report.append(f"- **Total JSON Files:** {total_json_files}\n")
+    if date_range:
+        start, end = date_range
+        report.append(f"- **Date Range:** {start or 'start'} .. {end or 'end'} (partitioned snapshots only)\n")
     
     # Process each JSON file
-    json_by_table = {}
-    for json_file in json_files:
-        # Extract table name from filename (remove timestamp)
-        table_match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)_\d{8}_\d{6}\.json$', json_file.name)
-        if table_match:
-            table_name = table_match.group(1)
-            json_by_table[table_name] = json_file
-    
-    # Mapping for applicant-related tables (backend table -> possible JSON file names)
-    # These tables should look for JSON files with APPLICANT_ prefix
-    applicant_table_mapping = {
-        'Attachments': ['APPLICANT_ATTACHMENT', 'APPLICANT_ATTACHMENTS'],
-        'Food_Assistance': ['APPLICANT_FOOD_ASSISTANCE'],
-        'Home_Visit': ['APPLICANT_HOME_VISIT', 'APPLICANT_HOME_VISITS'],
-        'Relationships': ['APPLICANT_RELATIONSHIP', 'APPLICANT_RELATIONSHIPS'],
-        'Tasks': ['APPLICANT_TASK', 'APPLICANT_TASKS'],
-        'Comments': ['APPLICANT_COMMENT', 'APPLICANT_COMMENTS'],
-        'Programs': ['APPLICANT_PROGRAM', 'APPLICANT_PROGRAMS'],
-        'Financial_Assistance': ['APPLICANT_FINANCIAL_ASSISTANCE', 'APPLICANT_TRANSACTION'],
-        'Applicant_Details': ['APPLICANT_REGISTRATION', 'APPLICANT_DETAILS'],
-        'Applicant_Income': ['APPLICANT_INCOME'],
-        'Applicant_Expense': ['APPLICANT_EXPENSE'],
-    }
+    json_by_table = index_json_files(json_files)
+    snapshot_names = {json_file: name for name, json_file in json_by_table.items()}
     
     categories = defaultdict(list)
+    family_mappings = cache.family_mappings if cache is not None else {}
     
     for table_name in sorted(tables.keys()):
-        json_file = json_by_table.get(table_name)
-        
-        if not json_file:
-            # Try to find by normalized name
-            table_normalized = normalize_name(table_name)
-            for json_name, json_path in json_by_table.items():
-                if normalize_name(json_name) == table_normalized:
-                    json_file = json_path
-                    break
-        
-        # Try APPLICANT_ prefix mapping for applicant-related tables
-        if not json_file and table_name in applicant_table_mapping:
-            for applicant_name in applicant_table_mapping[table_name]:
-                json_file = json_by_table.get(applicant_name)
-                if json_file:
-                    break
-        
-        # Also try reverse: if JSON has APPLICANT_ prefix, try matching without it
-        if not json_file:
-            for json_name, json_path in json_by_table.items():
-                # Check if JSON name starts with APPLICANT_ and table name matches the suffix
-                if json_name.startswith('APPLICANT_'):
-                    suffix = json_name.replace('APPLICANT_', '')
-                    # Try various transformations
-                    suffix_normalized = normalize_name(suffix)
-                    # Direct match
-                    if suffix_normalized == table_normalized:
-                        json_file = json_path
-                        break
-                    # Try matching with common variations
-                    # e.g., APPLICANT_ATTACHMENT -> Attachments
-                    if suffix_normalized.endswith('s') and normalize_name(table_name + 's') == suffix_normalized:
-                        json_file = json_path
-                        break
-                    if table_normalized.endswith('s') and normalize_name(table_name[:-1]) == suffix_normalized:
-                        json_file = json_path
-                        break
-                    # Try with underscores removed
-                    suffix_underscore = suffix.replace('_', '').lower()
-                    table_underscore = table_name.replace('_', '').lower()
-                    if suffix_underscore == table_underscore:
-                        json_file = json_path
-                        break
+        json_file = find_json_file(table_name, json_by_table)
         
         table_info = tables[table_name]
         table_columns = table_info['columns']
         
+        # Watch mode: reuse the rendered section if neither the snapshot nor the table definition changed
+        table_relationships = (relationships or {}).get(snapshot_names.get(json_file), [])
+        section_key = None
+        if cache is not None:
+            section_key = cache.section_key(table_info, json_file, table_relationships)
+            cached = cache.sections.get(table_name)
+            if cached and cached[0] == section_key:
+                if cached[1]:
+                    categories[cached[1]].append(table_name)
+                report.extend(cached[2])
+                continue
+        
+        section = []
+        category = None
         if json_file:
-            json_info = analyze_json_file(json_file)
+            with profile_span("snapshot_analysis"):
+                if cache is not None:
+                    json_info = cache.analyze(json_file)
+                else:
+                    json_info = analyze_json_file(json_file, *(date_range or (None, None)))
             if json_info and 'total_count' in json_info:
-                mapping_result = map_json_to_table(json_info['keys'], table_columns, table_name)
-                strategy_info = determine_migration_strategy(mapping_result, table_columns, json_info)
+                with profile_span("matching"):
+                    mapping_result = map_json_to_family(json_info['keys'], table_columns, table_name, family_mappings)
+                    strategy_info = determine_migration_strategy(mapping_result, table_columns, json_info)
                 
-                categories[strategy_info['category']].append(table_name)
+                category = strategy_info['category']
+                categories[category].append(table_name)
                 
                 # Generate table section
-                report.append(f"\n## Table: `{table_name}`\n")
-                report.append(f"**Status:** {strategy_info['category'].upper()} | **Strategy:** {strategy_info['strategy']}\n")
-                
-                # JSON Info
-                report.append("### JSON Structure\n")
-                report.append(f"- **Source File:** `{json_file.name}`")
-                report.append(f"- **Structure:** {json_info['structure']}")
-                report.append(f"- **Total Records:** {json_info['total_count']}")
-                report.append(f"- **JSON Keys:** {len(json_info['keys'])}\n")
-                
-                if json_info['keys']:
-                    report.append("**Keys Found:**\n")
-                    for key in json_info['keys']:
-                        key_type = json_info.get('key_types', {}).get(key, 'unknown')
-                        report.append(f"- `{key}` ({key_type})")
-                    report.append("")
-                
-                # Backend Schema
-                report.append("### Backend Schema\n")
-                report.append(f"- **Total Columns:** {len(table_columns)}")
-                report.append(f"- **Required Columns:** {len([c for c, i in table_columns.items() if not i['nullable'] and not i['has_default']])}\n")
-                
-                # Column Mapping
-                report.append("### Column Mapping\n")
-                report.append("| JSON Key | Backend Column | Confidence | Type Match | Notes |\n")
-                report.append("|----------|----------------|------------|------------|-------|\n")
-                
-                for json_key, map_info in sorted(mapping_result['mapping'].items()):
-                    col_info = map_info['column_info']
-                    confidence = map_info['confidence']
-                    json_type = json_info.get('key_types', {}).get(json_key, 'unknown')
-                    pg_type = col_info['type']
-                    
-                    # Type compatibility check
-                    type_match = "✓" if are_types_compatible(json_type, pg_type) else "⚠"
-                    
-                    notes = []
-                    if not col_info['nullable']:
-                        notes.append("Required")
-                    if col_info['primary_key']:
-                        notes.append("PK")
-                    if confidence < 0.9:
-                        notes.append(f"Low confidence ({confidence:.2f})")
-                    
-                    notes_str = ", ".join(notes) if notes else "-"
-                    report.append(f"| `{json_key}` | `{map_info['column']}` | {confidence:.2f} | {type_match} | {notes_str} |\n")
-                
-                # Unmapped JSON keys
-                if mapping_result['unmapped_json_keys']:
-                    report.append("\n**⚠ Unmapped JSON Keys:**\n")
-                    for key in mapping_result['unmapped_json_keys']:
-                        report.append(f"- `{key}`")
-                    report.append("")
-                
-                # Unmapped columns
-                if mapping_result['unmapped_columns']:
-                    report.append("\n**⚠ Unmapped Backend Columns:**\n")
-                    for col in mapping_result['unmapped_columns']:
-                        col_info = table_columns[col]
-                        required = " (Required)" if not col_info['nullable'] and not col_info['has_default'] else ""
-                        report.append(f"- `{col}` ({col_info['type']}){required}")
-                    report.append("")
-                
-                # Migration Strategy
-                report.append("### Migration Strategy\n")
-                report.append(f"- **Category:** {strategy_info['category'].upper()}")
-                report.append(f"- **Insert Strategy:** {strategy_info['strategy']}")
-                report.append(f"- **Mapping Coverage:** {strategy_info['mapped_ratio']:.1%}")
-                report.append(f"- **Required Columns Mapped:** {'✓' if strategy_info['required_columns_mapped'] else '✗'}\n")
-                
-                # Transformation requirements
-                transformations = []
-                for json_key, map_info in mapping_result['mapping'].items():
-                    json_type = json_info.get('key_types', {}).get(json_key, 'unknown')
-                    pg_type = map_info['column_info']['type']
-                    
-                    if not are_types_compatible(json_type, pg_type):
-                        transformations.append(f"- `{json_key}` → `{map_info['column']}`: Convert {json_type} to {pg_type}")
-                    
-                    if json_key != map_info['column']:
-                        transformations.append(f"- `{json_key}` → `{map_info['column']}`: Rename field")
-                
-                if transformations:
-                    report.append("**Required Transformations:**\n")
-                    for trans in transformations:
-                        report.append(trans)
-                    report.append("")
-                else:
-                    report.append("**No transformations required.**\n")
-                
-                # Warnings
-                warnings = []
-                
-                # Check if this is an applicant-related table that might need APPLICANT_ prefix
-                is_applicant_related = table_name in applicant_table_mapping
-                if is_applicant_related and strategy_info['category'] == 'skip':
-                    warnings.append(f"💡 **NOTE:** This is an applicant-related table. Try fetching with APPLICANT_ prefix: {', '.join(applicant_table_mapping[table_name])}")
-                elif strategy_info['category'] == 'skip':
-                    warnings.append("⚠️ **CRITICAL:** This table should be skipped - insufficient mapping coverage")
-                elif strategy_info['category'] == 'partial':
-                    warnings.append("⚠️ **WARNING:** Partial mapping - some columns may need manual handling")
-                if not strategy_info['required_columns_mapped']:
-                    warnings.append("⚠️ **WARNING:** Not all required columns are mapped - data may be incomplete")
-                if mapping_result['unmapped_json_keys']:
-                    warnings.append(f"⚠️ **INFO:** {len(mapping_result['unmapped_json_keys'])} JSON keys not mapped (may be ignored)")
-                if mapping_result['unmapped_columns']:
-                    required_unmapped = [c for c in mapping_result['unmapped_columns'] 
-                                       if not table_columns[c]['nullable'] and not table_columns[c]['has_default']]
-                    if required_unmapped:
-                        warnings.append(f"⚠️ **WARNING:** {len(required_unmapped)} required columns not mapped - may cause insert failures")
-                
-                if warnings:
-                    report.append("### Warnings & Notes\n")
-                    for warning in warnings:
-                        report.append(warning)
-                    report.append("")
-                
-                report.append("---\n")
+                with profile_span("rendering"):
+                    section.extend(render_table_section(table_name, json_file, json_info, table_columns,
+                                                        mapping_result, strategy_info, APPLICANT_TABLE_MAPPING,
+                                                        table_relationships))
         else:
-            report.append(f"\n## Table: `{table_name}`\n")
-            report.append("**Status:** NO JSON FILE FOUND\n")
-            report.append("⚠️ No corresponding JSON file found for this table.\n")
-            report.append("---\n")
+            section.append(f"\n## Table: `{table_name}`\n")
+            section.append("**Status:** NO JSON FILE FOUND\n")
+            section.append("⚠️ No corresponding JSON file found for this table.\n")
+            section.append("---\n")
+        
+        report.extend(section)
+        if cache is not None:
+            cache.sections[table_name] = (section_key, category, section)
+            cache.rendered_sections += 1
     
     # Category Summary
     report.append("\n## Migration Summary by Category\n\n")
@@ -594,21 +720,51 @@ def generate_report(tables: Dict, json_files: List[Path]) -> str:
     report.append(f"| **SKIP** | {len(categories['skip'])} | {', '.join(categories['skip']) if categories['skip'] else 'None'} |\n")
     report.append(f"| **EMPTY** | {len(categories['empty'])} | {', '.join(categories['empty']) if categories['empty'] else 'None'} |\n")
     
+    # Same-shaped backend tables share one mapping whenever their snapshots have the same keys
+    families = group_families({name: table_fingerprint(info['columns']) for name, info in tables.items()})
+    shared = [members for members in families.values() if len(members) > 1]
+    if shared:
+        report.append("\n## Schema Families\n\n")
+        report.append("Tables with identical column definitions; they can share one migration plan.\n\n")
+        report.append("| Family | Count | Tables |\n")
+        report.append("|--------|-------|--------|\n")
+        for members in sorted(shared, key=lambda m: (-len(m), m)):
+            report.append(f"| `{family_label(members)}` | {len(members)} | {', '.join(members)} |\n")
+    
     # Applicant-related tables summary
-    applicant_skip_tables = [t for t in categories['skip'] if t in applicant_table_mapping]
+    applicant_skip_tables = [t for t in categories['skip'] if t in APPLICANT_TABLE_MAPPING]
     if applicant_skip_tables:
         report.append("\n## Applicant-Related Tables (Need APPLICANT_ Prefix)\n\n")
         report.append("The following tables are applicant-related and should be re-fetched with the `APPLICANT_` prefix:\n\n")
         report.append("| Backend Table | Suggested API Endpoint(s) |\n")
         report.append("|---------------|--------------------------|\n")
         for table in sorted(applicant_skip_tables):
-            endpoints = ', '.join([f"`{e}`" for e in applicant_table_mapping[table]])
+            endpoints = ', '.join([f"`{e}`" for e in APPLICANT_TABLE_MAPPING[table]])
             report.append(f"| `{table}` | {endpoints} |\n")
         report.append("\n**Note:** Re-run the fetch script (`fetch_apex_data.py`) - it has been updated to automatically try APPLICANT_ prefix variations for these tables.\n")
     
     return "\n".join(report)
 
 
+def load_column_relationships(path: Path = RELATIONSHIPS_FILE) -> Dict[str, List[Dict]]:
+    """Load discovered relationships grouped by child (snapshot) table; empty if not generated"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    by_table = defaultdict(list)
+    for relationship in data.get('relationships', []):
+        by_table[relationship['child_table']].append(relationship)
+        if relationship['kind'] == 'correspondence':
+            # Correspondences are symmetric; show them from both sides
+            mirrored = dict(relationship,
+                            child_table=relationship['parent_table'], child_column=relationship['parent_column'],
+                            parent_table=relationship['child_table'], parent_column=relationship['child_column'])
+            by_table[mirrored['child_table']].append(mirrored)
+    return dict(by_table)
+
+
 def are_types_compatible(json_type: str, pg_type: str) -> bool:
     """Check if JSON type is compatible with PostgreSQL type"""
     json_type_lower = json_type.lower()
@@ -645,16 +801,155 @@ def are_types_compatible(json_type: str, pg_type: str) -> bool:
     return True  # Default to compatible if unsure
 
 
-def main():
-    """Main execution"""
+class ReportCache:
+    """Warm state kept between renders in --watch mode"""
+    
+    def __init__(self):
+        self.schema_key = None
+        self.tables = {}
+        self.relationships_key = None
+        self.relationships = {}
+        self.analyses = {}   # snapshot path -> (stat key, analyze_json_file result)
+        self.sections = {}   # table name -> (section key, category, rendered lines)
+        self.family_mappings = {}  # family_mapping_key -> map_json_to_table result
+        self.rendered_sections = 0
+    
+    @staticmethod
+    def stat_key(path: Path) -> Optional[Tuple[int, int]]:
+        """Change-detection key for a file (a partitioned snapshot is keyed by its manifest)"""
+        if path.is_dir():
+            path = path / PARTITION_MANIFEST_NAME
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def load_tables(self, schema_file: str) -> Dict[str, Dict]:
+        """Re-parse the schema only when the file changed"""
+        key = (schema_file, self.stat_key(Path(schema_file)))
+        if key != self.schema_key or not self.tables:
+            self.tables = extract_table_definitions(schema_file)
+            self.schema_key = key
+            self.family_mappings = {}
+        return self.tables
+    
+    def load_relationships(self) -> Dict[str, List[Dict]]:
+        """Reload discovered relationships only when the file changed"""
+        key = self.stat_key(RELATIONSHIPS_FILE)
+        if key != self.relationships_key:
+            self.relationships = load_column_relationships(RELATIONSHIPS_FILE)
+            self.relationships_key = key
+        return self.relationships
+    
+    def analyze(self, json_file: Path) -> Optional[Dict]:
+        """analyze_json_file, cached until the snapshot changes"""
+        key = self.stat_key(json_file)
+        cached = self.analyses.get(json_file)
+        if cached and cached[0] == key:
+            return cached[1]
+        json_info = analyze_json_file(json_file)
+        self.analyses[json_file] = (key, json_info)
+        return json_info
+    
+    def section_key(self, table_info: Dict, json_file: Optional[Path], relationships: List[Dict]) -> Tuple:
+        """Everything a table's section depends on"""
+        table_key = json.dumps([table_info, relationships], sort_keys=True, default=str)
+        if json_file is None:
+            return (table_key, None, None)
+        return (table_key, str(json_file), self.stat_key(json_file))
+
+
+def scan_watch_dirs(watch_dirs: List[Path]) -> Dict[str, Tuple[int, int]]:
+    """Snapshot (mtime, size) of every file under the watched directories"""
+    state = {}
+    for watch_dir in watch_dirs:
+        if not watch_dir.exists():
+            continue
+        for root, _, files in os.walk(watch_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def render_report_to_file(cache: ReportCache) -> Optional[int]:
+    """Render the report from warm state; returns the number of tables re-rendered"""
+    tables = cache.load_tables(resolve_schema_file())
+    if not tables or not JSON_DIR.exists():
+        return None
+    json_files = sorted(list(JSON_DIR.glob("*.json")) + list(JSON_DIR.glob(f"*{PARTITION_SUFFIX}")))
+    cache.rendered_sections = 0
+    report = generate_report(tables, json_files, cache, cache.load_relationships())
+    with open(OUTPUT_REPORT, 'w', encoding='utf-8') as f:
+        f.write(report)
+    # Forget snapshots that were deleted or replaced by a newer pull
+    live = set(json_files)
+    for path in [p for p in cache.analyses if p not in live]:
+        del cache.analyses[path]
+    for table_name in [t for t in cache.sections if t not in tables]:
+        del cache.sections[table_name]
+    return cache.rendered_sections
+
+
+def watch_report(interval: float = WATCH_INTERVAL):
+    """Keep the report up to date while the schema or snapshots change"""
+    print("=" * 70)
+    print("Data Migration Report Generator (watch mode)")
+    print("=" * 70)
+    for watch_dir in WATCH_DIRS:
+        print(f"[*] Watching: {watch_dir}")
+    
+    cache = ReportCache()
+    started = time.perf_counter()
+    rendered = render_report_to_file(cache)
+    if rendered is None:
+        print("[!] No tables or JSON directory found; waiting for changes...")
+    else:
+        print(f"[+] Initial report: {rendered} sections in {(time.perf_counter() - started) * 1000:.0f} ms -> {OUTPUT_REPORT}")
+    
+    state = scan_watch_dirs(WATCH_DIRS)
+    try:
+        while True:
+            time.sleep(interval)
+            new_state = scan_watch_dirs(WATCH_DIRS)
+            if new_state == state:
+                continue
+            changed = sorted(p for p in set(state) | set(new_state) if state.get(p) != new_state.get(p))
+            state = new_state
+            
+            started = time.perf_counter()
+            try:
+                rendered = render_report_to_file(cache)
+            except Exception as e:
+                print(f"[!] Error rendering report: {e}")
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            shown = ", ".join(os.path.basename(p) for p in changed[:3]) + (" ..." if len(changed) > 3 else "")
+            if rendered is None:
+                print(f"[!] {shown}: no tables or JSON directory found")
+            else:
+                print(f"[+] {datetime.now().strftime('%H:%M:%S')} {shown}: re-rendered {rendered} sections in {elapsed:.0f} ms")
+    except KeyboardInterrupt:
+        print("\n[*] Watch stopped")
+
+
+def run_report(date_range: Optional[Tuple[Optional[date], Optional[date]]] = None):
+    """Parse the schema, analyze the snapshots and write the report"""
     print("=" * 70)
     print("Data Migration Report Generator")
     print("=" * 70)
     print()
     
     # Extract table definitions
-    print(f"[*] Reading schema file: {SCHEMA_FILE}")
-    tables = extract_table_definitions(SCHEMA_FILE)
+    schema_file = resolve_schema_file()
+    print(f"[*] Reading schema file: {schema_file}")
+    with profile_span("schema_parse"):
+        tables = extract_table_definitions(schema_file)
     
     if not tables:
         print("[!] No tables found. Exiting.")
@@ -666,22 +961,69 @@ def main():
         print(f"[!] JSON directory not found: {JSON_DIR}")
         return
     
-    json_files = sorted(JSON_DIR.glob("*.json"))
+    json_files = sorted(list(JSON_DIR.glob("*.json")) + list(JSON_DIR.glob(f"*{PARTITION_SUFFIX}")))
     print(f"[+] Found {len(json_files)} JSON files")
+    if date_range:
+        for part_dir in [p for p in json_files if (p / PARTITION_MANIFEST_NAME).exists()]:
+            excluded = undated_rows_excluded(load_manifest(part_dir), *date_range)
+            if excluded:
+                print(f"[!] {part_dir.name}: {excluded} undated rows excluded by --from/--to")
     
     # Generate report
     print("\n[*] Generating migration report...")
-    report = generate_report(tables, json_files)
+    relationships = load_column_relationships(RELATIONSHIPS_FILE)
+    if relationships:
+        print(f"[+] Loaded inferred relationships for {len(relationships)} snapshots from {RELATIONSHIPS_FILE}")
+    
+    with profile_span("generate_report"):
+        report = generate_report(tables, json_files, relationships=relationships, date_range=date_range)
     
     # Save report
     output_path = Path(OUTPUT_REPORT)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    with profile_span("save"):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(report)
     
     print(f"\n[+] Report saved to: {output_path}")
     print("=" * 70)
 
 
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Generate the data migration report")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and re-render changed sections when the schema or snapshots change")
+    parser.add_argument('--from', dest='start', help="Only read partitions from this date (YYYY-MM or YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end', help="Only read partitions up to this date (YYYY-MM or YYYY-MM-DD)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    try:
+        date_range = (parse_bound(args.start), parse_bound(args.end, upper=True))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.watch and any(date_range):
+        parser.error("--from/--to cannot be combined with --watch")
+    
+    if args.watch:
+        watch_report()
+        return
+    
+    if profile_requested(args):
+        start_profiler("generate_migration_report", cpu=args.profile_cpu, memory=args.profile_memory)
+    try:
+        run_report(date_range if any(date_range) else None)
+    finally:
+        profiler = stop_profiler()
+        if profiler:
+            profile_path = Path(OUTPUT_REPORT).with_suffix('.profile.json')
+            written = profiler.save(profile_path)
+            print("\nPROFILE")
+            for line in profiler.summary_lines():
+                print(line)
+            for path in written:
+                print(f"[+] Profile saved to: {path}")
+
+
 if __name__ == "__main__":
     main()
 
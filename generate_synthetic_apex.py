@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Synthetic APEX Dataset Generator
+Creates ORDS-shaped snapshots modelled on the column sets and value
+distributions in apex/, scaled to N times the real row counts
+
+Usage:
+    python generate_synthetic_apex.py --scale 10
+    python generate_synthetic_apex.py --scale 100 --table APPLICANT_TRANSACTION --output-dir synthetic_apex
+"""
+
+import re
+import random
+import argparse
+from bisect import bisect
+from itertools import accumulate
+from pathlib import Path
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import apex_json
+from apex_index import find_latest_snapshots, load_snapshot_items
+
+# Configuration
+JSON_DIR = Path("apex")
+SYNTHETIC_DIR = Path("synthetic_apex")
+DEFAULT_SEED = 42
+ORDS_BASE_URL = "https://synthetic.invalid/ords/sanzaf/apex_to_pg"
+
+# Columns with at most this many distinct values are sampled by observed frequency
+CATEGORICAL_MAX_DISTINCT = 1000
+ISO_DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$')
+
+
+class ColumnModel:
+    """Value distribution of one snapshot column"""
+
+    def __init__(self, name: str, values: List):
+        self.name = name
+        non_null = [v for v in values if v is not None]
+        self.null_rate = 1 - len(non_null) / len(values) if values else 1.0
+        self.kind = 'null'
+        if not non_null:
+            return
+
+        distinct = Counter(non_null) if all(isinstance(v, (str, int, float, bool)) for v in non_null) else None
+        is_int = all(isinstance(v, int) and not isinstance(v, bool) for v in non_null)
+        is_number = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in non_null)
+
+        if is_int and distinct is not None and len(distinct) == len(non_null) and self.null_rate == 0:
+            # Unique integer column (primary key style): keep generating fresh ids
+            self.kind = 'sequence'
+            self.start = min(non_null)
+        elif distinct is not None and len(distinct) <= CATEGORICAL_MAX_DISTINCT:
+            self.kind = 'categorical'
+            self.choices = list(distinct.keys())
+            self.cum_weights = list(accumulate(distinct.values()))
+        elif is_number:
+            self.kind = 'int_range' if is_int else 'float_range'
+            self.low, self.high = min(non_null), max(non_null)
+        elif all(isinstance(v, str) and ISO_DATE_PATTERN.match(v) for v in non_null):
+            self.kind = 'iso_date'
+            parsed = [datetime.strptime(v, '%Y-%m-%dT%H:%M:%SZ') for v in non_null]
+            self.low = min(parsed)
+            self.span_days = max((max(parsed) - self.low).days, 1)
+        else:
+            # Free text (names, notes): resample observed values so lengths stay realistic
+            self.kind = 'sample'
+            self.choices = non_null
+
+    def generate(self, rng: random.Random, row_index: int):
+        if self.kind == 'null':
+            return None
+        if self.kind == 'sequence':
+            return self.start + row_index
+        if self.null_rate and rng.random() < self.null_rate:
+            return None
+        if self.kind == 'categorical':
+            return self.choices[bisect(self.cum_weights, rng.random() * self.cum_weights[-1])]
+        if self.kind == 'int_range':
+            return rng.randint(self.low, self.high)
+        if self.kind == 'float_range':
+            return round(rng.uniform(self.low, self.high), 2)
+        if self.kind == 'iso_date':
+            return (self.low + timedelta(days=rng.randrange(self.span_days + 1))).strftime('%Y-%m-%dT%H:%M:%SZ')
+        return rng.choice(self.choices)
+
+
+def build_table_model(items: List[Dict]) -> Dict[str, ColumnModel]:
+    """Build column models for every key seen in a snapshot"""
+    columns = []
+    seen = set()
+    for item in items:
+        for key in item:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    return {col: ColumnModel(col, [item.get(col) for item in items]) for col in columns}
+
+
+def write_synthetic_snapshot(table_name: str, model: Dict[str, ColumnModel], row_count: int,
+                             output_path: Path, rng: random.Random) -> None:
+    """Stream an ORDS-shaped snapshot to disk without holding the rows in memory"""
+    columns = list(model.items())
+    with open(output_path, 'wb') as f:
+        f.write(b'{\n  "items": [')
+        for row_index in range(row_count):
+            row = {name: column.generate(rng, row_index) for name, column in columns}
+            f.write(b',\n    ' if row_index else b'\n    ')
+            f.write(apex_json.dumps(row))
+        f.write(b'\n  ],\n')
+        links = {
+            'first': {'$ref': f"{ORDS_BASE_URL}/{table_name}"},
+            'next': {'$ref': f"{ORDS_BASE_URL}/{table_name}?page=1"},
+        }
+        # The ORDS links follow the items as top-level keys
+        f.write(b',\n'.join(b'  ' + apex_json.dumps(key) + b': ' + apex_json.dumps(value)
+                            for key, value in links.items()))
+        f.write(b'\n}\n')
+
+
+def generate_dataset(scale: int, json_dir: Path = JSON_DIR, output_dir: Optional[Path] = None,
+                     tables: Optional[List[str]] = None, seed: int = DEFAULT_SEED) -> Path:
+    """Generate a scaled copy of every (or selected) snapshot; returns the dataset directory"""
+    output_dir = output_dir or SYNTHETIC_DIR / f"scale_{scale}x"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    snapshots = find_latest_snapshots(json_dir)
+
+    for table_name, json_path in sorted(snapshots.items()):
+        if tables and table_name not in tables:
+            continue
+        items = load_snapshot_items(json_path)
+        model = build_table_model(items)
+        # Seed per table so a single table regenerates identically on its own
+        rng = random.Random(f"{seed}:{table_name}")
+        row_count = len(items) * scale
+        output_path = output_dir / f"{table_name}_{timestamp}.json"
+        write_synthetic_snapshot(table_name, model, row_count, output_path, rng)
+        print(f"  [+] {table_name}: {len(items)} -> {row_count} rows")
+
+    return output_dir
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Generate scaled synthetic APEX snapshots")
+    parser.add_argument('--scale', type=int, default=10, help="Row-count multiplier (e.g. 10, 100, 1000)")
+    parser.add_argument('--json-dir', type=Path, default=JSON_DIR, help=f"Source snapshots (default: {JSON_DIR})")
+    parser.add_argument('--output-dir', type=Path, help=f"Output directory (default: {SYNTHETIC_DIR}/scale_<N>x)")
+    parser.add_argument('--table', action='append', help="Only generate this table (repeatable)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"Synthetic APEX Dataset Generator ({args.scale}x)")
+    print("=" * 70)
+    output_dir = generate_dataset(args.scale, args.json_dir, args.output_dir, args.table, args.seed)
+    print(f"[+] Dataset written to: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
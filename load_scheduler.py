@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+Foreign-Key-Aware Parallel Load Scheduler
+Loads the mapped apex/ snapshots into the database in dependency order.
+Instead of the hand-ordered insert_data.sql run serially in one session, every
+table whose parents are loaded runs concurrently on its own connection, so a
+full load takes roughly the time of the longest foreign-key chain.
+
+The dependency DAG comes from the schema's FOREIGN KEY / REFERENCES clauses;
+which snapshot feeds which table (and how its keys map to columns) comes from
+the migration report's matching. Each table loads in one transaction that
+drops its non-unique secondary indexes, inserts the rows and rebuilds the
+indexes, so a failed table is rolled back whole (indexes included) and the
+tables that reference it are skipped. Foreign keys stay enforced, which is
+cheap because parents are always complete before their children start.
+
+Targets:
+    --sqlite PATH   local SQLite stand-in (schema created from the SQL file)
+    --dsn DSN       PostgreSQL with the schema already applied (needs psycopg2)
+
+Usage:
+    python load_scheduler.py --plan
+    python load_scheduler.py --sqlite migration_test.sqlite --workers 8
+    python load_scheduler.py --dsn "dbname=welfare user=postgres" --workers 8
+"""
+
+import re
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import generate_migration_report as report_tool
+from apex_index import load_snapshot_items
+
+# Configuration
+JSON_DIR = Path("apex")
+DEFAULT_WORKERS = 4
+BATCH_SIZE = 500
+LOAD_CATEGORIES = ('safe', 'partial')  # Report categories that are loaded
+MAX_REJECT_SAMPLES = 3  # Error messages kept per table for rejected rows
+
+FOREIGN_KEY_PATTERN = re.compile(
+    r'FOREIGN\s+KEY\s*\(\s*(\w+)\s*\)\s*REFERENCES\s+(\w+)\s*\(\s*(\w+)\s*\)', re.IGNORECASE)
+INLINE_REFERENCE_PATTERN = re.compile(r'REFERENCES\s+(\w+)\s*\(\s*(\w+)\s*\)', re.IGNORECASE)
+INDEX_PATTERN = re.compile(
+    r'CREATE\s+INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(\w+)\s*\(([^;]*)\)\s*;', re.IGNORECASE)
+
+# PostgreSQL column syntax rewritten for the SQLite stand-in
+SQLITE_REWRITES = [
+    (re.compile(r'^(?:BIG)?SERIAL\b', re.IGNORECASE), 'INTEGER'),
+    (re.compile(r'\bDEFAULT\s+now\(\)', re.IGNORECASE), 'DEFAULT CURRENT_TIMESTAMP'),
+    (re.compile(r'\s*\bDEFAULT\s+gen_random_uuid\(\)', re.IGNORECASE), ''),
+]
+
+
+def parse_foreign_keys(table_info: Dict) -> List[Tuple[str, str, str]]:
+    """(column, parent table, parent column) for every foreign key of a table"""
+    foreign_keys = []
+    for constraint in table_info['constraints']:
+        foreign_keys.extend(FOREIGN_KEY_PATTERN.findall(constraint))
+    for column, info in table_info['columns'].items():
+        match = INLINE_REFERENCE_PATTERN.search(info['full_definition'])
+        if match:
+            foreign_keys.append((column, match.group(1), match.group(2)))
+    return foreign_keys
+
+
+def build_dependency_graph(tables: Dict[str, Dict]) -> Dict[str, Set[str]]:
+    """Map each table to the set of tables it references (self-references ignored)"""
+    by_lower = {name.lower(): name for name in tables}
+    parents = {}
+    for table_name, table_info in tables.items():
+        parents[table_name] = set()
+        for _, parent, _ in parse_foreign_keys(table_info):
+            parent_name = by_lower.get(parent.lower())
+            if parent_name and parent_name != table_name:
+                parents[table_name].add(parent_name)
+    return parents
+
+
+def dependency_levels(parents: Dict[str, Set[str]]) -> Tuple[List[List[str]], List[str]]:
+    """Kahn's algorithm by waves; returns (levels, tables left over in cycles)"""
+    remaining = {table: set(deps) for table, deps in parents.items()}
+    levels = []
+    while remaining:
+        ready = sorted(table for table, deps in remaining.items() if not deps)
+        if not ready:
+            break
+        levels.append(ready)
+        for table in ready:
+            del remaining[table]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return levels, sorted(remaining)
+
+
+def critical_path(parents: Dict[str, Set[str]], weights: Dict[str, float]) -> Tuple[List[str], float]:
+    """Heaviest dependency chain: the lower bound on a fully parallel load"""
+    levels, cyclic = dependency_levels(parents)
+    finish = {}
+    previous = {}
+    for table in [t for level in levels for t in level] + cyclic:
+        start = 0.0
+        for parent in parents[table]:
+            if finish.get(parent, 0.0) > start:
+                start = finish[parent]
+                previous[table] = parent
+        finish[table] = start + weights.get(table, 0.0)
+
+    if not finish:
+        return [], 0.0
+    table = max(finish, key=lambda t: finish[t])
+    total = finish[table]
+    path = [table]
+    while table in previous:
+        table = previous[table]
+        path.append(table)
+    return list(reversed(path)), total
+
+
+def parse_secondary_indexes(schema_file: Path, tables: Dict[str, Dict]) -> Dict[str, List[Tuple[str, str]]]:
+    """Non-unique CREATE INDEX statements by table (unique indexes are constraints, never deferred)"""
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    columns_by_table = {name.lower(): {col.lower() for col in info['columns']} for name, info in tables.items()}
+    indexes = {}
+    for match in INDEX_PATTERN.finditer(content):
+        table = match.group(2).lower()
+        columns = {col.strip().lower() for col in match.group(3).split(',')}
+        # Only indexes on columns the parsed schema knows (the parser drops columns after comment lines)
+        if columns <= columns_by_table.get(table, set()):
+            indexes.setdefault(table, []).append((match.group(1), match.group(0)))
+    return indexes
+
+
+def plan_table_loads(tables: Dict[str, Dict], json_files: List[Path]) -> Dict[str, Dict]:
+    """Snapshot, column mapping and strategy for every table the report would migrate"""
+    json_by_table = report_tool.index_json_files(json_files)
+    family_mappings = {}
+    plans = {}
+    for table_name, table_info in tables.items():
+        json_file = report_tool.find_json_file(table_name, json_by_table)
+        if not json_file:
+            continue
+        json_info = report_tool.analyze_json_file(json_file)
+        if not json_info or not json_info.get('total_count'):
+            continue
+        plan = plan_table_load(table_name, table_info, json_info, family_mappings)
+        if plan:
+            plan['json_file'] = json_file
+            plans[table_name] = plan
+    return plans
+
+
+def plan_table_load(table_name: str, table_info: Dict, json_info: Dict,
+                    family_mappings: Optional[Dict] = None) -> Optional[Dict]:
+    """Column mapping and strategy for one table, or None if the report would not migrate it"""
+    table_columns = table_info['columns']
+    if family_mappings is None:
+        family_mappings = {}
+    mapping_result = report_tool.map_json_to_family(json_info['keys'], table_columns, table_name, family_mappings)
+    strategy_info = report_tool.determine_migration_strategy(mapping_result, table_columns, json_info)
+    if strategy_info['category'] not in LOAD_CATEGORIES:
+        return None
+
+    # Several keys can land on one column (comment_id and file_id -> ID); the most confident keeps it
+    mapping = mapping_result['mapping']
+    column_sources = {}
+    displaced = []
+    for json_key in sorted(mapping, key=lambda key: -mapping[key]['confidence']):
+        if mapping[json_key]['column'] in column_sources:
+            displaced.append(json_key)
+        else:
+            column_sources[mapping[json_key]['column']] = json_key
+
+    # A displaced key still loads into the column its name matches exactly (file_id -> File_ID) if that is
+    # free; otherwise it is reported rather than dropped silently
+    columns_by_name = {report_tool.normalize_name(column): column for column in table_columns}
+    unloaded_keys = {}
+    for json_key in displaced:
+        column = columns_by_name.get(report_tool.normalize_name(json_key))
+        if column and column not in column_sources:
+            column_sources[column] = json_key
+        else:
+            unloaded_keys[json_key] = mapping[json_key]['column']
+
+    return {
+        'rows': json_info['total_count'],
+        'strategy': strategy_info['strategy'],
+        'columns': column_sources,
+        'unloaded_keys': unloaded_keys,
+        'primary_key': next((col for col, info in table_columns.items() if info['primary_key']), None),
+    }
+
+
+def coerce_value(value, booleans_as_int: bool):
+    """Snapshot value to a DB-API parameter"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, bool) and booleans_as_int:
+        return int(value)
+    return value
+
+
+def build_rows(items: List[Dict], plan: Dict, columns: List[str], booleans_as_int: bool) -> List[tuple]:
+    """Parameter tuples (in the order of columns) for snapshot items"""
+    return [
+        tuple(coerce_value(item.get(plan['columns'][col]), booleans_as_int) for col in columns)
+        for item in items if isinstance(item, dict)
+    ]
+
+
+class SQLiteTarget:
+    """SQLite stand-in for PostgreSQL; creates the schema itself"""
+
+    placeholder = '?'
+    errors = (sqlite3.Error,)
+    booleans_as_int = True
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def connect(self):
+        conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def begin(self, conn):
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue instead of deadlocking
+        conn.execute("BEGIN IMMEDIATE")
+
+    def commit(self, conn):
+        conn.execute("COMMIT")
+
+    def rollback(self, conn):
+        conn.execute("ROLLBACK")
+
+    def quote(self, conn, name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def create_schema(self, tables: Dict[str, Dict], parents: Dict[str, Set[str]],
+                      indexes: Dict[str, List[Tuple[str, str]]]):
+        conn = self.connect()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            levels, cyclic = dependency_levels(parents)
+            for table_name in [t for level in levels for t in level] + cyclic:
+                conn.execute(sqlite_table_ddl(table_name, tables[table_name]))
+            for table_indexes in indexes.values():
+                for name, statement in table_indexes:
+                    conn.execute(f"DROP INDEX IF EXISTS {self.quote(conn, name)}")
+                    conn.execute(statement)
+        finally:
+            conn.close()
+
+    def reset_sequence(self, conn, table_name: str, table_info: Dict):
+        pass  # INTEGER PRIMARY KEY continues from MAX(rowid) on its own
+
+
+class PostgresTarget:
+    """PostgreSQL target; the schema must already be applied"""
+
+    placeholder = '%s'
+    booleans_as_int = False
+
+    def __init__(self, dsn: str):
+        try:
+            import psycopg2
+            from psycopg2 import sql
+        except ImportError:
+            raise SystemExit("[!] psycopg2 is required for --dsn (pip install psycopg2-binary)")
+        self.psycopg2 = psycopg2
+        self.sql = sql
+        self.dsn = dsn
+        self.errors = (psycopg2.Error,)
+
+    def connect(self):
+        return self.psycopg2.connect(self.dsn)
+
+    def begin(self, conn):
+        pass  # psycopg2 opens a transaction on the first statement
+
+    def commit(self, conn):
+        conn.commit()
+
+    def rollback(self, conn):
+        conn.rollback()
+
+    def quote(self, conn, name: str) -> str:
+        """Quoted identifier; the schema's names are unquoted, so PostgreSQL stored them in lower case"""
+        return self.sql.Identifier(name.lower()).as_string(conn)
+
+    def create_schema(self, tables: Dict[str, Dict], parents: Dict[str, Set[str]],
+                      indexes: Dict[str, List[Tuple[str, str]]]):
+        pass
+
+    def reset_sequence(self, conn, table_name: str, table_info: Dict):
+        """Move SERIAL sequences past the preserved APEX ids (as insert_data.sql does with setval)"""
+        for column, info in table_info['columns'].items():
+            if re.match(r'(?:BIG)?SERIAL\b', info['full_definition'], re.IGNORECASE):
+                query = self.sql.SQL(
+                    "SELECT setval(pg_get_serial_sequence(%s, %s), GREATEST(COALESCE(MAX({column}), 1), 1)) "
+                    "FROM {table}").format(column=self.sql.Identifier(column.lower()),
+                                           table=self.sql.Identifier(table_name.lower()))
+                cursor = conn.cursor()
+                cursor.execute(query, (self.quote(conn, table_name), column.lower()))
+                conn.commit()
+
+
+def sqlite_table_ddl(table_name: str, table_info: Dict) -> str:
+    """CREATE TABLE for the SQLite stand-in, keeping keys, NOT NULL, defaults and foreign keys"""
+    lines = []
+    for column, info in table_info['columns'].items():
+        definition = info['full_definition']
+        for pattern, replacement in SQLITE_REWRITES:
+            definition = pattern.sub(replacement, definition)
+        lines.append(f"    {column} {definition}")
+    for constraint in table_info['constraints']:
+        match = FOREIGN_KEY_PATTERN.search(constraint)
+        # The report's parser drops columns that follow a comment line; skip their constraints
+        if match and match.group(1) in table_info['columns']:
+            lines.append(f"    {constraint}")
+    return f"CREATE TABLE IF NOT EXISTS {table_name} (\n" + ",\n".join(lines) + "\n)"
+
+
+def insert_statement(table_name: str, columns: List[str], primary_key: Optional[str],
+                     strategy: str, placeholder: str, quote: Callable[[str], str]) -> str:
+    """INSERT (or upsert on the primary key) for one row of the given columns, identifiers quoted"""
+    sql = (f"INSERT INTO {quote(table_name)} ({', '.join(quote(col) for col in columns)}) "
+           f"VALUES ({', '.join([placeholder] * len(columns))})")
+    if strategy == 'UPSERT' and primary_key in columns:
+        updates = [f"{quote(col)} = excluded.{quote(col)}" for col in columns if col != primary_key]
+        if updates:
+            sql += f" ON CONFLICT ({quote(primary_key)}) DO UPDATE SET {', '.join(updates)}"
+        else:
+            sql += f" ON CONFLICT ({quote(primary_key)}) DO NOTHING"
+    return sql
+
+
+def insert_batch(target, cursor, sql: str, batch: List[tuple], result: Dict):
+    """Insert one batch under a savepoint of the open transaction, counting loaded and rejected rows"""
+    cursor.execute("SAVEPOINT load_batch")
+    try:
+        cursor.executemany(sql, batch)
+        cursor.execute("RELEASE SAVEPOINT load_batch")
+        result['loaded'] += len(batch)
+        return
+    except target.errors:
+        cursor.execute("ROLLBACK TO SAVEPOINT load_batch")
+        cursor.execute("RELEASE SAVEPOINT load_batch")
+
+    # A bad row fails the whole batch; retry row by row so only it is rejected
+    insert_rows(target, cursor, sql, batch, result)
+
+
+def insert_rows(target, cursor, sql: str, batch: List[tuple], result: Dict):
+    """Insert row by row inside the open transaction, rejecting only the rows that fail"""
+    for row in batch:
+        cursor.execute("SAVEPOINT load_row")
+        try:
+            cursor.execute(sql, row)
+            cursor.execute("RELEASE SAVEPOINT load_row")
+            result['loaded'] += 1
+        except target.errors as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT load_row")
+            cursor.execute("RELEASE SAVEPOINT load_row")
+            result['rejected'] += 1
+            if len(result['errors']) < MAX_REJECT_SAMPLES:
+                result['errors'].append(str(e).strip().splitlines()[0])
+
+
+def load_table(target, conn, table_name: str, table_info: Dict, plan: Dict,
+               indexes: List[Tuple[str, str]], batch_size: int = BATCH_SIZE) -> Dict:
+    """Load one table in one transaction: drop secondary indexes, insert in batches, rebuild indexes"""
+    started = time.perf_counter()
+    result = {'rows': 0, 'loaded': 0, 'rejected': 0, 'errors': []}
+    columns = sorted(plan['columns'])
+    sql = insert_statement(table_name, columns, plan['primary_key'], plan['strategy'], target.placeholder,
+                           lambda name: target.quote(conn, name))
+    cursor = conn.cursor()
+
+    try:
+        items = load_snapshot_items(plan['json_file'])
+        rows = build_rows(items, plan, columns, target.booleans_as_int)
+        result['rows'] = len(rows)
+
+        # A failure anywhere rolls back the rows and brings the dropped indexes back
+        target.begin(conn)
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX IF EXISTS {target.quote(conn, name)}")
+        for offset in range(0, len(rows), batch_size):
+            insert_batch(target, cursor, sql, rows[offset:offset + batch_size], result)
+        for _, statement in indexes:
+            cursor.execute(statement)
+        target.commit(conn)
+        target.reset_sequence(conn, table_name, table_info)
+    except Exception as e:
+        try:
+            target.rollback(conn)
+        except Exception:
+            pass
+        result['loaded'] = 0
+        result['failed'] = str(e)
+
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def run_schedule(target, tables: Dict[str, Dict], parents: Dict[str, Set[str]], plans: Dict[str, Dict],
+                 indexes: Dict[str, List[Tuple[str, str]]], workers: int = DEFAULT_WORKERS,
+                 batch_size: int = BATCH_SIZE) -> Dict[str, Dict]:
+    """
+    Dynamic topological scheduling: a table starts as soon as its last parent
+    finishes (not when its whole wave does). Each worker thread keeps its own
+    connection. Tables in a foreign-key cycle run last, one at a time. A table
+    whose parent failed (or was skipped) is skipped, since its rows would only
+    be rejected by the foreign key.
+    """
+    children = {table: set() for table in parents}
+    for table, deps in parents.items():
+        for parent in deps:
+            children[parent].add(table)
+    waiting = {table: len(deps) for table, deps in parents.items()}
+    blocked = {}  # table -> the failed ancestor it depends on
+    _, cyclic = dependency_levels(parents)
+
+    local = threading.local()
+    connections = []
+    connections_lock = threading.Lock()
+
+    def worker(table_name: str) -> Dict:
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            conn = local.conn = target.connect()
+            with connections_lock:
+                connections.append(conn)
+        return load_table(target, conn, table_name, tables[table_name], plans[table_name],
+                          indexes.get(table_name.lower(), []), batch_size)
+
+    results = {}
+    started = time.perf_counter()
+    ready = sorted(table for table, count in waiting.items() if count == 0)
+    running = {}
+
+    def finish(table_name: str, result: Dict):
+        result['finished_at'] = time.perf_counter() - started
+        results[table_name] = result
+        if 'skipped' in result:
+            if table_name in plans:
+                print(f"  [-] {table_name}: skipped, {result['skipped']} failed")
+        elif table_name in plans:
+            status = f"[!] failed: {result['failed']}" if 'failed' in result else \
+                f"{result['loaded']}/{result['rows']} rows" + \
+                (f", {result['rejected']} rejected" if result['rejected'] else "")
+            print(f"  [+] {table_name}: {status} in {result['seconds']:.2f}s")
+        failed_ancestor = result.get('skipped') or (table_name if 'failed' in result else None)
+        for child in children[table_name]:
+            if failed_ancestor:
+                blocked.setdefault(child, failed_ancestor)
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                ready.append(child)
+
+    def skip(table_name: str):
+        finish(table_name, {'seconds': 0.0, 'skipped': blocked[table_name]})
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while ready or running:
+                while ready:
+                    table_name = ready.pop(0)
+                    if table_name in blocked:
+                        skip(table_name)
+                    elif table_name in plans:
+                        running[executor.submit(worker, table_name)] = table_name
+                    else:
+                        # No snapshot to load: the table only gates its children
+                        finish(table_name, {'seconds': 0.0})
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+
+            for table_name in cyclic:
+                if table_name in blocked:
+                    skip(table_name)
+                elif table_name in plans:
+                    finish(table_name, executor.submit(worker, table_name).result())
+    finally:
+        for conn in connections:
+            conn.close()
+
+    return results
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Load mapped APEX snapshots in parallel, in foreign-key order")
+    target_group = parser.add_mutually_exclusive_group()
+    target_group.add_argument('--sqlite', type=Path, help="Load into a local SQLite stand-in database")
+    target_group.add_argument('--dsn', help="Load into PostgreSQL (schema already applied)")
+    parser.add_argument('--plan', action='store_true', help="Only print the schedule, estimated from row counts")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent tables / connections (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f"Rows per insert batch (default: {BATCH_SIZE})")
+    parser.add_argument('--schema', type=Path, help="Schema file (default: the report tool's schema)")
+    parser.add_argument('--json-dir', type=Path, default=JSON_DIR, help=f"Snapshot directory (default: {JSON_DIR})")
+    args = parser.parse_args()
+
+    if not args.plan and not args.sqlite and not args.dsn:
+        parser.error("one of --sqlite, --dsn or --plan is required")
+
+    schema_file = args.schema or Path(report_tool.resolve_schema_file())
+
+    print("=" * 70)
+    print("Foreign-Key-Aware Parallel Load Scheduler")
+    print("=" * 70)
+    print(f"[*] Schema file: {schema_file}")
+
+    tables = report_tool.extract_table_definitions(str(schema_file))
+    if not tables:
+        return
+    parents = build_dependency_graph(tables)
+    levels, cyclic = dependency_levels(parents)
+    edges = sum(len(deps) for deps in parents.values())
+    print(f"[+] Dependency graph: {len(tables)} tables, {edges} foreign-key edges, {len(levels)} levels")
+    if cyclic:
+        print(f"[!] Foreign-key cycle between {', '.join(cyclic)}; these load last, serially")
+
+    json_files = sorted(list(args.json_dir.glob("*.json")) + list(args.json_dir.glob("*.parts")))
+    plans = plan_table_loads(tables, json_files)
+    total_rows = sum(plan['rows'] for plan in plans.values())
+    print(f"[+] {len(plans)} tables to load ({total_rows} rows)")
+    for table_name, plan in sorted(plans.items()):
+        for json_key, column in sorted(plan['unloaded_keys'].items()):
+            print(f"[!] {table_name}: `{json_key}` not loaded, `{column}` already comes from "
+                  f"`{plan['columns'][column]}`")
+
+    if args.plan:
+        for depth, level in enumerate(levels):
+            loaded = [f"{t} ({plans[t]['rows']})" for t in level if t in plans]
+            if loaded:
+                print(f"  - Level {depth}: {', '.join(loaded)}")
+        weights = {table: float(plan['rows']) for table, plan in plans.items()}
+        path, length = critical_path(parents, weights)
+        print(f"[*] Critical path: {' -> '.join(path)} ({int(length)} of {total_rows} rows)")
+        return
+
+    if args.sqlite:
+        target = SQLiteTarget(args.sqlite)
+        print(f"[*] Target: SQLite {args.sqlite}")
+    else:
+        target = PostgresTarget(args.dsn)
+        print("[*] Target: PostgreSQL")
+    indexes = parse_secondary_indexes(schema_file, tables)
+    target.create_schema(tables, parents, indexes)
+
+    print(f"\n[*] Loading with {args.workers} workers...")
+    started = time.perf_counter()
+    results = run_schedule(target, tables, parents, plans, indexes, args.workers, args.batch_size)
+    wall = time.perf_counter() - started
+
+    loaded = [r for t, r in results.items() if t in plans and 'skipped' not in r]
+    rejected = sum(r.get('rejected', 0) for r in loaded)
+    failed = [t for t, r in results.items() if 'failed' in r]
+    skipped = [t for t, r in results.items() if 'skipped' in r and t in plans]
+    serial = sum(r['seconds'] for r in loaded)
+    path, length = critical_path(parents, {t: r['seconds'] for t, r in results.items()})
+
+    print("\n" + "=" * 70)
+    print(f"[+] Loaded {sum(r.get('loaded', 0) for r in loaded)} rows into {len(loaded)} tables in {wall:.2f}s")
+    if rejected:
+        print(f"[!] {rejected} rows rejected:")
+        for table, result in sorted(results.items()):
+            for error in result.get('errors', []):
+                print(f"    {table}: {error}")
+    if failed:
+        print(f"[!] Failed tables: {', '.join(sorted(failed))}")
+    if skipped:
+        print(f"[!] Skipped (a parent failed): {', '.join(sorted(skipped))}")
+    print(f"[*] Critical path: {' -> '.join(path)} ({length:.2f}s)")
+    print(f"[*] Sum of table load times: {serial:.2f}s; wall time {wall:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import sqlite3
+
+from apex_index import query_table
+
+
+def make_conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute('CREATE TABLE "T" (id INTEGER, created TEXT)')
+    conn.executemany('INSERT INTO "T" VALUES (?, ?)', [
+        (1, "2023-12-30T23:59:59"),
+        (2, "2023-12-31"),
+        (3, "2023-12-31T10:00:00"),
+        (4, "2024-01-01T00:00:00"),
+    ])
+    return conn
+
+
+def test_range_end_date_includes_whole_day():
+    rows = query_table(make_conn(), "T", range_filter=["created", "2023-12-31", "2023-12-31"])
+    assert [row['id'] for row in rows] == [2, 3]
+
+
+def test_range_numeric_bounds_are_inclusive():
+    rows = query_table(make_conn(), "T", range_filter=["id", "2", "3"])
+    assert [row['id'] for row in rows] == [2, 3]
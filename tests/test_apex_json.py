@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+import apex_json
+
+BACKENDS = apex_json.AVAILABLE_BACKENDS
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('text', [
+    '{"id": 123456789012345678901}',
+    '{"id": -9223372036854775809}',
+    '[18446744073709551616, 1.5]',
+])
+def test_integers_beyond_64_bits_stay_integers(backend, text):
+    loads, _ = apex_json.CODECS[backend]
+    # repr, not ==: float(2**64) == 2**64
+    assert repr(loads(text.encode('utf-8'))) == repr(json.loads(text))
+    assert repr(loads(text)) == repr(json.loads(text))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_output_decodes_to_the_same_value(backend):
+    _, dumps = apex_json.CODECS[backend]
+    value = {'a': 1.0, 'b': 1e16, 'c': [1, 2**70], 'd': "naïve"}
+    for indent in (False, True):
+        assert json.loads(dumps(value, indent)) == value
@@ -0,0 +1,46 @@
+import json
+from datetime import date
+
+from apex_index import find_latest_snapshots
+from apex_partitions import (UNDATED_PARTITION, detect_date_column, load_manifest, read_partitioned_snapshot,
+                             split_existing_snapshots, undated_rows_excluded, write_partitioned_snapshot)
+
+ROWS = [
+    {'id': 1, 'login_date': '2024-09-01T08:00:00Z'},
+    {'id': 2, 'login_date': '2024-09-30T17:00:00Z'},
+    {'id': 3, 'login_date': '2024-10-02T09:00:00Z'},
+    {'id': 4, 'login_date': None},
+]
+
+
+def test_split_moves_source_aside(tmp_path):
+    source = tmp_path / "USER_LOGS_20260103_195629.json"
+    source.write_text(json.dumps({'items': ROWS}), encoding='utf-8')
+
+    assert split_existing_snapshots(tmp_path) == 1
+    assert not source.exists()
+    assert (tmp_path / "USER_LOGS_20260103_195629.json.split").exists()
+
+    part_dir = find_latest_snapshots(tmp_path)['USER_LOGS']
+    assert part_dir.name == "USER_LOGS_20260103_195629.parts"
+    assert len(read_partitioned_snapshot(part_dir)['items']) == len(ROWS)
+    september = read_partitioned_snapshot(part_dir, date(2024, 9, 1), date(2024, 9, 30))
+    assert [row['id'] for row in september['items']] == [1, 2]
+
+
+def test_detect_date_column_skips_non_dict_rows():
+    assert detect_date_column(["not a row", None] + ROWS) == 'login_date'
+    assert detect_date_column(["not a row"]) is None
+
+
+def test_range_reads_report_excluded_undated_rows(tmp_path):
+    part_dir = write_partitioned_snapshot('USER_LOGS', {'items': ROWS}, tmp_path, '20260103_195629')
+    manifest = load_manifest(part_dir)
+    assert manifest['partitions'][UNDATED_PARTITION]['row_count'] == 1
+    september = (date(2024, 9, 1), date(2024, 9, 30))
+
+    assert undated_rows_excluded(manifest, *september) == 1
+    assert undated_rows_excluded(manifest) == 0
+    assert undated_rows_excluded(manifest, *september, include_undated=True) == 0
+    kept = read_partitioned_snapshot(part_dir, *september, include_undated=True)
+    assert [row['id'] for row in kept['items']] == [1, 2, 4]
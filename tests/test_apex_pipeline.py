@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+import fetch_apex_data as fetcher
+import generate_migration_report as report_tool
+from apex_pipeline import CopyFileSink, DatabaseSink, run_table_pipeline
+from load_scheduler import SQLiteTarget, build_dependency_graph
+
+SCHEMA = """
+CREATE TABLE Suburb (
+    ID SERIAL PRIMARY KEY,
+    Name VARCHAR(255) NOT NULL
+);
+"""
+
+
+@pytest.fixture
+def suburb(tmp_path):
+    schema_file = tmp_path / "schema.sql"
+    schema_file.write_text(SCHEMA, encoding="utf-8")
+    tables = report_tool.extract_table_definitions(str(schema_file))
+    return tables, tables['Suburb']
+
+
+def stand_in_pages(pages, fail_after=None):
+    """iter_table_pages replacement: yields ORDS pages, optionally failing part-way"""
+    def iter_table_pages(apex_table, **options):
+        for number, items in enumerate(pages):
+            if number == fail_after:
+                raise ConnectionError("connection reset mid-table")
+            yield {'items': items}
+    return iter_table_pages
+
+
+PAGES = [[{'suburb_id': page * 10 + i, 'name': f"S{page * 10 + i}"} for i in range(10)] for page in range(3)]
+
+
+def run(sink, table_info, monkeypatch, fail_after=None):
+    monkeypatch.setattr(fetcher, 'iter_table_pages', stand_in_pages(PAGES, fail_after))
+    return run_table_pipeline('SUBURB', 'Suburb', table_info, sink, None, queue_depth=1, batch_size=4)
+
+
+def sqlite_target(tmp_path, tables):
+    target = SQLiteTarget(tmp_path / "load.sqlite")
+    target.create_schema(tables, build_dependency_graph(tables), {})
+    return target
+
+
+def row_count(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "load.sqlite"))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM Suburb").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_database_sink_commits_complete_table(tmp_path, suburb, monkeypatch):
+    tables, table_info = suburb
+    target = sqlite_target(tmp_path, tables)
+    result = run(DatabaseSink(target, 'Suburb', table_info), table_info, monkeypatch)
+    assert 'failed' not in result and result['loaded'] == 30
+    assert row_count(tmp_path) == 30
+
+
+def test_failed_fetch_rolls_back_database_rows(tmp_path, suburb, monkeypatch):
+    tables, table_info = suburb
+    target = sqlite_target(tmp_path, tables)
+    result = run(DatabaseSink(target, 'Suburb', table_info), table_info, monkeypatch, fail_after=2)
+    assert 'connection reset' in result['failed']
+    assert row_count(tmp_path) == 0
+
+
+def test_failed_fetch_leaves_no_truncated_copy_script(tmp_path, suburb, monkeypatch):
+    _, table_info = suburb
+    copy_dir = tmp_path / "copy"
+    result = run(CopyFileSink(copy_dir, 'Suburb'), table_info, monkeypatch, fail_after=2)
+    assert 'failed' in result
+    assert list(copy_dir.iterdir()) == []
+
+    result = run(CopyFileSink(copy_dir, 'Suburb'), table_info, monkeypatch)
+    script = (copy_dir / "Suburb.copy.sql").read_text(encoding="utf-8").splitlines()
+    assert 'failed' not in result
+    assert script[0].startswith("COPY Suburb") and script[-1] == '\\.' and len(script) == 32
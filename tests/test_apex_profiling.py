@@ -0,0 +1,59 @@
+import argparse
+import json
+import re
+import time
+
+import apex_profiling
+from apex_profiling import add_profile_arguments, profile_requested, profile_span, start_profiler, stop_profiler
+
+
+def busy(seconds):
+    until = time.perf_counter() + seconds
+    while time.perf_counter() < until:
+        pass
+
+
+def test_spans_nest_aggregate_and_save(tmp_path):
+    start_profiler("tool", cpu=True, memory=True)
+    try:
+        with profile_span("download"):
+            for _ in range(3):
+                with profile_span("table"):
+                    busy(0.01)
+                    buffer = bytearray(1 << 20)
+            del buffer
+        with profile_span("save"):
+            pass
+    finally:
+        profiler = stop_profiler()
+    assert apex_profiling._active_profiler is None
+
+    written = profiler.save(tmp_path / "run.profile.json")
+    assert [path.name for path in written] == ["run.profile.json", "run.profile.pstats", "run.profile.collapsed.txt"]
+    spans = json.loads(written[0].read_text(encoding='utf-8'))['spans']
+    download, save = spans['children']
+    table = download['children'][0]
+    assert (download['name'], download['count'], save['name']) == ("download", 1, "save")
+    assert (table['name'], table['count']) == ("table", 3)
+    assert table['total_s'] >= 0.03 and table['max_s'] <= table['total_s'] <= download['total_s'] <= spans['total_s']
+    assert table['peak_memory_bytes'] >= 1 << 20
+
+    stacks = written[2].read_text(encoding='utf-8').splitlines()
+    # Collapsed stacks are "caller;callee <microseconds>", so perf_counter appears under busy
+    assert any(re.search(r"busy \(test_apex_profiling\.py:\d+\);<built-in method time\.perf_counter> \d+$", line)
+               for line in stacks)
+    assert profiler.summary_lines()[2] == f"    - table x3: {table['total_s']:.3f}s  peak " \
+        f"{table['peak_memory_bytes'] / 1024 / 1024:.1f} MiB"
+
+
+def test_spans_are_no_ops_without_a_profiler():
+    with profile_span("anything") as node:
+        assert node is None
+
+
+def test_extras_imply_profile():
+    parser = argparse.ArgumentParser()
+    add_profile_arguments(parser)
+    assert not profile_requested(parser.parse_args([]))
+    for option in ('--profile', '--profile-cpu', '--profile-memory'):
+        assert profile_requested(parser.parse_args([option]))
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+import apex_snapshot_store
+from apex_snapshot_store import SnapshotStore, prune_snapshots
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Several chunks per test file, including a line longer than the maximum chunk
+    monkeypatch.setattr(apex_snapshot_store, 'CHUNK_MIN_SIZE', 64)
+    monkeypatch.setattr(apex_snapshot_store, 'CHUNK_MAX_SIZE', 512)
+    monkeypatch.setattr(apex_snapshot_store, 'CHUNK_MASK', 0xC0000000)
+
+
+def write_snapshot(json_dir, name, rows):
+    path = json_dir / name
+    items = [{'id': i, 'name': f"row {i}"} for i in range(rows)] + [{'id': -1, 'blob': 'x' * 2000}]
+    path.write_text(json.dumps({'items': items}, indent=2), encoding='utf-8')
+    return path
+
+
+def write_partitioned(json_dir, name):
+    part_dir = json_dir / name
+    part_dir.mkdir()
+    (part_dir / "_manifest.json").write_text(json.dumps({'partitions': {}}), encoding='utf-8')
+    (part_dir / "2024-09.json").write_text(json.dumps({'items': [{'id': 1}]}), encoding='utf-8')
+    return part_dir
+
+
+def restored_bytes(store, entries, output_dir):
+    store.restore(entries, output_dir)
+    return {entry['path']: (output_dir / entry['path']).read_bytes() for entry in entries}
+
+
+def test_ingest_restores_byte_for_byte(tmp_path):
+    json_dir = tmp_path / "apex"
+    json_dir.mkdir()
+    write_snapshot(json_dir, "APPLICANT_20240101_000000.json", 200)
+    write_partitioned(json_dir, "USER_LOGS_20240101_000000.parts")
+    (json_dir / "notes.txt").write_text("not a snapshot")
+    store = SnapshotStore(tmp_path / "store")
+
+    stats = store.ingest(json_dir)
+    assert stats['files'] == 3 and stats['chunks'] > 3
+
+    entries = store.load_pull(stats['pull_id'])['files']
+    restored = restored_bytes(store, entries, tmp_path / "restored")
+    assert sorted(restored) == ["APPLICANT_20240101_000000.json", "USER_LOGS_20240101_000000.parts/2024-09.json",
+                                "USER_LOGS_20240101_000000.parts/_manifest.json"]
+    for path, data in restored.items():
+        assert data == (json_dir / path).read_bytes()
+    assert store.ingest(json_dir)['pull_id'] is None
+
+
+def test_unchanged_files_reuse_chunks_and_as_of_picks_the_older_snapshot(tmp_path):
+    json_dir = tmp_path / "apex"
+    json_dir.mkdir()
+    first = write_snapshot(json_dir, "APPLICANT_20240101_000000.json", 200)
+    store = SnapshotStore(tmp_path / "store")
+    store.ingest(json_dir)
+
+    (json_dir / "APPLICANT_20240201_000000.json").write_bytes(first.read_bytes())
+    write_snapshot(json_dir, "APPLICANT_20240301_000000.json", 201)
+    stats = store.ingest(json_dir)
+    assert stats['files'] == 2 and stats['unchanged_files'] == 1
+    stored = store.stored_files()
+    assert stored["APPLICANT_20240201_000000.json"]['chunks'] == stored["APPLICANT_20240101_000000.json"]['chunks']
+
+    [entry] = store.select_as_of("20240215_000000")
+    assert entry['path'] == "APPLICANT_20240201_000000.json"
+    assert [e['path'] for e in store.select_as_of("20240301_000000", ['APPLICANT'])] == \
+        ["APPLICANT_20240301_000000.json"]
+    assert store.select_as_of("20231231_235959") == []
+    restored = restored_bytes(store, [entry], tmp_path / "restored")
+    assert restored[entry['path']] == first.read_bytes()
+
+
+def test_prune_keeps_newest_per_table_and_anything_not_fully_stored(tmp_path):
+    json_dir = tmp_path / "apex"
+    json_dir.mkdir()
+    write_snapshot(json_dir, "APPLICANT_20240101_000000.json", 10)
+    write_snapshot(json_dir, "APPLICANT_20240201_000000.json", 11)
+    write_snapshot(json_dir, "SUBURB_20240101_000000.json", 5)
+    old_parts = write_partitioned(json_dir, "USER_LOGS_20240101_000000.parts")
+    write_partitioned(json_dir, "USER_LOGS_20240201_000000.parts")
+    store = SnapshotStore(tmp_path / "store")
+    store.ingest(json_dir)
+
+    # Written after the ingest: not in the store yet, so never pruned
+    write_snapshot(json_dir, "SUBURB_20240201_000000.json", 6)
+    (old_parts / "2024-10.json").write_text(json.dumps({'items': []}), encoding='utf-8')
+    write_snapshot(json_dir, "SUBURB_20240301_000000.json", 7)
+
+    assert prune_snapshots(store, json_dir) == 2
+    assert sorted(path.name for path in json_dir.iterdir()) == [
+        "APPLICANT_20240201_000000.json",
+        "SUBURB_20240201_000000.json",
+        "SUBURB_20240301_000000.json",
+        "USER_LOGS_20240101_000000.parts",
+        "USER_LOGS_20240201_000000.parts",
+    ]
@@ -0,0 +1,55 @@
+import json
+
+from discover_column_relationships import KMV_SIZE, build_sketches, discover_relationships, sketch_snapshot
+
+
+def write_snapshot(json_dir, table, items):
+    path = json_dir / f"{table}_20240101_000000.json"
+    path.write_text(json.dumps({"items": items}), encoding="utf-8")
+
+
+def foreign_keys(relationships):
+    return {(r['child_table'], r['child_column'], r['parent_table'], r['parent_column'])
+            for r in relationships if r['kind'] == 'foreign_key'}
+
+
+def test_sketch_keeps_bounded_sample():
+    sketch, = sketch_snapshot("T", [{"v": i} for i in range(5 * KMV_SIZE)])
+    assert len(sketch.kmv) == KMV_SIZE
+    assert abs(sketch.distinct - 5 * KMV_SIZE) < 0.15 * 5 * KMV_SIZE
+    assert sketch.is_unique
+
+
+def test_small_child_inside_large_parent_is_found(tmp_path):
+    write_snapshot(tmp_path, "APPLICANT", [{"file_number": 100000 + i} for i in range(5000)])
+    write_snapshot(tmp_path, "VISIT", [{"file_id": 100000 + i * 97} for i in range(40)])
+    relationships = discover_relationships(build_sketches(tmp_path), json_dir=tmp_path)
+    found = [r for r in relationships if r['kind'] == 'foreign_key']
+    assert foreign_keys(found) == {("VISIT", "file_id", "APPLICANT", "file_number")}
+    assert found[0]['verified'] and found[0]['containment'] == 1.0
+
+
+def test_coincidental_small_ids_are_not_foreign_keys(tmp_path):
+    write_snapshot(tmp_path, "DWELL_TYPE", [{"dwell_type_id": i} for i in range(1, 10)])
+    write_snapshot(tmp_path, "NATIONALITY", [{"nationality_id": i} for i in range(1, 30)])
+    write_snapshot(tmp_path, "APPLICANT", [{"dwell_type": i % 9 + 1, "rooms": i % 7 + 1} for i in range(200)])
+    keys = foreign_keys(discover_relationships(build_sketches(tmp_path), json_dir=tmp_path))
+    assert ("APPLICANT", "dwell_type", "DWELL_TYPE", "dwell_type_id") in keys
+    assert ("APPLICANT", "dwell_type", "NATIONALITY", "nationality_id") not in keys
+    assert not any(child_column == "rooms" for _, child_column, _, _ in keys)
+
+
+def test_few_unnamed_integers_need_a_name_hint(tmp_path):
+    write_snapshot(tmp_path, "STAFF", [{"staff_id": i} for i in range(1, 1000)])
+    write_snapshot(tmp_path, "ORDERS", [{"status": i % 6 + 1, "staff": i % 6 + 1} for i in range(200)])
+    keys = foreign_keys(discover_relationships(build_sketches(tmp_path)))
+    assert keys == {("ORDERS", "staff", "STAFF", "staff_id")}
+
+
+def test_parent_duplicates_come_from_exact_values(tmp_path):
+    write_snapshot(tmp_path, "APPLICANT", [{"file_number": 100000 + i} for i in range(5000)])
+    write_snapshot(tmp_path, "VISIT", [{"file_id": 100000 + i * 97} for i in range(40)])
+    sketched, = discover_relationships(build_sketches(tmp_path))
+    verified, = discover_relationships(build_sketches(tmp_path), json_dir=tmp_path)
+    assert sketched['parent_duplicates'] is None
+    assert verified['parent_duplicates'] == 0 and verified['parent_distinct'] == 5000
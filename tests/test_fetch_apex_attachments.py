@@ -0,0 +1,114 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import fetch_apex_attachments as attachments
+from fetch_apex_attachments import AttachmentStore, download_attachment, fetch_attachments
+
+CONTENT = bytes(range(256)) * 64
+
+
+class StandInAttachments(BaseHTTPRequestHandler):
+    """Serves CONTENT with an ETag, honouring Range/If-Range unless told to misbehave"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        start = 0
+        byte_range = self.headers.get('Range')
+        if byte_range and self.headers.get('If-Range') in (None, server.etag):
+            start = int(byte_range[len('bytes='):].split('-')[0])
+        if server.wrong_range_start is not None and byte_range:
+            start = server.wrong_range_start
+        body = CONTENT[start:]
+        self.send_response(206 if byte_range and start else 200)
+        if byte_range and start:
+            self.send_header('Content-Range', f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}")
+        self.send_header('ETag', server.etag)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInAttachments)
+    httpd.daemon_threads = True
+    httpd.etag = '"v1"'
+    httpd.wrong_range_start = None
+    httpd.requests = []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_job(httpd):
+    return {'key': 'applicant/7', 'url': f"http://127.0.0.1:{httpd.server_address[1]}/applicantpdf/7",
+            'filename': 'doc.pdf', 'mimetype': 'application/pdf'}
+
+
+def interrupted(store, etag, size=1000):
+    """A partial download left behind by a previous run"""
+    store.partial_path('applicant/7').write_bytes(CONTENT[:size])
+    store.validator_path('applicant/7').write_text(json.dumps({'etag': etag, 'last_modified': None}))
+
+
+def stored_content(store):
+    return store.object_path(store.entries['applicant/7']['sha256']).read_bytes()
+
+
+def test_resume_sends_if_range_and_appends(tmp_path, server):
+    store = AttachmentStore(tmp_path)
+    interrupted(store, '"v1"')
+    result = download_attachment(store, make_job(server))
+    assert result['resumed_bytes'] == 1000
+    assert server.requests[0]['Range'] == 'bytes=1000-' and server.requests[0]['If-Range'] == '"v1"'
+    assert stored_content(store) == CONTENT
+    assert store.entries['applicant/7']['sha256'] == hashlib.sha256(CONTENT).hexdigest()
+    assert not store.validator_path('applicant/7').exists()
+
+
+def test_changed_file_is_fetched_from_the_start(tmp_path, server):
+    store = AttachmentStore(tmp_path)
+    interrupted(store, '"v0"')
+    result = download_attachment(store, make_job(server))
+    assert result['resumed_bytes'] == 0
+    assert stored_content(store) == CONTENT
+
+
+def test_partial_without_validator_is_not_resumed(tmp_path, server):
+    store = AttachmentStore(tmp_path)
+    store.partial_path('applicant/7').write_bytes(b'stale bytes')
+    result = download_attachment(store, make_job(server))
+    assert 'Range' not in server.requests[0]
+    assert result['resumed_bytes'] == 0 and stored_content(store) == CONTENT
+
+
+def test_mismatched_content_range_restarts(tmp_path, server):
+    store = AttachmentStore(tmp_path)
+    interrupted(store, '"v1"')
+    server.wrong_range_start = 500
+    result = download_attachment(store, make_job(server))
+    assert len(server.requests) == 2 and 'Range' not in server.requests[1]
+    assert result['resumed_bytes'] == 0 and stored_content(store) == CONTENT
+
+
+def test_commit_failure_is_a_failed_job(tmp_path, server, monkeypatch):
+    store = AttachmentStore(tmp_path)
+
+    def failing_replace(src, dst):
+        raise PermissionError("locked by another process")
+
+    monkeypatch.setattr(attachments.os, 'replace', failing_replace)
+    stats = fetch_attachments([make_job(server)], store, workers=2)
+    assert stats['failed'] == 1 and stats['stored'] == 0
+    assert 'PermissionError' in stats['errors'][0]['error']
+    assert store.partial_path('applicant/7').exists()
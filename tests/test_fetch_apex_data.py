@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import fetch_apex_data as fetcher
+
+
+class StandInORDS(BaseHTTPRequestHandler):
+    """ORDS stand-in: /slow never answers, /first-slow stalls only its first request"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.gets += 1
+            first = server.gets == 1
+        if self.path == '/slow' or (self.path == '/first-slow' and first):
+            server.release.wait(10)
+        body = json.dumps({'items': [{'id': 1}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        if self.path == '/slow':
+            self.server.release.wait(10)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture
+def ords(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInORDS)
+    server.daemon_threads = True
+    server.block_on_close = False
+    server.lock = threading.Lock()
+    server.release = threading.Event()
+    server.gets = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(fetcher, '_latency', fetcher.LatencyTracker())
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.release.set()
+    fetcher.shutdown_request_pool()
+    server.shutdown()
+    server.server_close()
+
+
+def test_deadline_get_returns_response(ords):
+    _, base = ords
+    response = fetcher.deadline_get(f"{base}/fast", time.monotonic() + 5)
+    assert response.status_code == 200 and response.json() == {'items': [{'id': 1}]}
+    assert fetcher._latency.requests == 1
+
+
+def test_deadline_get_gives_up_at_deadline(ords):
+    _, base = ords
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.Timeout):
+        fetcher.deadline_get(f"{base}/slow", started + 0.3)
+    assert time.monotonic() - started < 1.0
+
+
+def test_hedge_wins_when_first_request_stalls(ords, monkeypatch):
+    server, base = ords
+    monkeypatch.setattr(fetcher, 'HEDGE_MIN_DELAY', 0.05)
+    for _ in range(fetcher.HEDGE_MIN_SAMPLES):
+        fetcher._latency.record(0.01, 0.01)
+    started = time.monotonic()
+    response = fetcher.deadline_get(f"{base}/first-slow", started + 5, hedge=True)
+    assert response.status_code == 200
+    assert time.monotonic() - started < 1.0
+    assert (fetcher._latency.requests, fetcher._latency.hedged, fetcher._latency.hedge_wins) == (2, 1, 1)
+    assert server.gets == 2
+
+
+def test_endpoint_probe_counts_against_the_table_deadline(ords, monkeypatch, tmp_path):
+    _, base = ords
+    monkeypatch.setattr(fetcher, 'API_BASE_URL', base)
+    monkeypatch.setattr(fetcher, 'OUTPUT_DIR', tmp_path)
+    started = time.monotonic()
+    assert fetcher.fetch_and_save('slow', table_deadline=0.5, profiled=False) == 'failed'
+    assert time.monotonic() - started < 1.5
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_request_pool_is_created_lazily_and_dropped(ords):
+    _, base = ords
+    fetcher.shutdown_request_pool()
+    assert fetcher._request_pool is None
+    fetcher.deadline_get(f"{base}/fast", time.monotonic() + 5)
+    assert fetcher._request_pool is not None
+    fetcher.shutdown_request_pool()
+    assert fetcher._request_pool is None
+
+
+LOOKUPS = """
+CREATE TABLE Suburb (
+    ID SERIAL PRIMARY KEY,
+    Name VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE Title (
+    ID SERIAL PRIMARY KEY,
+    Name VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE Comments (
+    ID SERIAL PRIMARY KEY,
+    Comment TEXT
+);
+"""
+
+
+def test_catalogue_families_are_batched_without_snapshots(tmp_path):
+    schema_file = tmp_path / "schema.sql"
+    schema_file.write_text(LOOKUPS, encoding='utf-8')
+    tables = ['HSEQ_CLEANING_CHECKLIST_ADMIN', 'SUBURB', 'EBA_QPOLL_QUESTIONS', 'COMMENTS',
+              'HSEQ_CLEANING_CHECKLIST_ADMIN_DAILY', 'TITLE', 'EBA_QPOLL_RESULTS', 'HSEQ_POLICY', 'NEW']
+    jobs = fetcher.plan_fetch_jobs(tables, str(schema_file))
+    assert jobs == [['HSEQ_CLEANING_CHECKLIST_ADMIN', 'HSEQ_CLEANING_CHECKLIST_ADMIN_DAILY'], ['SUBURB', 'TITLE'],
+                    ['EBA_QPOLL_QUESTIONS', 'EBA_QPOLL_RESULTS'], ['COMMENTS'], ['HSEQ_POLICY'], ['NEW']]
+
+
+def test_latency_counters_are_thread_safe():
+    tracker = fetcher.LatencyTracker()
+
+    def count():
+        for _ in range(10000):
+            tracker.count_request(hedge=True)
+            tracker.count_hedge_win()
+
+    threads = [threading.Thread(target=count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (tracker.requests, tracker.hedged, tracker.hedge_wins) == (40000, 40000, 40000)
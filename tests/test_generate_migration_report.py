@@ -0,0 +1,24 @@
+import json
+
+import generate_migration_report as report_tool
+
+SCHEMA = """
+CREATE TABLE Race (
+    ID SERIAL PRIMARY KEY,
+    Name VARCHAR(255) NOT NULL
+);
+"""
+
+
+def test_watch_render_falls_back_to_schema_backup(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    schema_dir = tmp_path / "backend" / "src" / "schema"
+    schema_dir.mkdir(parents=True)
+    (schema_dir / "schema-backup.sql").write_text(SCHEMA, encoding='utf-8')
+    (tmp_path / "apex").mkdir()
+    (tmp_path / "apex" / "RACE_20260103_195300.json").write_text(
+        json.dumps({'items': [{'race_id': 1, 'race': 'African'}]}), encoding='utf-8')
+
+    assert report_tool.resolve_schema_file() == report_tool.FALLBACK_SCHEMA_FILE
+    assert report_tool.render_report_to_file(report_tool.ReportCache()) == 1
+    assert "## Table: `Race`" in (tmp_path / report_tool.OUTPUT_REPORT).read_text(encoding='utf-8')
@@ -0,0 +1,31 @@
+import json
+import random
+
+import apex_json
+from generate_synthetic_apex import build_table_model, generate_dataset, write_synthetic_snapshot
+
+ITEMS = [
+    {'suburb_id': 265 + i, 'suburb': name, 'created': f"2024-0{i % 9 + 1}-01T00:00:00Z", 'note': None}
+    for i, name in enumerate(['Kenville', 'Bellair', 'Mobeni', 'Stanger'])
+]
+
+
+def test_generated_snapshot_parses_with_scaled_rows(tmp_path):
+    source_dir = tmp_path / "apex"
+    source_dir.mkdir()
+    (source_dir / "SUBURB_20240101_000000.json").write_text(json.dumps({'items': ITEMS}), encoding='utf-8')
+
+    output_dir = generate_dataset(3, source_dir, tmp_path / "synthetic")
+    [snapshot] = list(output_dir.glob("SUBURB_*.json"))
+    data = json.loads(snapshot.read_text(encoding='utf-8'))
+
+    assert len(data['items']) == len(ITEMS) * 3
+    assert all(list(row) == list(ITEMS[0]) for row in data['items'])
+    assert [row['suburb_id'] for row in data['items']] == list(range(265, 265 + 12))
+    assert data['next']['$ref'].endswith("SUBURB?page=1")
+
+
+def test_empty_table_writes_valid_json(tmp_path):
+    output_path = tmp_path / "EMPTY_20240101_000000.json"
+    write_synthetic_snapshot('EMPTY', build_table_model([]), 0, output_path, random.Random(0))
+    assert apex_json.load_file(output_path)['items'] == []
@@ -0,0 +1,150 @@
+import json
+import sqlite3
+
+import generate_migration_report as report_tool
+import load_scheduler as scheduler
+from load_scheduler import (SQLiteTarget, build_dependency_graph, dependency_levels, parse_secondary_indexes,
+                            run_schedule)
+
+SCHEMA = """
+CREATE TABLE Suburb (
+    ID SERIAL PRIMARY KEY,
+    Name VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE Applicant (
+    ID SERIAL PRIMARY KEY,
+    Name VARCHAR(255) NOT NULL,
+    Suburb_ID INTEGER REFERENCES Suburb(ID)
+);
+
+CREATE TABLE Comments (
+    ID SERIAL PRIMARY KEY,
+    Applicant_ID INTEGER NOT NULL,
+    Comment TEXT,
+    FOREIGN KEY (Applicant_ID) REFERENCES Applicant(ID)
+);
+
+CREATE INDEX idx_comments_applicant ON Comments (Applicant_ID);
+"""
+
+
+def write_snapshot(tmp_path, table, items):
+    path = tmp_path / f"{table}_20240101_000000.json"
+    path.write_text(json.dumps({"items": items}), encoding="utf-8")
+    return path
+
+
+def plan(json_file, columns, rows):
+    return {'rows': rows, 'strategy': 'UPSERT', 'columns': columns, 'primary_key': 'ID', 'json_file': json_file}
+
+
+def setup_load(tmp_path):
+    schema_file = tmp_path / "schema.sql"
+    schema_file.write_text(SCHEMA, encoding="utf-8")
+    tables = report_tool.extract_table_definitions(str(schema_file))
+    parents = build_dependency_graph(tables)
+    plans = {
+        'Suburb': plan(write_snapshot(tmp_path, "SUBURB", [{"suburb_id": i, "name": f"S{i}"} for i in range(1, 6)]),
+                       {'ID': 'suburb_id', 'Name': 'name'}, 5),
+        'Applicant': plan(write_snapshot(tmp_path, "APPLICANT",
+                                         [{"file_number": i, "name": f"A{i}", "suburb": i % 5 + 1} for i in range(40)]),
+                          {'ID': 'file_number', 'Name': 'name', 'Suburb_ID': 'suburb'}, 40),
+        'Comments': plan(write_snapshot(tmp_path, "COMMENTS",
+                                        [{"comment_id": i, "file_id": i % 40, "comment": "ok"} for i in range(100)]),
+                         {'ID': 'comment_id', 'Applicant_ID': 'file_id', 'Comment': 'comment'}, 100),
+    }
+    indexes = parse_secondary_indexes(schema_file, tables)
+    target = SQLiteTarget(tmp_path / "load.sqlite")
+    target.create_schema(tables, parents, indexes)
+    return target, tables, parents, plans, indexes
+
+
+def query(tmp_path, sql):
+    conn = sqlite3.connect(str(tmp_path / "load.sqlite"))
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def comments_indexes(tmp_path):
+    return [row[0] for row in query(tmp_path, "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'Comments'")]
+
+
+def test_load_follows_foreign_keys_and_rebuilds_indexes(tmp_path):
+    target, tables, parents, plans, indexes = setup_load(tmp_path)
+    levels, cyclic = dependency_levels(parents)
+    assert levels == [['Suburb'], ['Applicant'], ['Comments']] and not cyclic
+
+    results = run_schedule(target, tables, parents, plans, indexes, workers=4, batch_size=16)
+
+    # Foreign keys are enforced, so any child started before its parent finished would reject rows
+    assert {t: (r['loaded'], r['rejected']) for t, r in results.items()} == \
+        {'Suburb': (5, 0), 'Applicant': (40, 0), 'Comments': (100, 0)}
+    for child, parent in (('Applicant', 'Suburb'), ('Comments', 'Applicant')):
+        child_started = results[child]['finished_at'] - results[child]['seconds']
+        assert child_started >= results[parent]['finished_at']
+
+    assert 'idx_comments_applicant' in comments_indexes(tmp_path)
+    assert query(tmp_path, "SELECT COUNT(*) FROM Comments WHERE Applicant_ID = 7") == [(3,)]
+
+
+def test_failure_part_way_rolls_back_rows_and_keeps_indexes(tmp_path, monkeypatch):
+    target, tables, parents, plans, indexes = setup_load(tmp_path)
+    conn = target.connect()
+    try:
+        for table_name in ('Suburb', 'Applicant'):
+            scheduler.load_table(target, conn, table_name, tables[table_name], plans[table_name], [], batch_size=16)
+
+        insert_batch = scheduler.insert_batch
+        calls = []
+
+        def failing_insert_batch(target, cursor, sql, batch, result):
+            calls.append(len(batch))
+            if len(calls) == 3:
+                raise sqlite3.OperationalError("disk I/O error")
+            insert_batch(target, cursor, sql, batch, result)
+
+        monkeypatch.setattr(scheduler, 'insert_batch', failing_insert_batch)
+        result = scheduler.load_table(target, conn, 'Comments', tables['Comments'], plans['Comments'],
+                                      indexes['comments'], batch_size=16)
+    finally:
+        conn.close()
+
+    # Two batches were inserted before the failure; neither survives, and the dropped index is back
+    assert result['failed'] == "disk I/O error" and result['loaded'] == 0
+    assert query(tmp_path, "SELECT COUNT(*) FROM Applicant") == [(40,)]
+    assert query(tmp_path, "SELECT COUNT(*) FROM Comments") == [(0,)]
+    assert 'idx_comments_applicant' in comments_indexes(tmp_path)
+
+
+def test_children_of_a_failed_table_are_skipped(tmp_path):
+    target, tables, parents, plans, indexes = setup_load(tmp_path)
+    plans['Applicant']['json_file'] = tmp_path / "APPLICANT_missing.json"
+
+    results = run_schedule(target, tables, parents, plans, indexes, workers=4, batch_size=16)
+
+    assert results['Suburb']['loaded'] == 5
+    assert 'failed' in results['Applicant']
+    assert results['Comments']['skipped'] == 'Applicant'
+    assert query(tmp_path, "SELECT COUNT(*) FROM Comments") == [(0,)]
+
+
+def test_keys_mapped_to_the_same_column_are_not_dropped_silently(tmp_path):
+    schema_file = tmp_path / "schema.sql"
+    schema_file.write_text("""
+CREATE TABLE Comments (
+    ID SERIAL PRIMARY KEY,
+    File_ID BIGINT,
+    Comment TEXT
+);
+""", encoding="utf-8")
+    table_info = report_tool.extract_table_definitions(str(schema_file))['Comments']
+    json_info = {'keys': ['comment_id', 'file_id', 'comments', 'comment_by'], 'total_count': 10}
+    mapping = report_tool.map_json_to_table(json_info['keys'], table_info['columns'], 'Comments')['mapping']
+    assert mapping['comment_id']['column'] == mapping['file_id']['column'] == 'ID'
+
+    load_plan = scheduler.plan_table_load('Comments', table_info, json_info)
+    assert load_plan['columns'] == {'ID': 'comment_id', 'File_ID': 'file_id', 'Comment': 'comments'}
+    assert load_plan['unloaded_keys'] == {'comment_by': 'Comment'}